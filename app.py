@@ -1,16 +1,22 @@
+import time
+
 import streamlit as st
-import pandas as pd
-import json
-import streamlit.components.v1 as components
 
 # New streamlined imports
+# Only the light modules are imported here; pandas, the Groq client and the
+# map stack (folium, branca, jinja2, polyline) load on first use so the
+# landing form renders without paying for them.
 from utils.travel_utils import (
     calculate_budget_split, 
     get_currency_for_country, 
     COUNTRY_CURRENCY_MAP
 )
-from utils.itinerary_ai import generate_itinerary
-from utils.maps import create_map
+from utils import metrics
+from utils.autocomplete import get_place_index
+from utils.pricing import format_amount
+
+# Seconds between status checks while a plan is being built in the background
+PLAN_POLL_S = 0.5
 
 # Generate the country list dynamically from your mapping keys
 COUNTRIES = sorted(list(COUNTRY_CURRENCY_MAP.keys()))
@@ -64,9 +70,27 @@ def handle_plan_click():
     st.session_state.itinerary_generated = True
 
 def handle_reset_click():
-    """Callback to reset the app."""
+    """Callback to reset the app. The plan itself stays in the trip history."""
     st.session_state.itinerary_generated = False
-    st.session_state.itinerary_data = None
+    st.session_state.trip_id = None
+    job_id = st.session_state.pop("plan_job", None)
+    if job_id:
+        from utils.jobs import plan_queue
+        plan_queue.cancel(job_id)
+
+def handle_open_trip(trip_id):
+    """Callback to show a saved trip from the history list."""
+    st.session_state.trip_id = trip_id
+    st.session_state.itinerary_generated = True
+
+def current_user():
+    """Anonymous per-browser ID kept in the URL (?user=...) so trip history survives new sessions."""
+    user = st.query_params.get("user")
+    if not user:
+        import uuid
+        user = uuid.uuid4().hex[:12]
+        st.query_params["user"] = user
+    return user
 
 # ----------------- Main Application -----------------
 def main():
@@ -76,8 +100,12 @@ def main():
     # --- Session State Initialization ---
     if "itinerary_generated" not in st.session_state:
         st.session_state.itinerary_generated = False
-    if "itinerary_data" not in st.session_state:
-        st.session_state.itinerary_data = None
+    # Only IDs are kept per session; plans are read back from utils.history
+    if "trip_id" not in st.session_state:
+        st.session_state.trip_id = None
+
+    if metrics.METRICS_ENABLED:
+        metrics.start_metrics_server()
 
     # ----------------- UI: Input Form -----------------
     if not st.session_state.itinerary_generated:
@@ -89,6 +117,7 @@ def main():
             # Country & City
             country = st.selectbox("Select Country", COUNTRIES, index=COUNTRIES.index("India") if "India" in COUNTRIES else 0)
             city = st.text_input("City (Optional)", placeholder="e.g. Mumbai, Goa")
+            place = resolve_city(city, country) if city.strip() else country
 
             # Budget & Duration
             c1, c2 = st.columns(2)
@@ -104,9 +133,17 @@ def main():
             # IMPORTANT: The button uses on_click to hide this page immediately
             st.button("Plan My Trip 🎒✈️", on_click=handle_plan_click)
 
+            # Destination ideas; popular combinations are pre-warmed by scripts/warm_cache.py
+            if st.button("💡 Suggest destinations"):
+                from utils.itinerary_ai import get_ai_suggestions
+                with st.spinner("Looking for ideas..."):
+                    st.markdown(get_ai_suggestions(budget, interests, country))
+
+            display_history()
+
             # Store temporary inputs in session state to pass to AI during next run
             st.session_state.temp_inputs = {
-                "place": city if city else country,
+                "place": place,
                 "days": days,
                 "budget": budget,
                 "travelers": travelers,
@@ -117,65 +154,151 @@ def main():
 
     # ----------------- UI: Results Display -----------------
     else:
-        # 1. AI Generation Logic (Only runs once)
-        if st.session_state.itinerary_data is None:
-            with st.spinner("🤖 AI is packing your backpack with the best deals...!!"):
-                inputs = st.session_state.temp_inputs
-                
-                # Split budget
-                budget_data = calculate_budget_split(
-                    float(inputs['budget']), int(inputs['days']), 
-                    inputs['interests'], int(inputs['travelers']), inputs['currency']
-                )
-
-                try:
-                    response = generate_itinerary(
-                        inputs['place'], inputs['days'], budget_data, 
-                        inputs['interests'], inputs['travel_type']
-                    )
-                    st.session_state.itinerary_data = json.loads(response)
-                    st.session_state.budget_data = budget_data
-                    
-                    # Map Logic
-                    locations = st.session_state.itinerary_data.get("locations", [])
-                    st.session_state.map_obj = create_map(inputs['place'], locations)
-                except Exception as e:
-                    st.error(f"Error: {e}")
-                    if st.button("Try Again"):
-                        handle_reset_click()
-                        st.rerun()
+        # 1. AI Generation Logic (runs once, on the background plan queue)
+        if st.session_state.trip_id is None:
+            poll_plan_job()
 
         # 2. Render Results
-        if st.session_state.itinerary_data:
+        trip = open_current_trip()
+        if trip:
             col_a, col_b = st.columns([4, 1])
             with col_a:
-                st.title(f"📍 Trip to {st.session_state.temp_inputs['place']}")
+                st.title(f"📍 Trip to {trip.inputs['place']}")
             with col_b:
                 st.button("⬅️ New Plan", on_click=handle_reset_click)
 
-            display_results(
-                st.session_state.itinerary_data,
-                st.session_state.get('map_obj'),
-                st.session_state.get('budget_data'),
-                st.session_state.temp_inputs['currency']
-            )
+            display_results(trip.itinerary, trip.map_data, trip.budget, trip.inputs['currency'])
+
+            display_edit_panel(trip)
+
+            if metrics.METRICS_ENABLED:
+                display_debug_panel()
+
+# ----------------- Helper: Place Autocomplete -----------------
+def resolve_city(city, country):
+    """
+    Matches the typed city against the offline place index so spelling
+    slips are fixed before any geocoding or model call ("Mumbay" -> Mumbai).
+    Only exact names and matches inside the selected country are applied,
+    and a correction can be turned down, since the index does not know
+    every town ("Raipur" is not "Jaipur"). Anything else is planned as
+    typed, with a "Did you mean" hint.
+    """
+    typed = city.strip()
+    index = get_place_index()
+    match = index.resolve(typed, country)
+    if match:
+        if match.name.casefold() == typed.casefold():
+            return match.name
+        st.caption(f"📍 Planning for **{match.name}**, {match.country}")
+        if not st.checkbox(f"Keep “{typed}” as typed", key="keep_typed_city"):
+            return match.name
+        return typed
+    ideas = index.suggest(typed, limit=3, country=country)
+    if ideas:
+        st.caption("Did you mean " + " · ".join(f"**{s.name}**" for s in ideas) + "?")
+    return typed
+
+
+# ----------------- Helper: Background Plan -----------------
+def poll_plan_job():
+    """
+    Submits the plan to the shared worker pool on the first run, then shows
+    its progress and partial day cards, rerunning every PLAN_POLL_S seconds
+    until the job finishes. The job ID lives in the session, so a rerun in
+    the middle picks the same job back up instead of starting over.
+    """
+    from utils.jobs import QueueFullError, plan_status, submit_plan
+
+    job_id = st.session_state.get("plan_job")
+    status = plan_status(job_id) if job_id else None
+    if status is None:
+        try:
+            job_id = submit_plan(st.session_state.temp_inputs, current_user())
+        except QueueFullError:
+            st.warning("⏳ Lots of trips are being planned right now. Please try again in a moment.")
+            st.button("Try Again", on_click=handle_reset_click)
+            return
+        st.session_state.plan_job = job_id
+        status = plan_status(job_id)
+
+    if not status.finished:
+        st.info(f"🤖 {status.stage}... packing your backpack with the best deals!")
+        if status.partial:
+            st.markdown("".join(status.partial), unsafe_allow_html=True)
+        time.sleep(PLAN_POLL_S)
+        st.rerun()
+
+    st.session_state.pop("plan_job", None)
+    if status.state != "done":
+        st.error(f"Error: {status.error or status.state}")
+        st.button("Try Again", on_click=handle_reset_click)
+        return
+
+    if status.result["trip_id"] is None:
+        st.error(f"Error: {status.result['itinerary'].error}")
+        st.button("Try Again", on_click=handle_reset_click)
+        return
+    st.session_state.trip_id = status.result["trip_id"]
+    if metrics.METRICS_FILE:
+        metrics.write_prometheus()
+
+# ----------------- Helper: Trip History -----------------
+def open_current_trip():
+    """The session's trip, decompressed from the history store (None if there is none)."""
+    if not st.session_state.get("trip_id"):
+        return None
+    from utils.history import get_history
+    return get_history().open_trip(current_user(), st.session_state.trip_id)
+
+def display_history():
+    """Paginated list of this browser's saved trips; payloads load only when one is opened."""
+    from utils.history import HISTORY_PAGE_SIZE, get_history
+
+    page = st.session_state.get("history_page", 0)
+    trips, total = get_history().list_trips(current_user(), page)
+    if not total:
+        return
+    with st.expander(f"🗂️ Your trips ({total})"):
+        for trip in trips:
+            c1, c2 = st.columns([4, 1])
+            cost = f" · {format_amount(trip.total_cost)} {trip.currency}" if trip.total_cost is not None else ""
+            c1.markdown(f"**{trip.place}** · {trip.days} days{cost}")
+            c2.button("Open", key=f"open_{trip.trip_id}", on_click=handle_open_trip, args=(trip.trip_id,))
+        pages = (total + HISTORY_PAGE_SIZE - 1) // HISTORY_PAGE_SIZE
+        if pages > 1:
+            c1, c2, c3 = st.columns([1, 2, 1])
+            if c1.button("◀ Newer", disabled=page == 0):
+                st.session_state.history_page = page - 1
+                st.rerun()
+            c2.caption(f"Page {page + 1} of {pages}")
+            if c3.button("Older ▶", disabled=page >= pages - 1):
+                st.session_state.history_page = page + 1
+                st.rerun()
 
 # ----------------- Helper: Display Tabs -----------------
 # Update display_results to fix the "None" error shown in your screenshot
-def display_results(data, map_obj, budget_data, currency):
+def display_results(data, map_data, budget_data, currency):
+    import pandas as pd
+    import streamlit.components.v1 as components
+
     tab1, tab2, tab3 = st.tabs(["📝 Itinerary", "🗺️ Map", "💰 Budget Breakdown"])
 
     with tab1:
         # Fallback for total_cost to prevent showing 'None'
-        total = data.get('total_cost')
+        total = data.total_cost
         total_str = f"{total}" if total is not None else "Calculating..."
         st.info(f"💡 Estimated Total: {total_str} {currency}")
-        st.markdown(data.get("html", ""), unsafe_allow_html=True)
+        st.markdown(data.html, unsafe_allow_html=True)
 
     with tab2:
-        if map_obj:
-            map_html = map_obj.get_root().render()
-            components.html(map_html, height=500)
+        if map_data:
+            from utils.maps import render_map_html
+            with metrics.span("map_render"):
+                map_html = render_map_html(map_data)
+                components.html(map_html, height=500)
+            if map_data.get("route_estimated"):
+                st.caption("Road routing is unavailable right now; the dashed line is a straight-line estimate.")
         else:
             st.warning("Map couldn't be loaded for this location.")
 
@@ -185,6 +308,111 @@ def display_results(data, map_obj, budget_data, currency):
             df = pd.DataFrame([budget_data['breakdown']]).melt(var_name="Category", value_name="Amount")
             st.bar_chart(df.set_index("Category"))
             st.table(df)
+        if data.over_budget:
+            over = ", ".join(f"{category} (+{format_amount(amount)} {currency})" for category, amount in data.over_budget.items())
+            st.warning(f"⚠️ The plan spends more than the budget allows on: {over}")
+
+# ----------------- Helper: Incremental Edits -----------------
+def apply_edit(edit, inputs, budget_data):
+    """Saves an edited plan to the history and refreshes its map; unchanged stops and legs come from cache."""
+    from utils.history import get_history
+    from utils.maps import build_map_data
+    from utils.routing import assign_days
+
+    if not edit.result.ok:
+        st.session_state.edit_notice = ("error", edit.result.error)
+        return
+    result = edit.result
+    map_data = build_map_data(inputs['place'], result.locations, assign_days(result.html, result.locations))
+    st.session_state.trip_id = get_history().save(current_user(), inputs, result, budget_data, map_data)
+    st.session_state.temp_inputs = inputs
+    if edit.changed_days:
+        changed = ", ".join(str(d) for d in edit.changed_days)
+        st.session_state.edit_notice = ("success", f"Updated day(s) {changed}; the rest of the plan was kept.")
+    elif edit.rescaled:
+        st.session_state.edit_notice = ("success", "Prices adjusted locally; no days needed re-planning.")
+    else:
+        st.session_state.edit_notice = ("info", "No days needed re-planning; the plan was kept as it is.")
+
+def display_edit_panel(trip):
+    """Re-plan one day, swap interests or change the budget without starting over."""
+    data = trip.itinerary
+    inputs = trip.inputs
+    budget_data = trip.budget
+    if not data.days or not budget_data:
+        return
+
+    notice = st.session_state.pop("edit_notice", None)
+    if notice:
+        getattr(st, notice[0])(notice[1])
+
+    with st.expander("✏️ Adjust this plan"):
+        c1, c2, c3 = st.columns(3)
+        with c1:
+            day = st.selectbox("Day", list(range(1, len(data.days) + 1)), format_func=lambda d: f"Day {d}")
+            redo_day = st.button("🔄 Regenerate day")
+        with c2:
+            new_interests = st.multiselect(
+                "Interests", ["Culture", "Food", "Adventure", "Relaxation", "Nightlife", "History", "Museums"],
+                default=inputs['interests'], key="edit_interests",
+            )
+            redo_interests = st.button("Apply interests")
+        with c3:
+            new_budget = st.number_input("Budget", min_value=1000, step=1000, value=int(inputs['budget']),
+                                         key="edit_budget")
+            redo_budget = st.button("Apply budget")
+
+    if not (redo_day or redo_interests or redo_budget):
+        return
+
+    from utils import itinerary_edit
+
+    args = (inputs['place'], int(inputs['days']))
+    with st.spinner("Re-planning only what changed..."):
+        if redo_day:
+            edit = itinerary_edit.regenerate_day(data, day, *args, budget_data, inputs['interests'],
+                                                 inputs['travel_type'])
+            apply_edit(edit, inputs, budget_data)
+        elif redo_interests:
+            edit = itinerary_edit.change_interests(data, *args, budget_data, inputs['interests'],
+                                                   new_interests, inputs['travel_type'])
+            new_budget_data = calculate_budget_split(float(inputs['budget']), int(inputs['days']), new_interests,
+                                                     int(inputs['travelers']), inputs['currency'])
+            apply_edit(edit, dict(inputs, interests=new_interests), new_budget_data)
+        else:
+            new_budget_data = calculate_budget_split(float(new_budget), int(inputs['days']), inputs['interests'],
+                                                     int(inputs['travelers']), inputs['currency'])
+            edit = itinerary_edit.change_budget(data, *args, budget_data, new_budget_data, inputs['interests'],
+                                                inputs['travel_type'])
+            apply_edit(edit, dict(inputs, budget=new_budget), new_budget_data)
+    st.rerun()
+
+# ----------------- Helper: Debug Panel -----------------
+def display_debug_panel():
+    """Per-stage latency histograms and upstream health, shown only when METRICS_ENABLED is set."""
+    import pandas as pd
+    from utils.maps import upstream_health
+
+    with st.expander("⏱️ Stage timings (debug)"):
+        summary = metrics.stage_summary()
+        if summary:
+            st.dataframe(pd.DataFrame.from_dict(summary, orient="index"))
+        else:
+            st.caption("No stages recorded yet.")
+
+        health = upstream_health()
+        st.markdown("**Upstream circuit breakers**")
+        st.dataframe(pd.DataFrame.from_dict(health["breakers"], orient="index"))
+        st.markdown("**Map fallbacks**")
+        st.json(health["fallbacks"])
+        from utils.jobs import plan_queue
+        st.markdown("**Plan queue**")
+        st.json(plan_queue.stats())
+        from utils.singleflight import flight_stats
+        st.markdown("**Coalesced requests**")
+        st.dataframe(pd.DataFrame.from_dict(flight_stats(), orient="index"))
+        st.download_button("Download Prometheus metrics", metrics.prometheus_text(),
+                           file_name="metrics.prom", mime="text/plain")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,107 @@
+"""
+Benchmark: place autocomplete over a large name list.
+
+Builds utils.autocomplete.PlaceIndex over the bundled places plus N
+synthetic place names (default 100k, with aliases on every tenth), then
+replays typing sessions keystroke by keystroke, both clean prefixes and
+names with one typo, and reports build time, index size, per-keystroke
+suggest() latency and how often the intended place is among the
+suggestions once the whole name is typed. Exits non-zero when the p99 keystroke exceeds
+--max-ms.
+
+    python -m benchmarks.autocomplete [--names 100000] [--queries 500] [--max-ms 1.0]
+"""
+import argparse
+import random
+import statistics
+import sys
+import time
+
+from utils.autocomplete import PlaceIndex, load_places
+
+# Consonant-vowel(-coda) syllables; about as many distinct trigrams as a real gazetteer of this size
+SYLLABLES = tuple(c + v + coda for c in "bcdfghjklmnprstvwyz" for v in "aeiou" for coda in ("", "", "n", "r", "l"))
+KINDS = ("city", "city", "city", "landmark")
+
+
+def synthetic_places(n, rng):
+    countries = [p[0] for p in load_places() if p[1] == "country"]
+    places, seen = [], set()
+    while len(places) < n:
+        name = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))).capitalize()
+        if rng.random() < 0.2:
+            name += " " + "".join(rng.choice(SYLLABLES) for _ in range(2)).capitalize()
+        if name in seen:
+            continue
+        seen.add(name)
+        aliases = [name[::-1].capitalize()] if len(places) % 10 == 0 else []
+        places.append((name, rng.choice(KINDS), rng.choice(countries), aliases))
+    return places
+
+
+def typo(word, rng):
+    i = rng.randrange(len(word))
+    return word[:i] + rng.choice("abcdefghijklmnopqrstuvwxyz") + word[i + 1:]
+
+
+def keystrokes(names, count, rng, with_typo):
+    """(name, [text after each keystroke]) typing sessions for count random names."""
+    sessions = []
+    for name in rng.sample(names, count):
+        target = typo(name.lower(), rng) if with_typo else name.lower()
+        sessions.append((name, [target[:i] for i in range(1, len(target) + 1)]))
+    return sessions
+
+
+def replay(index, sessions, country):
+    """Per-keystroke latencies, and how often the intended name is suggested once fully typed."""
+    times, found = [], 0
+    for name, session in sessions:
+        for text in session:
+            start = time.perf_counter()
+            suggestions = index.suggest(text, country=country)
+            times.append(time.perf_counter() - start)
+        found += any(s.name == name for s in suggestions)
+    times.sort()
+    return (len(times), statistics.median(times) * 1000, times[int(len(times) * 0.99)] * 1000,
+            times[-1] * 1000, found / len(sessions))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--names", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=500, help="typing sessions per scenario")
+    parser.add_argument("--max-ms", type=float, default=1.0, help="fail when the p99 keystroke is slower")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+
+    places = load_places() + synthetic_places(args.names, rng)
+    start = time.perf_counter()
+    index = PlaceIndex(places)
+    build_s = time.perf_counter() - start
+    print(f"index: {len(places)} places, {len(index)} keys, built in {build_s:.2f}s; {index.stats()}")
+
+    names = [p[0] for p in places]
+    print(f"{'scenario':<22}{'keystrokes':>12}{'p50 ms':>10}{'p99 ms':>10}{'max ms':>10}{'found':>8}")
+    worst_p99 = 0.0
+    for label, with_typo, country in (("prefix", False, None), ("prefix + country", False, "India"),
+                                      ("one typo", True, None)):
+        n, p50, p99, worst, found = replay(index, keystrokes(names, args.queries, rng, with_typo), country)
+        worst_p99 = max(worst_p99, p99)
+        print(f"{label:<22}{n:>12}{p50:>10.3f}{p99:>10.3f}{worst:>10.3f}{found:>8.0%}")
+
+    for text, country in (("Mumbay", "India"), ("Banglore", "India"), ("Dehli", "India"), ("Tokio", "Japan"),
+                          ("Cairns", "Australia"), ("Mumbay", None)):
+        start = time.perf_counter()
+        match = index.resolve(text, country)
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"resolve {text!r} in {country or 'any country'} -> {match.name if match else None} ({elapsed:.3f} ms)")
+
+    if worst_p99 > args.max_ms:
+        print(f"FAIL: p99 keystroke {worst_p99:.3f} ms > {args.max_ms} ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
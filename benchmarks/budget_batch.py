@@ -0,0 +1,54 @@
+"""
+Benchmark: vectorized calculate_budget_split_batch vs looping calculate_budget_split.
+
+Run from the repo root:
+    python -m benchmarks.budget_batch [--step 5000]
+"""
+import argparse
+import itertools
+import time
+
+import numpy as np
+
+from utils.travel_utils import calculate_budget_split, calculate_budget_split_batch, budget_scenario_grid
+
+INTERESTS = ["Culture", "Food", "Adventure", "Relaxation", "Nightlife", "History", "Museums"]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--step", type=int, default=5000, help="budget step between 5k and 200k")
+    parser.add_argument("--max-combo", type=int, default=2, help="largest interest combination size")
+    args = parser.parse_args()
+
+    interest_sets = [
+        combo for r in range(args.max_combo + 1) for combo in itertools.combinations(INTERESTS, r)
+    ]
+    grid = budget_scenario_grid(
+        range(5000, 200001, args.step), range(1, 31), range(1, 11), interest_sets
+    )
+    print(f"{len(grid):,} scenarios")
+
+    start = time.perf_counter()
+    batch = calculate_budget_split_batch(grid)
+    batch_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    scalar = [
+        calculate_budget_split(row.total_budget, int(row.days), list(row.interests), int(row.travelers))
+        for row in grid.itertuples(index=False)
+    ]
+    loop_s = time.perf_counter() - start
+
+    for category in scalar[0]["breakdown"]:
+        expected = np.array([r["breakdown"][category] for r in scalar])
+        assert np.array_equal(batch[category].to_numpy(), expected), category
+    expected = np.array([r["daily_per_person"] for r in scalar])
+    assert np.array_equal(batch["daily_per_person"].to_numpy(), expected), "daily_per_person"
+
+    print(f"loop : {loop_s:8.3f} s")
+    print(f"batch: {batch_s:8.3f} s  ({loop_s / batch_s:,.0f}x faster, results identical)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+"""
+End-to-end benchmark against local fakes of Groq, Nominatim, OSRM and FX.
+
+Starts benchmarks.fake_services on a free port, points the app at it through
+GROQ_BASE_URL / NOMINATIM_URL / OSRM_URL / FX_API_URL, then drives:
+
+  itinerary         generate_itinerary for a fresh trip
+  create_map        create_map over geocoded stops plus an OSRM route
+  convert_currency  convert_currency after an FX table refresh
+  app               the full app.main flow (form -> plan -> results) via AppTest
+
+Caches are cleared before every operation unless --warm is given, so each
+run measures the upstream path; cold runs go one at a time, since clearing
+shared caches under a concurrent operation would skew it. --concurrency
+applies to --warm runs. Reports p50/p95/p99 latency and throughput
+per scenario; --json saves the report and --compare prints the change
+against a saved one, so results can be tracked commit to commit.
+
+    python -m benchmarks.e2e [--iterations 20] [--concurrency 4] [--latency 0.05]
+                             [--error-rate 0] [--payload-scale 1] [--scenarios itinerary,app]
+                             [--json report.json] [--compare baseline.json]
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.fake_services import FakeConfig, FakeServer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCENARIOS = ("itinerary", "create_map", "convert_currency", "app")
+
+
+def configure_env(url):
+    """Must run before utils.* is imported: endpoints and cache paths are read at import time."""
+    os.environ.update({
+        "GROQ_API_KEY": "fake",
+        "GROQ_BASE_URL": url,
+        "NOMINATIM_URL": url,
+        "OSRM_URL": url,
+        "FX_API_URL": url + "/v6/latest/{base}",
+        "NOMINATIM_RPS": "0",          # the public-API courtesy limit would dominate timings
+        "ITINERARY_CACHE_PATH": "",
+        "GEOCODE_CACHE_PATH": "",
+        "FX_SNAPSHOT_PATH": "",
+        "TRIP_HISTORY_PATH": "",
+        "STREAMLIT_LOGGER_LEVEL": "error",
+    })
+
+
+def clear_caches():
+    """Drops every cache and store a cold run should not find populated."""
+    from utils import autocomplete, history
+    from utils.itinerary_ai import itinerary_cache, suggestion_cache
+    from utils.maps import geocode_cache, route_cache, _map_html_cache
+
+    itinerary_cache.clear()
+    suggestion_cache.clear()
+    geocode_cache.clear()
+    route_cache.clear()
+    _map_html_cache.clear()
+    # Rebuilt on next use, as in a fresh process
+    with autocomplete._index_lock:
+        autocomplete._index = None
+    # Saved trips would make "open trip" and the history listing warm
+    with history._history_lock:
+        history._history = history.TripHistory("")
+
+
+# -------------------- Scenarios --------------------
+def op_itinerary(i, args):
+    from utils.itinerary_ai import generate_itinerary
+    from utils.travel_utils import calculate_budget_split
+
+    budget = calculate_budget_split(5000 + i, args.days, ["Food", "Culture"], 2, "INR")
+    result = generate_itinerary(f"City {i}", args.days, budget, ["Food", "Culture"], "Budget")
+    return result.ok
+
+
+def op_create_map(i, args):
+    from utils.maps import create_map
+
+    stops = [f"Stop {i}.{k}" for k in range(args.stops)]
+    days = [1 + k * args.days // args.stops for k in range(args.stops)]
+    create_map(f"City {i}", stops, days)
+    return True
+
+
+def op_convert_currency(i, args):
+    from utils.travel_utils import convert_currency, rate_table
+
+    if not args.warm:
+        rate_table.refresh(force=True)
+    return convert_currency(1000 + i, "INR", "EUR") != 1000 + i
+
+
+def op_app(i, args):
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(os.path.join(ROOT, "app.py"), default_timeout=120).run()
+    at.text_input[0].set_value(f"City {i}")
+    at.number_input[1].set_value(args.days)
+    at.button[0].click().run()
+    return not at.exception and at.session_state["trip_id"] is not None
+
+
+OPS = {
+    "itinerary": op_itinerary,
+    "create_map": op_create_map,
+    "convert_currency": op_convert_currency,
+    "app": op_app,
+}
+
+
+# -------------------- Runner --------------------
+def percentile(ordered, q):
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+def run_scenario(name, args):
+    op = OPS[name]
+    # AppTest drives a whole script run and is not meant to be shared across threads,
+    # and a cold run must not have the caches cleared under it by another worker
+    concurrency = 1 if name == "app" or not args.warm else args.concurrency
+
+    def timed(i):
+        if not args.warm:
+            clear_caches()
+        started = time.perf_counter()
+        try:
+            ok = op(i, args)
+        except Exception as e:
+            print(f"  {name}[{i}] failed: {e}")
+            ok = False
+        return time.perf_counter() - started, ok
+
+    op(-1, args)  # warm-up: imports, gazetteer index, connection pools
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(timed, range(args.iterations)))
+    wall = time.perf_counter() - started
+
+    ordered = sorted(t for t, _ in results)
+    return {
+        "iterations": len(results),
+        "concurrency": concurrency,
+        "errors": sum(1 for _, ok in results if not ok),
+        "p50_ms": round(percentile(ordered, 0.50) * 1000, 2),
+        "p95_ms": round(percentile(ordered, 0.95) * 1000, 2),
+        "p99_ms": round(percentile(ordered, 0.99) * 1000, 2),
+        "mean_ms": round(statistics.mean(ordered) * 1000, 2),
+        "throughput_per_s": round(len(results) / wall, 2) if wall else 0.0,
+    }
+
+
+def print_report(report, baseline=None):
+    cols = ("p50_ms", "p95_ms", "p99_ms", "mean_ms", "throughput_per_s", "errors")
+    print(f"{'scenario':<18}" + "".join(f"{c:>18}" for c in cols))
+    for name, row in report["scenarios"].items():
+        cells = []
+        for c in cols:
+            cell = f"{row[c]}"
+            old = (baseline or {}).get("scenarios", {}).get(name, {}).get(c)
+            if old and c != "errors":
+                cell += f" ({(row[c] - old) / old * 100:+.0f}%)"
+            cells.append(f"{cell:>18}")
+        print(f"{name:<18}" + "".join(cells))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=4, help="workers for --warm runs; cold runs use 1")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS))
+    parser.add_argument("--days", type=int, default=3, help="trip length for itinerary/app runs")
+    parser.add_argument("--stops", type=int, default=8, help="stops per map for create_map")
+    parser.add_argument("--latency", type=float, default=0.05, help="fake upstream latency, seconds")
+    parser.add_argument("--jitter", type=float, default=0.01)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--payload-scale", type=int, default=1)
+    parser.add_argument("--warm", action="store_true", help="keep caches between operations")
+    parser.add_argument("--json", help="write the report to this file")
+    parser.add_argument("--compare", help="baseline report to diff against")
+    args = parser.parse_args()
+
+    names = [n.strip() for n in args.scenarios.split(",") if n.strip()]
+    unknown = set(names) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    os.chdir(ROOT)  # app.py loads utils/styles.css relative to the working directory
+    config = FakeConfig(args.latency, args.jitter, args.error_rate, args.payload_scale)
+    with FakeServer(config) as server:
+        configure_env(server.url)
+        report = {
+            "config": {k: v for k, v in vars(args).items() if k not in ("json", "compare")},
+            "scenarios": {},
+        }
+        for name in names:
+            print(f"running {name} ...", file=sys.stderr)
+            report["scenarios"][name] = run_scenario(name, args)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    print_report(report, baseline)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
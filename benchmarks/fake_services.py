@@ -0,0 +1,299 @@
+"""
+Local stand-ins for every upstream the planner calls:
+
+  POST /openai/v1/chat/completions   Groq (plain JSON or streamed SSE)
+  GET  /search?q=...                 Nominatim
+  GET  /route/v1/driving/{coords}    OSRM (encoded polyline geometry)
+  GET  /v6/latest/{base}             open.er-api exchange rates
+
+Responses are deterministic and well-formed, sent after a configurable delay
+and with a configurable error rate, and payload_scale grows them (more
+itinerary segments, denser route geometry, more search hits), so batch jobs
+and benchmarks run without network access or API spend.
+
+    python -m benchmarks.fake_services --port 8900 --latency 0.5 --error-rate 0.02
+    GROQ_API_KEY=fake GROQ_BASE_URL=http://127.0.0.1:8900 \
+    NOMINATIM_URL=http://127.0.0.1:8900 OSRM_URL=http://127.0.0.1:8900 \
+    FX_API_URL='http://127.0.0.1:8900/v6/latest/{base}' python scripts/batch_generate.py trips.csv
+"""
+import argparse
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+from urllib.parse import parse_qs, unquote, urlsplit
+
+_DAYS_RE = re.compile(r"Create a (\d+)-day itinerary for (.+?)\.")
+_CURRENCY_RE = re.compile(r'"currency": "([A-Z]{3})"')
+_RANGE_RE = re.compile(r"These are days (\d+)-(\d+) of")
+_BUDGET_RE = re.compile(r"Total Budget: ([\d.]+)")
+
+
+@dataclass
+class FakeConfig:
+    latency: float = 0.0        # mean seconds before responding
+    jitter: float = 0.0         # +/- uniform seconds around latency
+    error_rate: float = 0.0     # fraction of requests answered with HTTP 500
+    payload_scale: int = 1      # repeat activity segments to grow responses
+    stream_chunk: int = 64      # characters per streamed delta
+
+
+def fake_itinerary(prompt: str, scale: int = 1) -> dict:
+    """Deterministic itinerary JSON shaped like the real model output."""
+    match = _DAYS_RE.search(prompt)
+    days = int(match.group(1)) if match else 3
+    city = match.group(2) if match else "Somewhere"
+    currency_match = _CURRENCY_RE.search(prompt)
+    currency = currency_match.group(1) if currency_match else "INR"
+
+    range_match = _RANGE_RE.search(prompt)
+    first = int(range_match.group(1)) if range_match else 1
+    budget_match = _BUDGET_RE.search(prompt)
+    # Spend about 90% of the budget, like a model that follows the prompt
+    unit = float(budget_match.group(1)) * 0.9 / (days * 3 * scale) if budget_match else 100.0
+
+    cards, total = [], 0
+    for day in range(first, first + days):
+        segments = []
+        for part in ("Morning", "Afternoon", "Evening"):
+            for k in range(scale):
+                cost = round(unit * (0.85 + 0.1 * ((day + k) % 4)))
+                total += cost
+                segments.append(
+                    f"<div class='segment'><strong>{part}</strong>: Visit {city} Landmark {day}.{k} "
+                    f"<span class='price-tag'>Cost: {cost} {currency}</span></div>"
+                )
+        cards.append(f"<div class='day-card'><h3>Day {day}</h3>{''.join(segments)}</div>")
+    summary = "" if range_match else (
+        "<div class='cost-summary'><table>"
+        f"<tr><td><strong>Total</strong></td><td><strong>{total} {currency}</strong></td></tr>"
+        "</table></div>"
+    )
+    return {
+        "html": "".join(cards) + summary,
+        "locations": [f"{city} Landmark {d}" for d in range(first, first + days)],
+        "total_cost": total,
+        "currency": currency,
+    }
+
+
+def _unit(text: str, salt: str = "") -> float:
+    """Stable pseudo-random number in [0, 1) for text."""
+    digest = hashlib.blake2b(f"{salt}:{text}".encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little") / 2 ** 64
+
+
+def fake_search(query: str, scale: int = 1) -> list:
+    """Nominatim-style hits scattered around Mumbai; names containing 'nowhere' are not found."""
+    if not query or "nowhere" in query.casefold():
+        return []
+    hits = []
+    for k in range(max(1, scale)):
+        lat = 19.0 + 0.2 * _unit(query, f"lat{k}")
+        lon = 72.8 + 0.2 * _unit(query, f"lon{k}")
+        hits.append({
+            "place_id": int(_unit(query, f"id{k}") * 1e9),
+            "lat": f"{lat:.7f}", "lon": f"{lon:.7f}",
+            "display_name": f"{query}, Fake District, Fakeland",
+            "class": "tourism", "type": "attraction", "importance": 0.5 - 0.01 * k,
+        })
+    return hits
+
+
+def fake_route(coord_str: str, scale: int = 1) -> dict:
+    """OSRM route through the given lon,lat waypoints with 200 * scale vertices per leg."""
+    import polyline
+
+    waypoints = [tuple(map(float, p.split(",")))[::-1] for p in coord_str.split(";") if p]
+    if len(waypoints) < 2:
+        return {"code": "InvalidQuery", "message": "need at least two coordinates"}
+    per_leg = 200 * max(1, scale)
+    geometry, distance = [], 0.0
+    for (lat1, lon1), (lat2, lon2) in zip(waypoints, waypoints[1:]):
+        for i in range(per_leg):
+            t = i / per_leg
+            wiggle = 0.0005 * ((i % 7) - 3) / 3
+            geometry.append((lat1 + (lat2 - lat1) * t + wiggle, lon1 + (lon2 - lon1) * t))
+        distance += 111_000 * ((lat2 - lat1) ** 2 + (lon2 - lon1) ** 2) ** 0.5 * 1.3
+    geometry.append(waypoints[-1])
+    return {
+        "code": "Ok",
+        "routes": [{
+            "geometry": polyline.encode(geometry, 5),
+            "distance": round(distance, 1),
+            "duration": round(distance / 8.0, 1),
+        }],
+        "waypoints": [{"location": [lon, lat]} for lat, lon in waypoints],
+    }
+
+
+def fake_rates(base: str) -> dict:
+    """open.er-api style table with a stable rate for every currency the app knows."""
+    from utils.travel_utils import CURRENCIES
+
+    codes = sorted(set(CURRENCIES) | {"USD", base})
+    raw = {c: 1.0 if c == "USD" else round(0.2 + 200 * _unit(c, "fx"), 4) for c in codes}
+    return {
+        "result": "success",
+        "base_code": base,
+        "time_last_update_unix": int(time.time()),
+        "rates": {c: round(v / raw[base], 6) for c, v in raw.items()},
+    }
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    config: FakeConfig = FakeConfig()
+
+    def log_message(self, *args):
+        pass
+
+    def _delay(self):
+        cfg = self.config
+        delay = cfg.latency + random.uniform(-cfg.jitter, cfg.jitter)
+        if delay > 0:
+            time.sleep(delay)
+
+    def _fail(self) -> bool:
+        if random.random() < self.config.error_rate:
+            self._send_json({"error": {"message": "fake upstream error"}}, status=500)
+            return True
+        return False
+
+    def _send_json(self, payload, status=200):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_json(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        path = parts.path.rstrip("/")
+        scale = self.config.payload_scale
+        if path.endswith("/search"):
+            query = parse_qs(parts.query).get("q", [""])[0]
+            payload = lambda: fake_search(query, scale)
+        elif "/route/v1/" in path:
+            coord_str = unquote(path.rsplit("/", 1)[-1])
+            payload = lambda: fake_route(coord_str, scale)
+        elif "/latest/" in path:
+            base = path.rsplit("/", 1)[-1].upper()
+            payload = lambda: fake_rates(base)
+        else:
+            self._send_json({"error": {"message": "not found"}}, status=404)
+            return
+        self._delay()
+        if self._fail():
+            return
+        self._send_json(payload())
+
+    def do_POST(self):
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send_json({"error": {"message": "not found"}}, status=404)
+            return
+        body = self._read_json()
+        self._delay()
+        if self._fail():
+            return
+        prompt = "\n".join(m.get("content", "") for m in body.get("messages", []))
+        if "travel destinations" in prompt:
+            content = "\n".join(f"{i}. **Fake City {i}, Fakeland**: Cheap hostels and street food." for i in (1, 2, 3))
+        else:
+            content = json.dumps(fake_itinerary(prompt, self.config.payload_scale))
+        usage = {
+            "prompt_tokens": len(prompt) // 4,
+            "completion_tokens": len(content) // 4,
+            "total_tokens": (len(prompt) + len(content)) // 4,
+        }
+        base = {"id": "chatcmpl-fake", "created": int(time.time()), "model": body.get("model", "fake")}
+        if body.get("stream"):
+            self._stream(content, base)
+            return
+        self._send_json(dict(base, object="chat.completion", usage=usage, choices=[{
+            "index": 0, "finish_reason": "stop",
+            "message": {"role": "assistant", "content": content},
+        }]))
+
+    def _stream(self, content, base):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        def send(data: str):
+            payload = f"data: {data}\n\n".encode("utf-8")
+            self.wfile.write(f"{len(payload):X}\r\n".encode() + payload + b"\r\n")
+            self.wfile.flush()
+
+        step = max(1, self.config.stream_chunk)
+        for i in range(0, len(content), step):
+            send(json.dumps(dict(base, object="chat.completion.chunk", choices=[{
+                "index": 0, "finish_reason": None, "delta": {"content": content[i:i + step]},
+            }])))
+        send(json.dumps(dict(base, object="chat.completion.chunk", choices=[{
+            "index": 0, "finish_reason": "stop", "delta": {},
+        }])))
+        send("[DONE]")
+        self.wfile.write(b"0\r\n\r\n")
+
+
+class FakeServer:
+    """Runs a fake service on a background thread; use as a context manager."""
+    def __init__(self, config: Optional[FakeConfig] = None, host: str = "127.0.0.1", port: int = 0):
+        handler = type("Handler", (_Handler,), {"config": config or FakeConfig()})
+        self._server = ThreadingHTTPServer((host, port), handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeServer":
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--payload-scale", type=int, default=1)
+    args = parser.parse_args()
+
+    config = FakeConfig(args.latency, args.jitter, args.error_rate, args.payload_scale)
+    server = FakeServer(config, args.host, args.port)
+    print(f"Fake Groq/Nominatim/OSRM/FX listening on {server.url}")
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
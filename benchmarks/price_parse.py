@@ -0,0 +1,102 @@
+"""
+Benchmark: price-tag extraction and budget reconciliation on large itineraries.
+
+Builds a synthetic N-day itinerary HTML (default 30 days, shaped like the
+model output: day cards, segments, price tags and a cost-summary table) and
+times utils.pricing.scan_prices, the full reconcile_prices repair, and, when
+bs4 is installed, a BeautifulSoup tree walk extracting the same amounts.
+
+    python -m benchmarks.price_parse [--days 30] [--items 12] [--repeat 50]
+"""
+import argparse
+import re
+import statistics
+import time
+
+from utils.itinerary_ai import ItineraryResult
+from utils.pricing import reconcile_prices, scan_prices
+from utils.travel_utils import calculate_budget_split
+
+ITEMS = ("Check in at Zostel", "Breakfast at a local cafe", "Metro to the old town", "Fort walking tour",
+         "Street food lunch", "Museum entry", "Sunset at the lake", "Dinner at a dhaba")
+
+
+def synthetic_itinerary(days, items, currency="INR"):
+    cards, total = [], 0
+    for day in range(1, days + 1):
+        segments = []
+        for k in range(items):
+            cost = 150 + 37 * ((day * 7 + k * 13) % 23)
+            total += cost
+            segments.append(
+                f"<div class='segment'><strong>{('Morning', 'Afternoon', 'Evening')[k % 3]}</strong>: "
+                f"{ITEMS[(day + k) % len(ITEMS)]}, with a short note about what to see and how to get there "
+                f"<a href='https://www.google.com/search?q=place+{day}+{k}' target='_blank'>map</a> "
+                f"<span class='price-tag'>Cost: {cost:,} {currency}</span></div>"
+            )
+        cards.append(f"<div class='day-card'><h3>Day {day}</h3>{''.join(segments)}</div>")
+    rows = "".join(f"<tr><td>Day {d}</td><td>{total // days} {currency}</td></tr>" for d in range(1, days + 1))
+    summary = (f"<div class='cost-summary'><table>{rows}"
+               f"<tr><td><strong>Total</strong></td><td><strong>{total} {currency}</strong></td></tr></table></div>")
+    return "".join(cards) + summary, total
+
+
+def bs4_amounts(html):
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, "html.parser")
+    amounts = []
+    for span in soup.select("span.price-tag"):
+        m = re.search(r"\d[\d,]*(?:\.\d+)?", span.get_text())
+        if m:
+            amounts.append(float(m.group(0).replace(",", "")))
+    return amounts
+
+
+def timeit(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times) * 1000, max(times) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--items", type=int, default=12, help="price tags per day")
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    html, total = synthetic_itinerary(args.days, args.items)
+    # Stated total 8% above the tags and the budget set below it, so a local rescale is needed
+    budget = calculate_budget_split(total * 0.95, args.days, ["Food", "Culture"], 1, "INR")
+    result = ItineraryResult.from_dict({"html": html, "locations": [], "total_cost": round(total * 1.08),
+                                        "currency": "INR"})
+    scan = scan_prices(html)
+    assert scan.total == total and len(scan.tags) == args.days * args.items
+
+    print(f"payload: {len(html.encode('utf-8')) / 1024:.0f} KB, {args.days} days, {len(scan.tags)} price tags")
+    print(f"{'step':<22}{'median ms':>12}{'max ms':>12}")
+    rows = [
+        ("scan_prices", lambda: scan_prices(html)),
+        ("reconcile_prices", lambda: reconcile_prices(result, budget)),
+    ]
+    try:
+        import bs4  # noqa: F401
+        assert sum(bs4_amounts(html)) == total
+        rows.append(("bs4 price tags", lambda: bs4_amounts(html)))
+    except ImportError:
+        print("(bs4 not installed; skipping the BeautifulSoup comparison)")
+    for name, fn in rows:
+        median, worst = timeit(fn, args.repeat)
+        print(f"{name:<22}{median:>12.2f}{worst:>12.2f}")
+
+    repaired, check = reconcile_prices(result, budget)
+    print(f"check: tags {check.tags_total:g}, target {check.target:g}, gap {check.gap:.1%} -> {check.action}; "
+          f"repaired total {repaired.total_cost:g}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Benchmark: map HTML size and render time with and without route simplification.
+
+Builds a synthetic multi-stop driving route (a jittered random walk, similar
+in density to an OSRM overview=full response) and renders it through
+utils.maps.build_folium_map raw and simplified.
+
+    python -m benchmarks.route_simplify [--vertices 30000] [--tolerance 5] [--max-points 1500]
+"""
+import argparse
+import time
+
+import numpy as np
+import polyline
+
+from utils.geometry import simplify_line
+from utils.maps import build_folium_map
+
+
+def synthetic_route(vertices, seed=7):
+    rng = np.random.default_rng(seed)
+    heading = np.cumsum(rng.normal(0, 0.15, vertices))
+    step = 1e-4  # ~11 m between vertices, typical for full OSRM geometry
+    lat = 19.07 + np.cumsum(np.sin(heading) * step)
+    lon = 72.87 + np.cumsum(np.cos(heading) * step)
+    return list(zip(lat.round(5), lon.round(5)))
+
+
+def render(route, stops):
+    map_data = {
+        "city": "Benchmark",
+        "center": list(route[0]),
+        "zoom": 12,
+        "points": [{"name": f"Stop {i + 1}", "lat": lat, "lon": lon} for i, (lat, lon) in enumerate(stops)],
+        "route": polyline.encode(route),
+        "distance_m": 0,
+        "duration_s": 0,
+    }
+    start = time.perf_counter()
+    html = build_folium_map(map_data).get_root().render()
+    return len(html.encode("utf-8")), time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--vertices", type=int, default=30000)
+    parser.add_argument("--tolerance", type=float, default=5.0, help="metres")
+    parser.add_argument("--max-points", type=int, default=1500)
+    args = parser.parse_args()
+
+    route = synthetic_route(args.vertices)
+    stops = route[:: max(1, len(route) // 12)]
+
+    start = time.perf_counter()
+    simplified = simplify_line(route, tolerance_m=args.tolerance, max_points=args.max_points)
+    simplify_s = time.perf_counter() - start
+
+    full_size, full_s = render(route, stops)
+    small_size, small_s = render(simplified, stops)
+
+    print(f"simplify     : {len(route):,} -> {len(simplified):,} vertices in {simplify_s * 1000:.1f} ms")
+    print(f"full route   : {full_size / 1024:8.1f} KiB HTML, render {full_s * 1000:7.1f} ms")
+    print(f"simplified   : {small_size / 1024:8.1f} KiB HTML, render {small_s * 1000:7.1f} ms")
+    print(f"reduction    : {100 * (1 - small_size / full_size):.1f}% smaller, {full_s / small_s:.1f}x faster render")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Cold-start benchmark for the landing form.
+
+Each run starts a fresh interpreter, imports the app and renders the input
+form once with Streamlit's AppTest, then reports:
+  * time to import app.py and time to render the form
+  * the slowest imports (from -X importtime)
+  * whether any module that should load lazily was pulled in
+
+Exits non-zero when the median render time exceeds --max-seconds or when a
+lazy module is imported at startup, so it can gate CI.
+
+    python -m benchmarks.startup [--runs 5] [--max-seconds 3.0]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Must not be imported just to show the landing form
+LAZY_MODULES = ["pandas", "numpy", "groq", "bs4", "folium", "branca", "jinja2", "polyline", "dotenv",
+                "utils.itinerary_ai", "utils.maps"]
+
+_PROBE = r"""
+import json, sys, time
+start = time.perf_counter()
+import app
+imported = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+harness = time.perf_counter()
+loaded = set(sys.modules)
+at = AppTest.from_file("app.py", default_timeout=60).run()
+rendered = time.perf_counter()
+assert not at.exception, at.exception
+assert at.button, "form did not render"
+lazy = %r
+print(json.dumps({
+    "import_s": imported - start,
+    "render_s": rendered - harness,
+    "eager": [m for m in lazy if m in loaded or m in sys.modules],
+}))
+"""
+
+
+def _run_once():
+    env = dict(os.environ, ITINERARY_CACHE_PATH="", GEOCODE_CACHE_PATH="")
+    out = subprocess.run(
+        [sys.executable, "-c", _PROBE % LAZY_MODULES],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def _import_profile(top):
+    out = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app"],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    rows = []
+    for line in out.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        try:
+            rows.append((int(cumulative), name.strip()))
+        except ValueError:
+            continue
+    return sorted(rows, reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--max-seconds", type=float, default=3.0,
+                        help="fail if the median import + form render exceeds this")
+    parser.add_argument("--top", type=int, default=10, help="slowest imports to list")
+    args = parser.parse_args()
+
+    results = [_run_once() for _ in range(args.runs)]
+    imports = [r["import_s"] for r in results]
+    totals = [r["import_s"] + r["render_s"] for r in results]
+    eager = sorted({m for r in results for m in r["eager"]})
+
+    print("Slowest imports (cumulative):")
+    for micros, name in _import_profile(args.top):
+        print(f"  {micros / 1000:8.1f} ms  {name}")
+    print(f"import app   : median {statistics.median(imports) * 1000:.0f} ms")
+    print(f"form rendered: median {statistics.median(totals) * 1000:.0f} ms, max {max(totals) * 1000:.0f} ms")
+
+    failed = False
+    if eager:
+        print(f"FAIL: imported at startup but should be lazy: {', '.join(eager)}")
+        failed = True
+    if statistics.median(totals) > args.max_seconds:
+        print(f"FAIL: median startup above budget of {args.max_seconds:.2f} s")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
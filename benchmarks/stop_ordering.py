@@ -0,0 +1,47 @@
+"""
+Benchmark: local stop ordering (haversine matrix + nearest-neighbour + 2-opt).
+
+For each stop count, scatters points across a city-sized box and compares
+the straight-line path length in listed order against the optimized order.
+
+    python -m benchmarks.stop_ordering [--sizes 10 25 50 100 200] [--repeat 5]
+"""
+import argparse
+import statistics
+import time
+
+import numpy as np
+
+from utils.geometry import haversine_matrix
+from utils.routing import order_stops, path_length
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 25, 50, 100, 200])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--days", type=int, default=0, help="split stops into this many days")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    print(f"{'stops':>6} {'time ms':>9} {'listed km':>10} {'ordered km':>11} {'saved':>7}")
+    for n in args.sizes:
+        times, before, after = [], [], []
+        for _ in range(args.repeat):
+            coords = np.column_stack((
+                19.0 + rng.random(n) * 0.25,
+                72.8 + rng.random(n) * 0.25,
+            ))
+            days = sorted(rng.integers(1, args.days + 1, n).tolist()) if args.days else None
+            start = time.perf_counter()
+            order = order_stops(coords, days)
+            times.append(time.perf_counter() - start)
+            dist = haversine_matrix(coords)
+            before.append(path_length(dist, range(n)) / 1000)
+            after.append(path_length(dist, order) / 1000)
+        b, a = statistics.mean(before), statistics.mean(after)
+        print(f"{n:>6} {statistics.median(times) * 1000:>9.2f} {b:>10.1f} {a:>11.1f} {100 * (1 - a / b):>6.1f}%")
+
+
+if __name__ == "__main__":
+    main()
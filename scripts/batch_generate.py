@@ -0,0 +1,57 @@
+"""
+Headless batch itinerary generator.
+
+Reads trip requests from CSV or JSONL (columns/keys: id, place or city,
+country, days, budget, travelers, interests separated by ';', travel_type,
+currency), generates them concurrently and appends one JSON line per
+finished trip to the output file. Re-running with the same output resumes
+after the last successful trip.
+
+    python scripts/batch_generate.py trips.csv -o itineraries.jsonl --concurrency 8 --rpm 30 --tpm 180000
+
+Set GROQ_BASE_URL to run against a local fake server, e.g.
+    python -m benchmarks.fake_services --port 8900 &
+    GROQ_API_KEY=fake GROQ_BASE_URL=http://127.0.0.1:8900 python scripts/batch_generate.py ...
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.batch import normalize_request, read_requests, run_batch
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("input", help="trip requests (.csv or .jsonl)")
+    parser.add_argument("-o", "--output", default="itineraries.jsonl")
+    parser.add_argument("--concurrency", type=int, default=8, help="max requests in flight")
+    parser.add_argument("--rpm", type=float, default=30, help="requests per minute (0 = unlimited)")
+    parser.add_argument("--tpm", type=float, default=180000, help="tokens per minute (0 = unlimited)")
+    parser.add_argument("--regenerate", action="store_true", help="ignore the itinerary cache")
+    parser.add_argument("--no-resume", action="store_true", help="redo trips already in the output")
+    args = parser.parse_args()
+
+    requests, invalid = [], 0
+    for i, raw in enumerate(read_requests(args.input), start=1):
+        try:
+            requests.append(normalize_request(raw))
+        except (ValueError, TypeError) as e:
+            invalid += 1
+            print(f"Skipping row {i}: {e}", file=sys.stderr)
+
+    summary = asyncio.run(run_batch(
+        requests, args.output,
+        concurrency=args.concurrency, rpm=args.rpm, tpm=args.tpm,
+        regenerate=args.regenerate, resume=not args.no_resume,
+    ))
+    summary["invalid"] = invalid
+    print(json.dumps(summary, indent=2))
+    sys.exit(1 if summary["failed"] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+"""
+Compiles the offline gazetteer CSV into the memory-mapped index used by
+utils.gazetteer.
+
+    python scripts/build_gazetteer.py [--csv data/gazetteer.csv] [--out .cache/gazetteer]
+
+CSV columns: name,kind,country,lat,lon,aliases (aliases separated by ';').
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.gazetteer import GAZETTEER_CSV, GAZETTEER_INDEX, Gazetteer, build_index
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--csv", default=GAZETTEER_CSV)
+    parser.add_argument("--out", default=GAZETTEER_INDEX)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    count = build_index(args.csv, args.out)
+    print(f"Wrote {count} keys to {args.out} in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    index = Gazetteer(args.out)
+    probe = "Gateway of India"
+    start = time.perf_counter()
+    for _ in range(1000):
+        place = index.lookup(probe)
+    per_lookup = (time.perf_counter() - start) / 1000
+    print(f"lookup({probe!r}) -> {place} in {per_lookup * 1e6:.1f} us")
+
+
+if __name__ == "__main__":
+    main()
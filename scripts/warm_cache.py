@@ -0,0 +1,78 @@
+"""
+Cache warm-up job for popular destinations.
+
+Precomputes destination suggestions, itineraries for the common
+budget/days/style combinations, and the geocodes and route geometries their
+maps need, so the first visitor of the day for a popular city gets cache
+hits. Runs on a bounded worker pool and stops starting new LLM calls once
+the token or call limit would be exceeded; entries already cached are free.
+
+    python scripts/warm_cache.py --workers 4 --max-tokens 200000
+    python scripts/warm_cache.py --destinations "Goa:India,Kyoto:Japan" --days 3,7 --every 6
+
+Schedule it with cron, or keep it running with --every HOURS.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.warmer import (
+    POPULAR_DESTINATIONS, WARM_BUDGETS, WARM_DAYS, WARM_STYLES,
+    popular_trips, warm_cache, worst_case_spend,
+)
+
+
+def _csv(value, cast=str):
+    return [cast(v.strip()) for v in value.split(",") if v.strip()]
+
+
+def _destinations(value):
+    pairs = []
+    for item in _csv(value):
+        city, _, country = item.rpartition(":")
+        # "India" alone warms the country itself, like leaving the city field empty
+        pairs.append((city or country, country))
+    return pairs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--destinations", type=_destinations, default=POPULAR_DESTINATIONS,
+                        help="comma-separated City:Country pairs (or bare countries)")
+    parser.add_argument("--days", type=lambda v: _csv(v, int), default=list(WARM_DAYS))
+    parser.add_argument("--budgets", type=lambda v: _csv(v, float), default=list(WARM_BUDGETS))
+    parser.add_argument("--styles", type=_csv, default=list(WARM_STYLES))
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--max-tokens", type=int, default=200000, help="worst-case token spend per run")
+    parser.add_argument("--max-calls", type=int, default=None, help="LLM calls per run")
+    parser.add_argument("--no-suggestions", action="store_true")
+    parser.add_argument("--no-maps", action="store_true", help="skip geocode/route warm-up")
+    parser.add_argument("--every", type=float, default=0, help="repeat every N hours (0 = run once)")
+    parser.add_argument("--dry-run", action="store_true", help="list the trips and worst-case spend only")
+    args = parser.parse_args()
+
+    trips = popular_trips(args.destinations, args.days, args.budgets, args.styles)
+    if args.dry_run:
+        calls, tokens = worst_case_spend(trips, suggestions=not args.no_suggestions)
+        for t in trips:
+            print(f"{t.place} ({t.country}, {t.currency}) {t.days}d {t.budget:g} {t.travel_type}")
+        print(f"{len(trips)} trips, worst case {calls} LLM calls and {tokens} tokens before caching")
+        return
+
+    while True:
+        summary = warm_cache(
+            trips, workers=args.workers, max_tokens=args.max_tokens, max_calls=args.max_calls,
+            suggestions=not args.no_suggestions, with_maps=not args.no_maps,
+        )
+        print(json.dumps(summary, indent=2), flush=True)
+        if args.every <= 0:
+            break
+        time.sleep(args.every * 3600)
+
+
+if __name__ == "__main__":
+    main()
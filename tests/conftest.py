@@ -0,0 +1,8 @@
+import os
+import sys
+
+# Keep every cache and the trip history in memory while testing
+for var in ("ITINERARY_CACHE_PATH", "GEOCODE_CACHE_PATH", "TRIP_HISTORY_PATH"):
+    os.environ.setdefault(var, "")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
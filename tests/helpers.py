@@ -0,0 +1,60 @@
+import json
+import re
+from types import SimpleNamespace
+
+from utils.itinerary_ai import ItineraryResult
+
+
+def day_card(day, *amounts, place="Fort"):
+    segments = "".join(
+        f"<div class='segment'>Visit {place} {day}.{i} "
+        f"<span class='price-tag'>Cost: {amount} INR</span></div>"
+        for i, amount in enumerate(amounts)
+    )
+    return f"<div class='day-card'><h3>Day {day}</h3>{segments}</div>"
+
+
+def cost_summary(rows, total):
+    body = "".join(f"<tr><td>{label}</td><td>{amount} INR</td></tr>" for label, amount in rows)
+    return (f"<div class='cost-summary'><table>{body}"
+            f"<tr><td><strong>Total</strong></td><td><strong>{total} INR</strong></td></tr></table></div>")
+
+
+def itinerary(cards, total_cost, summary=True, locations=()):
+    html = "".join(cards)
+    if summary:
+        from utils.pricing import scan_prices
+        by_day = scan_prices(html).by_day()
+        html += cost_summary([(f"Day {d}", int(v)) for d, v in sorted(by_day.items())], total_cost)
+    return ItineraryResult.from_dict({"html": html, "locations": list(locations),
+                                      "total_cost": total_cost, "currency": "INR"})
+
+
+class FakeClient:
+    """
+    Stand-in for the Groq client: answers every itinerary prompt with one
+    100 INR day-card per requested day and records the max_tokens asked for.
+    """
+    def __init__(self):
+        self.calls = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, messages, max_tokens, **kwargs):
+        self.calls.append(max_tokens)
+        prompt = messages[-1]["content"]
+        found = re.search(r"days (\d+)-(\d+) of a", prompt)
+        if found:
+            first, last = int(found.group(1)), int(found.group(2))
+        else:
+            first, last = 1, int(re.search(r"Create a (\d+)-day", prompt).group(1))
+        days = range(first, last + 1)
+        answer = {"html": "".join(day_card(d, 100) for d in days),
+                  "locations": [f"Fort {d}.0" for d in days], "total_cost": 100 * len(days)}
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=json.dumps(answer)))],
+                               usage=SimpleNamespace(total_tokens=10))
+
+
+class FakeAsyncClient(FakeClient):
+    """FakeClient for the AsyncGroq interface."""
+    async def create(self, messages, max_tokens, **kwargs):
+        return FakeClient.create(self, messages, max_tokens, **kwargs)
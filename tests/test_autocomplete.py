@@ -0,0 +1,58 @@
+import pytest
+
+from utils.autocomplete import PlaceIndex, get_place_index
+
+PLACES = [
+    ("India", "country", "India", ["Bharat"]),
+    ("Mumbai", "city", "India", ["Bombay"]),
+    ("Delhi", "city", "India", ["New Delhi"]),
+    ("Jaipur", "city", "India", []),
+    ("Cairo", "city", "Egypt", []),
+    ("Sydney", "city", "Australia", []),
+    ("New York", "city", "United States", ["NYC"]),
+]
+
+
+@pytest.fixture(scope="module")
+def index():
+    return PlaceIndex(PLACES)
+
+
+def test_prefix_and_word_prefix_suggestions(index):
+    assert [s.name for s in index.suggest("mum")] == ["Mumbai"]
+    assert index.suggest("york")[0].name == "New York"
+    assert index.suggest("bomb")[0].matched == "Bombay"
+    assert index.suggest("") == []
+
+
+def test_country_ranks_first(index):
+    assert index.suggest("del", country="India")[0].name == "Delhi"
+    assert index.suggest("cai", country="Egypt")[0].name == "Cairo"
+
+
+def test_exact_names_and_aliases_resolve_anywhere(index):
+    assert index.resolve("bombay").name == "Mumbai"
+    assert index.resolve("Cairo", country="India").name == "Cairo"
+    assert index.resolve("NYC", country="India").name == "New York"
+
+
+def test_typos_are_fixed_inside_the_selected_country(index):
+    assert index.resolve("Dehli", country="India").name == "Delhi"
+    assert index.resolve("Mumbay", country="India").name == "Mumbai"
+
+
+def test_fuzzy_matches_stay_in_the_selected_country(index):
+    # Not in the index; the look-alike is in another country or none is selected
+    assert index.resolve("Cairns", country="Australia") is None
+    assert index.resolve("Mumbay") is None
+    assert index.resolve("Dehli", country="Egypt") is None
+
+
+def test_half_typed_names_are_not_completed(index):
+    assert index.resolve("Jaip", country="India") is None
+
+
+def test_bundled_index_keeps_unknown_towns():
+    index = get_place_index()
+    assert index.resolve("Cairns", country="Australia") is None
+    assert index.resolve("Mumbay", country="India").name == "Mumbai"
@@ -0,0 +1,42 @@
+import asyncio
+import json
+
+import pytest
+
+from utils import batch
+from utils.batch import normalize_request, run_batch
+from utils.itinerary_ai import PROMPT_TOKENS_ESTIMATE, day_ranges, estimate_itinerary_tokens
+
+from helpers import FakeAsyncClient
+
+
+@pytest.mark.parametrize("days", [0, "0", -2])
+def test_rejects_trips_without_days(days):
+    with pytest.raises(ValueError):
+        normalize_request({"place": "Goa", "days": days})
+
+
+def test_defaults():
+    req = normalize_request({"city": "Goa", "country": "India"})
+    assert (req["place"], req["days"], req["currency"]) == ("Goa", 3, "INR")
+    assert req["id"] == normalize_request({"place": "goa", "country": "India"})["id"]
+
+
+def test_reserves_one_request_and_prompt_per_chunk(tmp_path, monkeypatch):
+    acquired = []
+    acquire = batch.TokenBucket.acquire
+
+    async def spy(self, amount=1.0):
+        acquired.append(amount)
+        await acquire(self, amount)
+
+    monkeypatch.setattr(batch.TokenBucket, "acquire", spy)
+    out = tmp_path / "out.jsonl"
+    req = normalize_request({"place": "Batch Long Town", "days": 10, "budget": 10000})
+    summary = asyncio.run(run_batch([req], str(out), rpm=600, tpm=10 ** 6, client=FakeAsyncClient()))
+
+    calls = len(day_ranges(10))
+    assert summary["ok"] == 1 and summary["tokens"] == 10 * calls
+    # Request bucket first, then the token bucket
+    assert acquired == [calls, estimate_itinerary_tokens(10) + calls * PROMPT_TOKENS_ESTIMATE]
+    assert json.loads(out.read_text())["result"]["total_cost"] == 1000
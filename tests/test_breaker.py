@@ -0,0 +1,66 @@
+import time
+
+import pytest
+
+from utils.breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError
+
+OPEN_S = 0.05
+
+
+def tripped(name):
+    breaker = CircuitBreaker(name, window_s=60, min_calls=4, failure_rate=0.5, slow_call_s=1.0, open_s=OPEN_S)
+    for _ in range(4):
+        assert breaker.allow()
+        breaker.record(False, 0.01)
+    return breaker
+
+
+def test_stays_closed_below_min_calls_and_failure_rate():
+    breaker = CircuitBreaker("t-closed", window_s=60, min_calls=4, failure_rate=0.5, open_s=OPEN_S)
+    for _ in range(3):
+        breaker.record(False, 0.01)
+    assert breaker.state == CLOSED      # too few calls to judge
+    breaker = CircuitBreaker("t-rate", window_s=60, min_calls=4, failure_rate=0.5, open_s=OPEN_S)
+    for ok in (True, True, True, False, True, False):
+        breaker.record(ok, 0.01)
+    assert breaker.state == CLOSED      # 2 of 6 bad
+
+
+def test_opens_after_failures_and_rejects_calls():
+    breaker = tripped("t-open")
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+    with pytest.raises(CircuitOpenError):
+        with breaker.guard():
+            pass
+    assert breaker.stats()["rejected"] == 2
+
+
+def test_slow_calls_count_as_bad():
+    breaker = CircuitBreaker("t-slow", window_s=60, min_calls=2, failure_rate=1.0, slow_call_s=0.5, open_s=OPEN_S)
+    breaker.record(True, 0.6)
+    breaker.record(True, 0.7)
+    assert breaker.state == OPEN
+
+
+def test_half_open_lets_one_probe_and_success_closes():
+    breaker = tripped("t-probe-ok")
+    time.sleep(OPEN_S * 1.5)
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow()
+    assert not breaker.allow()          # only one probe at a time
+    breaker.record(True, 0.01)
+    assert breaker.state == CLOSED
+    assert breaker.stats()["window_calls"] == 0
+    assert breaker.allow()
+
+
+def test_failed_probe_reopens():
+    breaker = tripped("t-probe-fail")
+    time.sleep(OPEN_S * 1.5)
+    with pytest.raises(ValueError):
+        with breaker.guard():
+            raise ValueError("still down")
+    assert breaker.state == OPEN
+    assert breaker.stats()["opened"] == 2
+    assert not breaker.allow()
@@ -0,0 +1,73 @@
+import time
+
+from utils.cache import MISS, LRUCache, SQLiteCache, TieredCache, normalize_key
+
+
+def test_lru_evicts_least_recently_used():
+    cache = LRUCache(max_size=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1          # "b" is now the oldest
+    cache.set("c", 3)
+    assert cache.get("b") is MISS
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert len(cache) == 2
+
+
+def test_lru_expires_entries():
+    cache = LRUCache()
+    cache.set("a", 1, ttl=0.05)
+    cache.set("b", 2, ttl=60)
+    time.sleep(0.06)
+    assert cache.get("a") is MISS
+    assert cache.get("b") == 2
+
+
+def test_sqlite_ttl_and_max_entries(tmp_path):
+    store = SQLiteCache(str(tmp_path / "cache.sqlite"), max_entries=2)
+    store.set("old", {"v": 1}, ttl=0.05)
+    store.set("keep", [1, 2], ttl=60)
+    time.sleep(0.06)
+    assert store.get("old") is MISS
+    store.set("a", "x")
+    store.set("b", "y")
+    assert len(store) == 2
+    assert store.get("keep") is MISS     # least recently used row evicted
+    assert store.get("b") == "y"
+
+
+def test_tiered_negative_ttl_is_shorter(tmp_path):
+    cache = TieredCache(LRUCache(), SQLiteCache(str(tmp_path / "t.sqlite")), ttl=60, negative_ttl=0.05)
+    cache.set("found", [1.0, 2.0])
+    cache.set("missing", None)
+    assert cache.get("missing") is None  # a cached "not found", not a miss
+    time.sleep(0.06)
+    assert cache.get("missing") is MISS
+    assert cache.get("found") == [1.0, 2.0]
+
+
+def test_tiered_promotes_disk_hits_and_counts_tiers(tmp_path):
+    disk = SQLiteCache(str(tmp_path / "t.sqlite"))
+    cache = TieredCache(LRUCache(), disk, ttl=60)
+    cache.set("k", "v")
+    cache.memory.clear()
+    assert cache.get("k") == "v"         # from disk
+    assert cache.get("k") == "v"         # promoted to memory
+    assert cache.get("other") is MISS
+    stats = cache.stats()
+    assert (stats["disk_hits"], stats["memory_hits"], stats["misses"]) == (1, 1, 1)
+    assert stats["hit_rate"] == round(2 / 3, 4)
+
+
+def test_normalize_key():
+    assert normalize_key("  New   York ") == normalize_key("new york")
+
+
+def test_peek_does_not_count(tmp_path):
+    cache = TieredCache(LRUCache(), SQLiteCache(str(tmp_path / "t.sqlite")), ttl=60)
+    cache.set("k", "v")
+    cache.memory.clear()
+    assert cache.peek("k") == "v" and cache.peek("other") is MISS
+    assert len(cache.memory) == 0
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"]) == (0, 0)
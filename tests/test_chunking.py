@@ -0,0 +1,75 @@
+from utils import itinerary_ai
+from utils.itinerary_ai import (
+    ItineraryResult,
+    chunk_budget,
+    day_ranges,
+    generate_itinerary,
+    merge_itinerary_chunks,
+    normalize_day_cards,
+    strip_cost_summary,
+)
+from utils.travel_utils import calculate_budget_split
+
+from helpers import FakeClient, cost_summary, day_card, itinerary
+
+
+def test_day_ranges_are_even_and_cover_the_trip():
+    assert day_ranges(10, 4) == [(1, 4), (5, 7), (8, 10)]
+    assert day_ranges(8, 4) == [(1, 4), (5, 8)]
+    assert day_ranges(3, 4) == [(1, 3)]
+
+
+def test_chunk_budget_is_pro_rata():
+    budget = calculate_budget_split(10000, 10, ["Food"], 2, "INR")
+    share = chunk_budget(budget, ["Food"], 10, (5, 7))
+    assert share["total"] == 3000
+    assert share["travelers"] == 2 and share["currency"] == "INR"
+
+
+def test_missing_headings_are_numbered_from_the_first_day():
+    html = "<div class='day-card'><p>Beach</p></div><div class='day-card'><h3>Day 6</h3></div>"
+    html, cards = normalize_day_cards(html, first_day=5)
+    assert cards[0].startswith("<div class='day-card'><h3>Day 5</h3>")
+    assert "<h3>Day 6</h3>" in cards[1]
+    assert html == "".join(cards)
+
+
+def test_from_dict_numbers_days_of_a_later_chunk():
+    part = ItineraryResult.from_dict({"html": "<div class='day-card'><p>A</p></div>", "total_cost": 0},
+                                     first_day=8)
+    assert "<h3>Day 8</h3>" in part.days[0]
+
+
+def test_strip_cost_summary():
+    html = day_card(1, 100) + cost_summary([("Day 1", 100)], 100) + "<p>Tips</p>"
+    assert strip_cost_summary(html) == day_card(1, 100) + "<p>Tips</p>"
+
+
+def test_merge_orders_days_sums_totals_and_dedupes_locations():
+    budget = calculate_budget_split(5000, 5, ["Food"], 1, "INR")
+    first = itinerary([day_card(1, 100), day_card(2, 150)], 250, locations=["Fort", "Beach"])
+    second = itinerary([day_card(3, 300, 50)], 350, locations=["beach", "Market"])
+    merged = merge_itinerary_chunks([first, second], [(1, 2), (3, 3)], budget)
+    assert merged.ok and merged.total_cost == 600
+    assert len(merged.days) == 3 and merged.days[2] == day_card(3, 300, 50)
+    assert merged.locations == ["Fort", "Beach", "Market"]
+    assert merged.html.count("cost-summary") == 1
+    assert "Days 1-2" in merged.html and "Days 3-3" in merged.html
+
+
+def test_merge_fails_when_any_chunk_fails():
+    budget = calculate_budget_split(5000, 5, ["Food"], 1, "INR")
+    ok = itinerary([day_card(1, 100)], 100)
+    failed = ItineraryResult.failure("timeout", budget)
+    merged = merge_itinerary_chunks([ok, failed], [(1, 2), (3, 5)], budget)
+    assert not merged.ok and merged.error == "Days 3-5: timeout"
+
+
+def test_long_trip_is_generated_in_chunks(monkeypatch):
+    client = FakeClient()
+    monkeypatch.setattr(itinerary_ai, "get_groq_client", lambda: client)
+    budget = calculate_budget_split(9000, 9, ["Food"], 1, "INR")
+    result = generate_itinerary("Chunk Town", 9, budget, ["Food"], "Budget")
+    assert len(client.calls) == len(day_ranges(9)) > 1
+    assert result.ok and len(result.days) == 9 and result.total_cost == 900
+    assert all(f"Day {d}<" in card for d, card in enumerate(result.days, start=1))
@@ -0,0 +1,30 @@
+import json
+
+from utils.itinerary_ai import DayCardStream
+
+
+def feed_all(chunks):
+    stream = DayCardStream()
+    cards = []
+    for chunk in chunks:
+        cards.extend(stream.feed(chunk))
+    return cards
+
+
+def test_cards_are_emitted_as_they_close():
+    payload = json.dumps({"html": "<div class='day-card'><h3>Day 1</h3>A</div>"
+                                  "<div class='day-card'><h3>Day 2</h3>B</div>"})
+    cards = feed_all(payload[i:i + 7] for i in range(0, len(payload), 7))
+    assert len(cards) == 2
+    assert "A" in cards[0] and "B" in cards[1]
+
+
+def test_surrogate_pair_split_across_chunks():
+    html = "<div class='day-card'><h3>Day 1</h3>Beach day \U0001F3D6 and \U0001F35C</div>"
+    payload = json.dumps({"html": html})          # emoji become \ud83c\udfd6 escape pairs
+    first_escape = payload.index("\\ud83c")
+    for cut in range(first_escape, first_escape + 13):
+        cards = feed_all([payload[:cut], payload[cut:]])
+        assert len(cards) == 1
+        assert "\U0001F3D6" in cards[0] and "\U0001F35C" in cards[0]
+        cards[0].encode("utf-8")
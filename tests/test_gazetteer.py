@@ -0,0 +1,44 @@
+import pytest
+
+from utils.gazetteer import Gazetteer, build_index, normalize_place
+
+CSV = """name,kind,country,lat,lon,aliases
+India,country,India,20.59,78.96,Bharat
+Mumbai,city,India,19.0760,72.8777,Bombay
+Montréal,city,Canada,45.5019,-73.5674,
+St. John's,city,Canada,47.5615,-52.7126,
+Mumbai,landmark,India,0,0,
+"""
+
+
+@pytest.fixture
+def gazetteer(tmp_path):
+    csv_path = tmp_path / "places.csv"
+    csv_path.write_text(CSV, encoding="utf-8")
+    assert build_index(str(csv_path), str(tmp_path / "index")) == 6
+    return Gazetteer(str(tmp_path / "index"))
+
+
+def test_normalize_place():
+    assert normalize_place("  Montréal ") == "montreal"
+    assert normalize_place("St. John’s") == "st johns"
+
+
+def test_lookup_names_and_aliases(gazetteer):
+    assert gazetteer.coordinates("mumbai") == (19.076, 72.8777)
+    assert gazetteer.lookup("BOMBAY").name == "Mumbai"
+    assert gazetteer.lookup("Montreal").country == "Canada"
+    assert gazetteer.lookup("st johns").name == "St. John's"
+    assert gazetteer.lookup("Bharat").kind == "country"
+
+
+def test_first_entry_wins_and_misses_are_none(gazetteer):
+    assert gazetteer.lookup("Mumbai").kind == "city"
+    assert gazetteer.lookup("Atlantis") is None
+    assert gazetteer.coordinates("") == (None, None)
+
+
+def test_search_prefix(gazetteer):
+    assert [p.name for p in gazetteer.search_prefix("mo")] == ["Montréal"]
+    assert [p.name for p in gazetteer.search_prefix("b")] == ["India", "Mumbai"]
+    assert gazetteer.search_prefix("b", limit=1)[0].name == "India"
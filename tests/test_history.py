@@ -0,0 +1,75 @@
+import itertools
+
+import pytest
+
+from utils import history
+from utils.history import TripHistory, trip_hash
+
+from helpers import day_card, itinerary
+
+
+@pytest.fixture
+def store(monkeypatch):
+    # Strictly increasing timestamps, so "newest first" is well defined
+    clock = itertools.count(1000.0)
+    monkeypatch.setattr(history.time, "time", lambda: next(clock))
+    return TripHistory("", max_trips=3)
+
+
+def inputs(place="Goa", **extra):
+    return {"place": place, "days": 2, "budget": 2000, "travelers": 1, "interests": ["Food"],
+            "travel_type": "Budget", "currency": "INR", **extra}
+
+
+def plan(total=300):
+    return itinerary([day_card(1, 100), day_card(2, total - 100)], total, locations=["Fort 1.0"])
+
+
+def test_trip_hash_ignores_case_and_interest_order():
+    assert trip_hash(inputs("Goa", interests=["Food", "Culture"])) == \
+        trip_hash(inputs(" goa", interests=["culture", "food"]))
+    assert trip_hash(inputs("Goa")) != trip_hash(inputs("Goa", days=3))
+
+
+def test_save_and_open_round_trip(store):
+    result = plan()
+    map_data = {"points": [[15.5, 73.8]], "route": "abc"}
+    trip_id = store.save("ana", inputs(), result, {"total": 2000}, map_data)
+    record = store.open_trip("ana", trip_id)
+    assert record.inputs == inputs() and record.budget == {"total": 2000}
+    assert record.map_data == map_data
+    assert record.itinerary.html == result.html
+    assert record.itinerary.days == result.days             # cut back out of the html
+    assert record.itinerary.total_cost == 300
+    assert store.open_trip("bo", trip_id) is None            # other users cannot open it
+
+
+def test_saving_the_same_inputs_replaces_the_trip(store):
+    first = store.save("ana", inputs(), plan(300), {})
+    assert store.open_trip("ana", first).itinerary.total_cost == 300
+    second = store.save("ana", inputs(), plan(500), {})
+    assert second == first
+    trips, total = store.list_trips("ana")
+    assert total == 1 and trips[0].total_cost == 500
+    assert store.open_trip("ana", first).itinerary.total_cost == 500     # not a stale cached copy
+
+
+def test_list_is_paged_newest_first_and_trimmed(store):
+    for place in ("A", "B", "C", "D"):
+        store.save("ana", inputs(place), plan(), {})
+    store.save("bo", inputs("Z"), plan(), {})
+
+    trips, total = store.list_trips("ana", page=0, page_size=2)
+    assert total == 3                                        # max_trips=3: "A" was dropped
+    assert [t.place for t in trips] == ["D", "C"]
+    assert [t.place for t in store.list_trips("ana", page=1, page_size=2)[0]] == ["B"]
+    assert store.list_trips("bo")[1] == 1
+
+
+def test_delete_and_stats(store):
+    trip_id = store.save("ana", inputs(), plan(), {})
+    stats = store.stats()
+    assert stats["trips"] == 1 and stats["stored_bytes"] > 0
+    store.delete("ana", trip_id)
+    assert store.open_trip("ana", trip_id) is None
+    assert store.list_trips("ana") == ([], 0)
@@ -0,0 +1,19 @@
+from utils.http_client import HttpClient
+
+
+def retries(client, host):
+    return client._session(host).get_adapter(f"https://{host}/").max_retries.total
+
+
+def test_nominatim_gets_no_transport_retries():
+    client = HttpClient(retries=2)
+    assert retries(client, "nominatim.openstreetmap.org") == 0
+    assert retries(client, "router.project-osrm.org") == 2
+
+
+def test_set_retries_rebuilds_the_session():
+    client = HttpClient(retries=2)
+    before = client._session("geo.example.org")
+    client.set_retries("geo.example.org", 0)
+    assert client._session("geo.example.org") is not before
+    assert retries(client, "geo.example.org") == 0
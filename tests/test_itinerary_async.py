@@ -0,0 +1,39 @@
+import asyncio
+import re
+
+from utils import itinerary_ai
+from utils.itinerary_ai import estimate_itinerary_tokens, generate_itinerary_async
+from utils.travel_utils import calculate_budget_split
+
+from helpers import FakeAsyncClient
+
+
+def generate(client, days, city):
+    budget = calculate_budget_split(1000 * days, days, ["Food"], 1, "INR")
+    return asyncio.run(generate_itinerary_async(client, city, days, budget, ["Food"], "Budget"))
+
+
+def test_short_trip_is_one_completion():
+    client = FakeAsyncClient()
+    result, tokens = generate(client, 3, "Async Short")
+    assert result.ok and len(result.days) == 3
+    assert client.calls == [itinerary_ai.ITINERARY_MAX_TOKENS]
+    assert tokens == 10
+
+
+def test_long_trip_is_chunked_with_per_chunk_max_tokens():
+    client = FakeAsyncClient()
+    result, tokens = generate(client, 10, "Async Long")
+    ranges = itinerary_ai.day_ranges(10)
+    assert len(client.calls) == len(ranges) > 1
+    assert sum(client.calls) == estimate_itinerary_tokens(10)
+    assert tokens == 10 * len(ranges)
+    assert result.ok and result.total_cost == 1000
+    assert [re.search(r"Day (\d+)", card).group(1) for card in result.days] == [str(d) for d in range(1, 11)]
+    assert result.html.count("cost-summary") == 1
+
+    # The merged trip is cached as a whole
+    again = FakeAsyncClient()
+    cached, tokens = generate(again, 10, "Async Long")
+    assert again.calls == [] and tokens == 0
+    assert cached.total_cost == 1000
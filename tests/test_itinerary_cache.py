@@ -0,0 +1,49 @@
+import pytest
+
+from utils import itinerary_ai
+from utils.itinerary_ai import generate_itinerary, itinerary_cache_key
+from utils.travel_utils import calculate_budget_split
+
+from helpers import FakeClient
+
+
+@pytest.fixture
+def client(monkeypatch):
+    fake = FakeClient()
+    monkeypatch.setattr(itinerary_ai, "get_groq_client", lambda: fake)
+    return fake
+
+
+def budget(days=3, total=3000):
+    return calculate_budget_split(total, days, ["Food", "Culture"], 1, "INR")
+
+
+def test_key_ignores_case_whitespace_and_interest_order():
+    key = itinerary_cache_key("Goa", 3, budget(), ["Food", "Culture"], "Budget")
+    assert itinerary_cache_key("  goa ", 3, budget(), ["culture", "Food"], "budget") == key
+    assert itinerary_cache_key("Goa", 4, budget(), ["Food", "Culture"], "Budget") != key
+    assert itinerary_cache_key("Goa", 3, budget(total=4000), ["Food", "Culture"], "Budget") != key
+    assert itinerary_cache_key("Goa", 3, budget(), ["Food", "Culture"], "Budget", day_range=(1, 2)) != key
+
+
+def test_repeat_request_is_served_from_cache(client):
+    first = generate_itinerary("Cache Town", 3, budget(), ["Food", "Culture"], "Budget")
+    again = generate_itinerary("cache town ", 3, budget(), ["Culture", "Food"], "Budget")
+    assert first.ok and again.ok
+    assert len(client.calls) == 1
+    assert again.html == first.html and again.total_cost == first.total_cost
+
+
+def test_regenerate_skips_and_refreshes_the_cache(client):
+    generate_itinerary("Regen Town", 3, budget(), ["Food"], "Budget")
+    generate_itinerary("Regen Town", 3, budget(), ["Food"], "Budget", regenerate=True)
+    assert len(client.calls) == 2
+    generate_itinerary("Regen Town", 3, budget(), ["Food"], "Budget")
+    assert len(client.calls) == 2
+
+
+def test_failures_are_not_cached(monkeypatch):
+    monkeypatch.setattr(itinerary_ai, "get_groq_client", lambda: None)
+    assert not generate_itinerary("Nokey Town", 3, budget(), ["Food"], "Budget").ok
+    key = itinerary_cache_key("Nokey Town", 3, budget(), ["Food"], "Budget")
+    assert itinerary_ai.itinerary_cache.get(key) is itinerary_ai.MISS
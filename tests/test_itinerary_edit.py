@@ -0,0 +1,77 @@
+import pytest
+
+from utils import itinerary_ai
+from utils.itinerary_ai import generate_itinerary, itinerary_cache, itinerary_cache_key
+from utils.itinerary_edit import change_budget, change_interests, regenerate_day, replaced_days, splice_days
+from utils.pricing import scan_prices
+from utils.travel_utils import calculate_budget_split
+
+from helpers import FakeClient, day_card, itinerary
+
+
+@pytest.fixture
+def client(monkeypatch):
+    fake = FakeClient()
+    monkeypatch.setattr(itinerary_ai, "get_groq_client", lambda: fake)
+    return fake
+
+
+def test_splice_subset_of_days():
+    result = itinerary([day_card(1, 100), day_card(2, 200, place="Lake"), day_card(3, 300)], 600,
+                       locations=["Fort 1.0", "Lake 2.0", "Fort 3.0"])
+    new_day = itinerary([day_card(2, 50, place="Museum")], 50, summary=False, locations=["Museum 2.0"])
+
+    edited = splice_days(result, {2: new_day})
+    assert edited.days[0] == result.days[0] and edited.days[2] == result.days[2]
+    assert "Museum" in edited.days[1] and "Lake" not in edited.html
+    assert edited.total_cost == 450
+    assert edited.locations == ["Fort 1.0", "Museum 2.0", "Fort 3.0"]
+    scan = scan_prices(edited.html)
+    assert scan.summary_total == 450 and dict(scan.summary_rows)["Day 2"] == 50
+
+
+def test_empty_replacement_is_not_a_change():
+    result = itinerary([day_card(1, 100), day_card(2, 200)], 300, locations=["Fort 1.0", "Fort 2.0"])
+    empty = itinerary([], 0, summary=False)
+
+    assert replaced_days(result, {1: empty, 5: empty}) == []
+    edited = splice_days(result, {1: empty})
+    assert edited.days == result.days
+    assert edited.total_cost == 300
+    assert edited.locations == result.locations
+
+
+def test_splice_is_checked_against_the_budget():
+    result = itinerary([day_card(1, 100), day_card(2, 200)], 300)
+    pricey = itinerary([day_card(2, 5000)], 5000, summary=False)
+    budget = calculate_budget_split(1000, 2, ["Food"], 1, "INR")
+
+    edited = splice_days(result, {2: pricey}, budget)
+    assert edited.total_cost == 5100
+    assert edited.over_budget["Activities"] > 0
+    assert splice_days(edited, {}).over_budget == edited.over_budget     # carried without budget_info
+
+
+def test_regenerated_day_does_not_replace_the_shared_plan(client):
+    budget = calculate_budget_split(3000, 3, ["Food"], 1, "INR")
+    plan = generate_itinerary("Edit Town", 3, budget, ["Food"], "Budget")
+    key = itinerary_cache_key("Edit Town", 3, budget, ["Food"], "Budget")
+    before = itinerary_cache.get(key)
+
+    edit = regenerate_day(plan, 2, "Edit Town", 3, budget, ["Food"], "Budget")
+    assert edit.result.ok and edit.changed_days == [2] and edit.llm_calls == 1
+    assert itinerary_cache.get(key) == before
+
+
+def test_budget_edits_report_local_rescaling(client):
+    budget = calculate_budget_split(3000, 3, ["Food"], 1, "INR")
+    plan = generate_itinerary("Budget Town", 3, budget, ["Food"], "Budget")
+    calls = len(client.calls)
+
+    raised = calculate_budget_split(3300, 3, ["Food"], 1, "INR")
+    edit = change_budget(plan, "Budget Town", 3, budget, raised, ["Food"], "Budget")
+    assert edit.rescaled and edit.changed_days == [] and len(client.calls) == calls
+    assert edit.result.total_cost == 330
+
+    same = change_interests(plan, "Budget Town", 3, budget, ["Food"], ["Food"], "Budget")
+    assert not same.rescaled and same.changed_days == [] and same.result is plan
@@ -0,0 +1,85 @@
+import threading
+import time
+
+import pytest
+
+from utils.jobs import CANCELLED, DONE, FAILED, QUEUED, RUNNING, JobQueue, QueueFullError
+
+
+def wait_finished(queue, job_id, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        status = queue.status(job_id)
+        if status.finished:
+            return status
+        time.sleep(0.005)
+    raise AssertionError(f"job {job_id} did not finish")
+
+
+def test_status_moves_from_running_to_done_with_partials():
+    queue = JobQueue(workers=1, name="t-done")
+    release = threading.Event()
+
+    def work(job, n):
+        job.progress("counting")
+        for i in range(n):
+            job.progress(item=i)
+        release.wait(1)
+        return n * 10
+
+    job_id = queue.submit(work, 3)
+    time.sleep(0.05)
+    running = queue.status(job_id)
+    assert (running.state, running.stage, running.partial) == (RUNNING, "counting", [0, 1, 2])
+    release.set()
+    done = wait_finished(queue, job_id)
+    assert (done.state, done.result, done.error) == (DONE, 30, None)
+    assert queue.stats()["done"] == 1 and queue.stats()["pending"] == 0
+
+
+def test_failures_are_reported():
+    queue = JobQueue(workers=1, name="t-fail")
+
+    def boom(job):
+        raise ValueError("no route")
+
+    status = wait_finished(queue, queue.submit(boom))
+    assert (status.state, status.error) == (FAILED, "no route")
+
+
+def test_cancel_only_queued_jobs_and_bounded_pending():
+    queue = JobQueue(workers=1, max_pending=2, name="t-cancel")
+    release = threading.Event()
+    ran = []
+
+    def work(job, tag):
+        ran.append(tag)
+        release.wait(1)
+
+    first = queue.submit(work, "first")
+    second = queue.submit(work, "second")
+    time.sleep(0.05)
+    assert queue.status(second).state == QUEUED
+    with pytest.raises(QueueFullError):
+        queue.submit(work, "third")
+
+    assert not queue.cancel(first)          # already running
+    assert queue.cancel(second)
+    assert queue.status(second).state == CANCELLED
+    assert not queue.cancel("unknown")
+    queue.submit(work, "fourth")            # the cancelled job freed its slot
+
+    release.set()
+    assert wait_finished(queue, first).state == DONE
+    time.sleep(0.05)
+    assert "second" not in ran
+    assert queue.stats()["rejected"] == 1 and queue.stats()["cancelled"] == 1
+
+
+def test_finished_jobs_expire():
+    queue = JobQueue(workers=1, ttl_s=0.01, name="t-ttl")
+    job_id = queue.submit(lambda job: None)
+    wait_finished(queue, job_id)
+    time.sleep(0.02)
+    queue.submit(lambda job: None)          # expiry runs on submit
+    assert queue.status(job_id) is None
@@ -0,0 +1,21 @@
+from utils import maps
+from utils.maps import geocode_cache, geocode_wait_s, get_coordinates_many
+
+
+def test_wait_counts_only_uncached_names(monkeypatch):
+    monkeypatch.setattr(maps, "NOMINATIM_RPS", 2.0)
+    geocode_cache.set("zzq cached stop", [1.0, 2.0])
+    names = ["Zzq Cached Stop", "Zzq New Stop", "zzq new stop ", "Gateway of India"]
+    assert geocode_wait_s(names) == 0.5
+
+
+def test_wait_does_not_touch_cache_stats(monkeypatch):
+    monkeypatch.setattr(maps, "NOMINATIM_RPS", 1.0)
+    monkeypatch.setattr(maps, "_nominatim_search", lambda name: (10.0, 20.0))
+    before = geocode_cache.stats()
+    names = ["Zzq Stats One", "Zzq Stats Two"]
+    geocode_wait_s(names)
+    results = get_coordinates_many(names)
+    assert [(r.lat, r.lon) for r in results] == [(10.0, 20.0)] * 2
+    after = geocode_cache.stats()
+    assert after["misses"] - before["misses"] == 2
@@ -0,0 +1,109 @@
+import utils.itinerary_ai as itinerary_ai
+from utils.pricing import _rescale_summary, check_prices, reconcile_prices, rescale_cards, rescale_prices, scan_prices
+from utils.travel_utils import calculate_budget_split
+
+from helpers import cost_summary, day_card, itinerary
+
+BUDGET = calculate_budget_split(2000, 2, ["Food"], 1, "INR")
+
+
+def test_scan_prices_days_and_summary():
+    result = itinerary([day_card(1, 100, 200), day_card(2, 300)], 600)
+    scan = scan_prices(result.html)
+    assert scan.total == 600
+    assert scan.by_day() == {1: 300, 2: 300}
+    assert scan.summary_rows == [("Day 1", 300), ("Day 2", 300)]
+    assert scan.summary_total == 600
+
+
+def test_within_tolerance_is_rescaled_locally():
+    # Tags 1060 against total_cost 1000: a 6% gap, fixed without the model
+    result = itinerary([day_card(1, 500, 30), day_card(2, 530)], 1000)
+    check = check_prices(result.html, result.total_cost, BUDGET)
+    assert check.action == "rescale"
+
+    repaired, _ = reconcile_prices(result, BUDGET)
+    scan = scan_prices(repaired.html)
+    assert repaired.total_cost == scan.total
+    assert abs(scan.total - 1000) <= 2
+    assert scan.summary_total == scan.total
+    assert dict(scan.summary_rows) == {f"Day {d}": v for d, v in scan.by_day().items()}
+    assert "".join(repaired.days) in repaired.html
+
+
+def test_short_tags_settle_total_and_summary():
+    result = itinerary([day_card(1, 400), day_card(2, 560)], 1000)
+    repaired, check = reconcile_prices(result, BUDGET)
+    assert check.action == "rescale"
+    assert repaired.total_cost == 960
+    assert scan_prices(repaired.html).summary_total == 960
+
+
+def test_large_gap_asks_again_only_when_enabled(monkeypatch):
+    result = itinerary([day_card(1, 800), day_card(2, 500)], 1000)
+    _, check = reconcile_prices(result, BUDGET)
+    assert check.gap > 0.15 and check.action == "reask"
+
+    calls = []
+
+    def reask(check):
+        calls.append(check)
+        return itinerary([day_card(1, 500), day_card(2, 500)], 1000)
+
+    monkeypatch.setattr(itinerary_ai, "PRICE_REASK", False)
+    kept = itinerary_ai._reconcile(result, BUDGET, reask)
+    assert calls == [] and kept.total_cost == 1300
+
+    monkeypatch.setattr(itinerary_ai, "PRICE_REASK", True)
+    fixed = itinerary_ai._reconcile(result, BUDGET, reask)
+    assert len(calls) == 1 and fixed.total_cost == 1000
+
+
+def test_missing_cost_summary():
+    result = itinerary([day_card(1, 500, 30), day_card(2, 530)], 1000, summary=False)
+    scan = scan_prices(result.html)
+    assert scan.summary_total is None and scan.summary_rows == []
+
+    repaired, check = reconcile_prices(result, BUDGET)
+    assert check.action == "rescale"
+    assert "cost-summary" not in repaired.html
+    assert repaired.total_cost == scan_prices(repaired.html).total
+
+
+def test_over_budget_category_is_flagged():
+    # 1,000 INR of meals against the Food share of a 2,000 INR trip
+    cards = ["<div class='day-card'><h3>Day 1</h3>Dinner <span class='price-tag'>Cost: 1000 INR</span></div>"]
+    repaired, check = reconcile_prices(itinerary(cards, 1000), BUDGET)
+    assert "Food" in check.over_categories
+    assert repaired.over_budget == check.over_categories
+
+
+def test_rescale_keeps_cents_and_hits_the_target():
+    html = day_card(1, "12.50", "7.25") + day_card(2, 30)
+    scaled = rescale_prices(html, 0.9)
+    assert [t.amount for t in scan_prices(scaled).tags] == [11.25, 6.53, 27]
+    exact = rescale_prices(html, 0.9, target=44.78)
+    assert [t.amount for t in scan_prices(exact).tags] == [11.25, 6.53, 27]
+    exact = rescale_prices(html, 0.9, target=45)
+    assert [t.amount for t in scan_prices(exact).tags] == [11.25, 6.53, 27.22]   # largest takes the cents
+
+
+def test_rescale_cards_match_the_html():
+    cards = [day_card(1, 333, 333), day_card(2, 334)]
+    html, new_cards = rescale_cards("".join(cards) + "<p>end</p>", cards, 0.5, target=500)
+    assert html == "".join(new_cards) + "<p>end</p>"
+    assert scan_prices(html).total == 500
+
+
+def test_summary_category_rows_still_add_up():
+    html = cost_summary([("Stay", 333), ("Food", 333), ("Fun", 334)], 1000)
+    rescaled = scan_prices(_rescale_summary(html, 0.9, 900))
+    assert rescaled.summary_total == 900
+    assert sum(amount for _, amount in rescaled.summary_rows) == 900
+
+
+def test_large_totals_are_written_in_full():
+    result = itinerary([day_card(1, 600000), day_card(2, 700000)], 1350000)
+    repaired, _ = reconcile_prices(result, calculate_budget_split(2000000, 2, ["Food"], 1, "INR"))
+    assert scan_prices(repaired.html).summary_total == 1300000
+    assert "1300000 INR" in repaired.html
@@ -0,0 +1,70 @@
+import threading
+import time
+
+from utils import metrics
+from utils.singleflight import SingleFlight, flight_stats
+
+WAITERS = 8
+
+
+def run_together(group, key, fn):
+    """Starts WAITERS threads calling group.do(key, fn) at once; returns their outcomes."""
+    outcomes = [None] * WAITERS
+    barrier = threading.Barrier(WAITERS)
+
+    def call(i):
+        barrier.wait()
+        try:
+            outcomes[i] = ("ok",) + group.do(key, fn)
+        except Exception as e:
+            outcomes[i] = ("error", e)
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(WAITERS)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(5)
+    return outcomes
+
+
+def slow(calls, result=None, error=None):
+    def fn():
+        calls.append(1)
+        time.sleep(0.2)
+        if error:
+            raise error
+        return result
+    return fn
+
+
+def test_concurrent_calls_run_once():
+    group, calls = SingleFlight("test_once"), []
+    outcomes = run_together(group, "trip", slow(calls, result={"days": 3}))
+    assert len(calls) == 1
+    assert all(o[:2] == ("ok", {"days": 3}) for o in outcomes)
+    assert sum(shared for _, _, shared in outcomes) == WAITERS - 1
+    stats = group.stats()
+    assert stats["upstream"] == 1 and stats["coalesced"] == WAITERS - 1 and stats["in_flight"] == 0
+
+
+def test_exception_reaches_every_waiter():
+    group, calls = SingleFlight("test_error"), []
+    error = RuntimeError("upstream down")
+    outcomes = run_together(group, "trip", slow(calls, error=error))
+    assert len(calls) == 1
+    assert all(o == ("error", error) for o in outcomes)
+    # Nothing is remembered once the call is over
+    assert group.do("trip", lambda: "fresh") == ("fresh", False)
+
+
+def test_different_keys_do_not_coalesce():
+    group = SingleFlight("test_keys")
+    assert group.do("a", lambda: 1) == (1, False)
+    assert group.do("b", lambda: 2) == (2, False)
+    assert group.stats()["coalesced"] == 0
+
+
+def test_stats_are_exported():
+    SingleFlight("test_export").do("k", lambda: None)
+    assert "test_export" in flight_stats()
+    assert 'travel_planner_flight_calls_total{group="test_export"} 1' in metrics.prometheus_text()
@@ -0,0 +1,42 @@
+from utils import itinerary_ai
+from utils.itinerary_ai import PROMPT_TOKENS_ESTIMATE, SUGGESTION_MAX_TOKENS, estimate_itinerary_tokens
+from utils.warmer import SpendLimit, popular_trips, trip_spend, warm_cache, worst_case_spend
+
+from helpers import FakeClient
+
+
+def test_chunked_trip_is_charged_per_chunk():
+    assert trip_spend(3) == (1, itinerary_ai.ITINERARY_MAX_TOKENS + PROMPT_TOKENS_ESTIMATE)
+    assert trip_spend(5) == (2, estimate_itinerary_tokens(5) + 2 * PROMPT_TOKENS_ESTIMATE)
+
+
+def test_reask_doubles_the_calls(monkeypatch):
+    monkeypatch.setattr(itinerary_ai, "PRICE_REASK", True)
+    calls, tokens = trip_spend(5)
+    assert calls == 4
+    assert tokens == 3 * estimate_itinerary_tokens(5) + 4 * PROMPT_TOKENS_ESTIMATE
+
+
+def test_worst_case_includes_one_suggestion_per_ask():
+    trips = popular_trips([("Goa", "India")], days=[3], budgets=[5000, 10000], styles=["Budget", "Standard"])
+    calls, tokens = worst_case_spend(trips)
+    assert calls == 4 + 2
+    assert tokens == 4 * trip_spend(3)[1] + 2 * (SUGGESTION_MAX_TOKENS + PROMPT_TOKENS_ESTIMATE)
+    assert worst_case_spend(trips, suggestions=False) == (4, 4 * trip_spend(3)[1])
+
+
+def test_spend_limit_counts_every_call():
+    limit = SpendLimit(max_calls=3)
+    assert limit.reserve(100, calls=2)
+    assert not limit.reserve(100, calls=2)
+    assert limit.reserve(100)
+    assert (limit.calls, limit.tokens) == (3, 200)
+
+
+def test_max_calls_is_a_hard_limit(monkeypatch):
+    client = FakeClient()
+    monkeypatch.setattr(itinerary_ai, "get_groq_client", lambda: client)
+    trips = popular_trips([("Warm Town", "India")], days=[5], budgets=[5000, 6000], styles=["Budget"])
+    stats = warm_cache(trips, workers=2, max_tokens=None, max_calls=3, suggestions=False, with_maps=False)
+    assert len(client.calls) == 2
+    assert (stats["itineraries_warmed"], stats["skipped_over_budget"]) == (1, 1)
@@ -0,0 +1,281 @@
+import csv
+import heapq
+import os
+import threading
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+from utils.gazetteer import GAZETTEER_CSV, normalize_place
+from utils.travel_utils import COUNTRY_CURRENCY_MAP
+
+AUTOCOMPLETE_LIMIT = int(os.getenv("AUTOCOMPLETE_LIMIT", "8"))
+# A typed place is only replaced by its best fuzzy match above this trigram similarity
+RESOLVE_MIN_SCORE = float(os.getenv("AUTOCOMPLETE_RESOLVE_MIN_SCORE", "0.55"))
+RESOLVE_MARGIN = 0.05           # ... and when it beats the next different place by this much
+
+# Trigram (Dice) similarity below which a fuzzy match is not suggested
+_FUZZY_MIN_SCORE = 0.4
+_FUZZY_MIN_LEN = 4              # shorter queries are served by prefixes alone
+_FUZZY_POSTINGS = 2000          # most posting entries counted per query, rarest trigrams first
+_FUZZY_GRAMS = 4                # rarest query trigrams intersected
+_FUZZY_VERIFY = 32              # best partial-count candidates re-scored on all trigrams
+_PREFIX_SCAN = 64               # prefix hits looked at per query
+_COUNTRY_BOOST = 0.15           # places in the selected country rank higher
+_KIND_BOOST = {"country": 0.03, "city": 0.02}
+_EDIT_MIN_LEN = 4               # shorter names are too easy to turn into another place with one edit
+_LETTERS = "abcdefghijklmnopqrstuvwxyz"
+
+
+class Suggestion(NamedTuple):
+    name: str           # canonical name, e.g. "Mumbai"
+    kind: str           # country, city or landmark
+    country: str
+    matched: str        # the name or alias the query matched, e.g. "Bombay"
+    score: float
+
+
+def _trigrams(key: str) -> List[str]:
+    padded = f"  {key} "
+    return list(dict.fromkeys(padded[i:i + 3] for i in range(len(padded) - 2)))
+
+
+def _one_edit(key: str) -> set:
+    """Every string one deletion, transposition, replacement or insertion away from key."""
+    splits = [(key[:i], key[i:]) for i in range(len(key) + 1)]
+    edits = {a + b[1:] for a, b in splits if b}
+    edits |= {a + b[1] + b[0] + b[2:] for a, b in splits if len(b) > 1}
+    edits |= {a + c + b[1:] for a, b in splits if b for c in _LETTERS}
+    edits |= {a + c + b for a, b in splits for c in _LETTERS}
+    edits.discard(key)
+    return edits
+
+
+def load_places(csv_path: str = GAZETTEER_CSV) -> List[Tuple[str, str, str, List[str]]]:
+    """
+    (name, kind, country, aliases) rows from the gazetteer CSV, plus every
+    country in COUNTRY_CURRENCY_MAP the CSV does not list.
+    """
+    places, countries = [], set()
+    try:
+        with open(csv_path, newline="", encoding="utf-8") as f:
+            for rec in csv.DictReader(f):
+                aliases = [a.strip() for a in (rec.get("aliases") or "").split(";") if a.strip()]
+                places.append((rec["name"], rec["kind"], rec["country"], aliases))
+                if rec["kind"] == "country":
+                    countries.add(rec["name"])
+    except OSError as e:
+        print(f"Autocomplete without the gazetteer CSV: {e}")
+    places.extend((c, "country", c, []) for c in COUNTRY_CURRENCY_MAP if c not in countries)
+    return places
+
+
+class PlaceIndex:
+    """
+    In-memory autocomplete over place names and aliases.
+
+    Every name and alias is normalized once into a key. Prefix queries
+    binary-search a sorted list of keys and key suffixes starting at a word
+    ("york" finds "new york"); typos are matched through a trigram inverted
+    index whose postings are compact int arrays. Candidates are the keys
+    sharing two of the query's _FUZZY_GRAMS rarest trigrams (at most
+    _FUZZY_POSTINGS postings read), and only the best _FUZZY_VERIFY of them
+    are scored on all trigrams, so a keystroke stays well under a
+    millisecond even over 100k names.
+    """
+    def __init__(self, places: Iterable[Tuple[str, str, str, Sequence[str]]]):
+        self._names: List[str] = []
+        self._kinds: List[str] = []
+        self._countries: List[str] = []
+        self._keys: List[str] = []          # normalized names and aliases
+        self._matched: List[str] = []       # the spelling each key came from
+        self._key_place = array("i")        # key -> place
+        self._key_grams = array("H")        # key -> number of trigrams
+        self._key_ids: Dict[str, int] = {}
+        for name, kind, country, aliases in places:
+            place_id = len(self._names)
+            self._names.append(name)
+            self._kinds.append(kind)
+            self._countries.append(country)
+            for spelling in [name, *aliases]:
+                key = normalize_place(spelling)
+                # First entry wins, as in the gazetteer
+                if not key or key in self._key_ids:
+                    continue
+                self._key_ids[key] = len(self._keys)
+                self._keys.append(key)
+                self._matched.append(spelling)
+                self._key_place.append(place_id)
+
+        prefixes = []
+        grams: Dict[str, List[int]] = {}
+        for key_id, key in enumerate(self._keys):
+            prefixes.append((key, key_id))
+            prefixes.extend((key[i + 1:], key_id) for i, c in enumerate(key) if c == " ")
+            key_grams = _trigrams(key)
+            self._key_grams.append(len(key_grams))
+            for g in key_grams:
+                grams.setdefault(g, []).append(key_id)
+        prefixes.sort()
+        self._prefix_keys = [p for p, _ in prefixes]
+        self._prefix_ids = array("i", [k for _, k in prefixes])
+        self._postings = {g: array("i", ids) for g, ids in grams.items()}
+
+    def __len__(self):
+        return len(self._keys)
+
+    def _prefix_scores(self, key: str, scores: Dict[int, float]):
+        lo = bisect_left(self._prefix_keys, key)
+        for i in range(lo, min(lo + _PREFIX_SCAN, len(self._prefix_keys))):
+            if not self._prefix_keys[i].startswith(key):
+                break
+            key_id = self._prefix_ids[i]
+            full = self._keys[key_id]
+            if full == key:
+                score = 2.0
+            else:
+                # Whole-name prefixes beat word prefixes; closer lengths rank higher
+                score = (1.0 if full.startswith(key) else 0.9) + 0.5 * len(key) / len(full)
+            if score > scores.get(key_id, 0.0):
+                scores[key_id] = score
+
+    def _fuzzy_scores(self, key: str, scores: Dict[int, float]):
+        grams = _trigrams(key)
+        n = len(grams)
+        # Rare trigrams narrow the candidates down the most
+        postings = sorted((self._postings.get(g, ()) for g in grams), key=len)
+        budget, sets = _FUZZY_POSTINGS, []
+        for ids in postings:
+            if not ids:
+                continue
+            if budget <= 0 or len(sets) == _FUZZY_GRAMS:
+                break
+            # Very common trigrams ("  s", "an ") are cut off; they say little about the match
+            sets.append(set(ids[:budget]))
+            budget -= len(ids)
+        # Keys sharing at least two of those trigrams, counted per shared pair;
+        # set intersections keep the counting in C
+        partial = Counter()
+        for i, first in enumerate(sets):
+            for other in sets[i + 1:]:
+                partial.update(first & other)
+        if partial:
+            candidates = [key_id for key_id, _ in partial.most_common(_FUZZY_VERIFY)]
+        else:
+            candidates = list(sets[0])[:_FUZZY_VERIFY] if sets else []
+        for key_id in candidates:
+            padded = f"  {self._keys[key_id]} "
+            shared = sum(g in padded for g in grams)
+            score = 2 * shared / (n + self._key_grams[key_id])
+            if score >= _FUZZY_MIN_SCORE and score > scores.get(key_id, 0.0):
+                scores[key_id] = score
+
+    def _suggestion(self, key_id: int, score: float) -> Suggestion:
+        place_id = self._key_place[key_id]
+        return Suggestion(self._names[place_id], self._kinds[place_id], self._countries[place_id],
+                          self._matched[key_id], score)
+
+    def suggest(self, text: str, limit: int = AUTOCOMPLETE_LIMIT,
+                country: Optional[str] = None) -> List[Suggestion]:
+        """
+        Ranked places for a partly typed name: exact matches, then prefixes,
+        then typo-tolerant trigram matches. Places in country rank higher.
+        """
+        key = normalize_place(text or "")
+        if not key:
+            return []
+        scores: Dict[int, float] = {}
+        self._prefix_scores(key, scores)
+        # While the typed text still prefixes enough names there is no typo to forgive
+        if len(key) >= _FUZZY_MIN_LEN and len(scores) < limit:
+            self._fuzzy_scores(key, scores)
+
+        best: Dict[int, Tuple[float, int]] = {}     # place -> (score, key)
+        for key_id, score in scores.items():
+            place_id = self._key_place[key_id]
+            score += _KIND_BOOST.get(self._kinds[place_id], 0.0)
+            if country and self._countries[place_id] == country:
+                score += _COUNTRY_BOOST
+            if score > best.get(place_id, (0.0,))[0]:
+                best[place_id] = (score, key_id)
+        top = heapq.nlargest(limit, best.values())
+        return [self._suggestion(key_id, round(score, 3)) for score, key_id in top]
+
+    def resolve(self, text: str, country: Optional[str] = None) -> Optional[Suggestion]:
+        """
+        The place text most likely means: an exact name or alias anywhere,
+        or, inside country, the only place one typing slip away ("Dehli" ->
+        Delhi) or a single clear trigram match ("Mumbay" -> Mumbai). None when
+        there is no match, when it is ambiguous, when text is just the start of
+        a name, or when the nearest place is elsewhere: the index lists only
+        a few hundred cities, so a real town missing from it ("Cairns") must
+        not be swapped for a look-alike in another country ("Cairo").
+        """
+        key = normalize_place(text or "")
+        if not key:
+            return None
+        if key in self._key_ids:
+            return self._suggestion(self._key_ids[key], 2.0)
+        if not country:
+            return None
+
+        if len(key) >= _EDIT_MIN_LEN:
+            near = {}
+            for edit in _one_edit(key):
+                key_id = self._key_ids.get(edit)
+                # A letter added at the end is a completion, not a typo
+                if key_id is not None and not edit.startswith(key):
+                    near.setdefault(self._key_place[key_id], key_id)
+            near = {p: k for p, k in near.items() if self._countries[p] == country}
+            if len(near) == 1:
+                return self._suggestion(next(iter(near.values())), 1.0)
+
+        ranked = self.suggest(text, limit=2, country=country)
+        if not ranked:
+            return None
+        top = ranked[0]
+        if top.country != country:
+            return None
+        if f" {normalize_place(top.matched)}".find(f" {key}") >= 0:
+            # Half-typed names are suggested, not silently completed
+            return None
+        boost = _KIND_BOOST.get(top.kind, 0.0) + (_COUNTRY_BOOST if country and top.country == country else 0.0)
+        if top.score - boost < RESOLVE_MIN_SCORE:
+            return None
+        if len(ranked) > 1 and top.score - ranked[1].score < RESOLVE_MARGIN:
+            return None
+        return top
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "places": len(self._names),
+            "keys": len(self._keys),
+            "prefix_keys": len(self._prefix_keys),
+            "trigrams": len(self._postings),
+            "postings": sum(len(ids) for ids in self._postings.values()),
+        }
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_place_index() -> PlaceIndex:
+    """Shared index over the bundled places, built on first use (a few ms)."""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = PlaceIndex(load_places())
+    return _index
+
+
+def resolve_place(text: str, country: Optional[str] = None) -> str:
+    """
+    Canonical spelling of a typed place, or the text as typed when there is
+    no clear match. Spelling fixes need country (see PlaceIndex.resolve).
+    """
+    text = (text or "").strip()
+    match = get_place_index().resolve(text, country) if text else None
+    return match.name if match else text
@@ -0,0 +1,201 @@
+import asyncio
+import csv
+import json
+import os
+import statistics
+import time
+from typing import Any, Dict, Iterator, List, Optional, Set
+
+from utils.travel_utils import calculate_budget_split, get_currency_for_country
+from utils.itinerary_ai import (
+    PROMPT_TOKENS_ESTIMATE,
+    estimate_itinerary_calls,
+    estimate_itinerary_tokens,
+    generate_itinerary_async,
+    get_async_groq_client,
+    itinerary_cache_key,
+)
+
+
+class TokenBucket:
+    """
+    Async token bucket refilled continuously at ``per_minute`` units per minute.
+    A rate of 0 (or less) disables limiting.
+    """
+    def __init__(self, per_minute: float, capacity: Optional[float] = None):
+        self.rate = per_minute / 60.0
+        self.capacity = capacity if capacity is not None else max(per_minute, 1.0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, amount: float = 1.0):
+        if self.rate <= 0:
+            return
+        amount = min(amount, self.capacity)
+        async with self._lock:
+            while True:
+                self._refill()
+                if self._tokens >= amount:
+                    self._tokens -= amount
+                    return
+                await asyncio.sleep((amount - self._tokens) / self.rate)
+
+    def adjust(self, amount: float):
+        """Returns (positive) or charges (negative) units after the real cost is known."""
+        if self.rate <= 0:
+            return
+        self._refill()
+        self._tokens = min(self.capacity, self._tokens + amount)
+
+
+# -------------------- Input --------------------
+def _split_interests(value) -> List[str]:
+    if isinstance(value, list):
+        return [str(v).strip() for v in value if str(v).strip()]
+    return [v.strip() for v in str(value or "").replace("|", ";").split(";") if v.strip()]
+
+
+def normalize_request(raw: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    One trip request with the same fields the app collects. ``place`` falls
+    back to city, then country; currency defaults from the country.
+    """
+    country = (raw.get("country") or "").strip()
+    place = (raw.get("place") or raw.get("city") or country).strip()
+    if not place:
+        raise ValueError("request needs a place, city or country")
+    days = int(raw["days"]) if raw.get("days") not in (None, "") else 3
+    if days < 1:
+        raise ValueError(f"days must be at least 1, got {days}")
+    req = {
+        "place": place,
+        "days": days,
+        "budget": float(raw.get("budget") or 5000),
+        "travelers": int(raw.get("travelers") or 1),
+        "interests": _split_interests(raw.get("interests") or "Food"),
+        "travel_type": (raw.get("travel_type") or "Budget").strip(),
+        "currency": (raw.get("currency") or get_currency_for_country(country)).strip(),
+    }
+    budget = calculate_budget_split(req["budget"], req["days"], req["interests"], req["travelers"], req["currency"])
+    req["id"] = str(raw.get("id") or itinerary_cache_key(
+        req["place"], req["days"], budget, req["interests"], req["travel_type"]
+    ))
+    return req
+
+
+def read_requests(path: str) -> Iterator[Dict[str, Any]]:
+    """Reads trip requests from a .csv or .jsonl file."""
+    with open(path, newline="", encoding="utf-8") as f:
+        if path.endswith(".csv"):
+            for row in csv.DictReader(f):
+                yield row
+        else:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def completed_ids(output_path: str) -> Set[str]:
+    """IDs already written successfully, so a crashed run can resume."""
+    done = set()
+    if not os.path.exists(output_path):
+        return done
+    with open(output_path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                rec = json.loads(line)
+            except ValueError:
+                continue  # torn last line from a crash
+            if not rec.get("error"):
+                done.add(rec.get("id"))
+    return done
+
+
+# -------------------- Runner --------------------
+async def run_batch(requests: List[Dict[str, Any]], output_path: str, concurrency: int = 8,
+                    rpm: float = 30, tpm: float = 6000 * 30, client=None,
+                    regenerate: bool = False, resume: bool = True) -> Dict[str, Any]:
+    """
+    Generates itineraries for every request with at most ``concurrency`` in
+    flight, throttled by request and token buckets, appending one JSON line
+    per finished request to output_path. Returns a throughput summary.
+    """
+    client = client or get_async_groq_client()
+    if client is None:
+        raise RuntimeError("Groq API Key not found! Add it to .env or Streamlit secrets.")
+
+    skip = completed_ids(output_path) if resume else set()
+    todo = [r for r in requests if r["id"] not in skip]
+    semaphore = asyncio.Semaphore(concurrency)
+    request_bucket = TokenBucket(rpm)
+    token_bucket = TokenBucket(tpm)
+    write_lock = asyncio.Lock()
+    latencies: List[float] = []
+    stats = {"ok": 0, "failed": 0, "tokens": 0}
+
+    out = open(output_path, "a", encoding="utf-8")
+
+    async def one(req):
+        async with semaphore:
+            budget = calculate_budget_split(req["budget"], req["days"], req["interests"], req["travelers"], req["currency"])
+            # A chunked trip is one completion per day range, each with its own prompt
+            calls = estimate_itinerary_calls(req["days"])
+            await request_bucket.acquire(calls)
+            # Reserve the worst case up front, refund the rest once the real usage is known
+            reserved = estimate_itinerary_tokens(req["days"]) + calls * PROMPT_TOKENS_ESTIMATE
+            await token_bucket.acquire(reserved)
+            started = time.perf_counter()
+            try:
+                result, tokens = await generate_itinerary_async(
+                    client, req["place"], req["days"], budget, req["interests"], req["travel_type"], regenerate
+                )
+                error = result.error
+            except Exception as e:
+                result, tokens, error = None, 0, str(e)
+            token_bucket.adjust(reserved - tokens)
+            elapsed = time.perf_counter() - started
+
+            record = {
+                "id": req["id"],
+                "request": {k: v for k, v in req.items() if k != "id"},
+                "budget": budget,
+                "result": result.to_dict() if result is not None and not error else None,
+                "error": error,
+                "tokens": tokens,
+                "elapsed": round(elapsed, 3),
+            }
+            async with write_lock:
+                out.write(json.dumps(record) + "\n")
+                out.flush()
+                latencies.append(elapsed)
+                stats["tokens"] += tokens
+                stats["failed" if error else "ok"] += 1
+
+    started = time.perf_counter()
+    try:
+        await asyncio.gather(*(one(r) for r in todo))
+    finally:
+        out.close()
+    wall = time.perf_counter() - started
+
+    summary = {
+        "total": len(requests),
+        "skipped": len(requests) - len(todo),
+        "ok": stats["ok"],
+        "failed": stats["failed"],
+        "tokens": stats["tokens"],
+        "wall_s": round(wall, 2),
+        "requests_per_s": round(len(todo) / wall, 2) if wall else 0.0,
+        "tokens_per_s": round(stats["tokens"] / wall, 1) if wall else 0.0,
+    }
+    if latencies:
+        ordered = sorted(latencies)
+        summary["latency_p50_s"] = round(statistics.median(ordered), 3)
+        summary["latency_p95_s"] = round(ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))], 3)
+    return summary
@@ -0,0 +1,165 @@
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, List
+
+from utils import metrics
+
+# Defaults for every upstream breaker; each can be overridden per instance
+BREAKER_WINDOW_S = float(os.getenv("BREAKER_WINDOW_S", "60"))
+BREAKER_MIN_CALLS = int(os.getenv("BREAKER_MIN_CALLS", "5"))
+BREAKER_FAILURE_RATE = float(os.getenv("BREAKER_FAILURE_RATE", "0.5"))
+BREAKER_SLOW_CALL_S = float(os.getenv("BREAKER_SLOW_CALL_S", "2.5"))
+BREAKER_OPEN_S = float(os.getenv("BREAKER_OPEN_S", "30"))
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+# Every breaker registers itself here so stats can be reported in one place
+_breakers: Dict[str, "CircuitBreaker"] = {}
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling an upstream whose breaker is open."""
+
+
+class CircuitBreaker:
+    """
+    Fail-fast guard for one upstream.
+
+    Keeps a rolling window of recent calls; a call counts as bad when it
+    raised or took longer than slow_call_s. Once at least min_calls are in
+    the window and the bad fraction reaches failure_rate, the breaker opens
+    and allow() refuses calls for open_s seconds. After that a single probe
+    is let through (half-open): success closes the breaker, failure reopens it.
+    """
+    def __init__(self, name: str, window_s: float = BREAKER_WINDOW_S, min_calls: int = BREAKER_MIN_CALLS,
+                 failure_rate: float = BREAKER_FAILURE_RATE, slow_call_s: float = BREAKER_SLOW_CALL_S,
+                 open_s: float = BREAKER_OPEN_S):
+        self.name = name
+        self.window_s = window_s
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.slow_call_s = slow_call_s
+        self.open_s = open_s
+        self._lock = threading.Lock()
+        self._calls = deque()            # (finished_at, bad)
+        self._bad = 0
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probing = False
+        self._stats = {"calls": 0, "failures": 0, "slow": 0, "rejected": 0, "opened": 0}
+        _breakers[name] = self
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state(time.monotonic())
+
+    def _current_state(self, now: float) -> str:
+        if self._state == OPEN and now - self._opened_at >= self.open_s:
+            self._state = HALF_OPEN
+            self._probing = False
+        return self._state
+
+    def _trim(self, now: float):
+        while self._calls and now - self._calls[0][0] > self.window_s:
+            _, bad = self._calls.popleft()
+            self._bad -= bad
+
+    def _open(self, now: float):
+        self._state = OPEN
+        self._opened_at = now
+        self._probing = False
+        self._stats["opened"] += 1
+
+    def allow(self) -> bool:
+        """True if a call may go upstream now; counts a rejection otherwise."""
+        with self._lock:
+            state = self._current_state(time.monotonic())
+            if state == CLOSED:
+                return True
+            if state == HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            self._stats["rejected"] += 1
+            return False
+
+    def record(self, ok: bool, latency: float):
+        slow = ok and latency > self.slow_call_s
+        bad = (not ok) or slow
+        now = time.monotonic()
+        with self._lock:
+            self._stats["calls"] += 1
+            self._stats["failures"] += not ok
+            self._stats["slow"] += slow
+            state = self._current_state(now)
+            if state == HALF_OPEN:
+                if bad:
+                    self._open(now)
+                else:
+                    self._state = CLOSED
+                    self._calls.clear()
+                    self._bad = 0
+                return
+            self._calls.append((now, bad))
+            self._bad += bad
+            self._trim(now)
+            if (state == CLOSED and len(self._calls) >= self.min_calls
+                    and self._bad / len(self._calls) >= self.failure_rate):
+                self._open(now)
+
+    @contextmanager
+    def guard(self):
+        """
+        Wraps one upstream call: raises CircuitOpenError when the breaker
+        refuses it, otherwise records the outcome and latency.
+
+            with osrm_breaker.guard():
+                response = http_client.get(url)
+        """
+        if not self.allow():
+            raise CircuitOpenError(f"{self.name} circuit is open")
+        started = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            self.record(False, time.perf_counter() - started)
+            raise
+        self.record(True, time.perf_counter() - started)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            now = time.monotonic()
+            self._trim(now)
+            stats = dict(self._stats)
+            stats["state"] = self._current_state(now)
+            stats["window_calls"] = len(self._calls)
+            stats["window_bad_rate"] = round(self._bad / len(self._calls), 3) if self._calls else 0.0
+        return stats
+
+
+def breaker_stats() -> Dict[str, Dict]:
+    """Per-upstream breaker state and counters."""
+    return {name: b.stats() for name, b in _breakers.items()}
+
+
+_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+def _prometheus_lines() -> List[str]:
+    lines = [
+        "# HELP travel_planner_breaker_state Upstream circuit state (0 closed, 1 half-open, 2 open).",
+        "# TYPE travel_planner_breaker_state gauge",
+    ]
+    stats = breaker_stats()
+    for name, s in stats.items():
+        lines.append(f'travel_planner_breaker_state{{upstream="{name}"}} {_STATE_VALUES[s["state"]]}')
+    lines.append("# TYPE travel_planner_breaker_rejected_total counter")
+    for name, s in stats.items():
+        lines.append(f'travel_planner_breaker_rejected_total{{upstream="{name}"}} {s["rejected"]}')
+    return lines
+
+
+metrics.register_collector(_prometheus_lines)
@@ -0,0 +1,219 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+# Sentinel so a cached ``None`` (negative result) can be told apart from a miss
+MISS = object()
+
+
+class LRUCache:
+    """
+    Thread-safe in-process LRU with a per-entry expiry time.
+    """
+    def __init__(self, max_size: int = 1024):
+        self.max_size = max_size
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Any:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return MISS
+            value, expires_at = item
+            if expires_at is not None and expires_at < time.time():
+                del self._data[key]
+                return MISS
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None, expires_at: Optional[float] = None):
+        if expires_at is None and ttl is not None:
+            expires_at = time.time() + ttl
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def delete(self, key: str):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class SQLiteCache:
+    """
+    On-disk key/value store backed by a single SQLite table.
+    Values are stored as JSON, expired rows are ignored on read and purged on write.
+    When ``max_entries`` is set the least recently used rows are evicted.
+    """
+    def __init__(self, path: str, table: str = "cache", max_entries: Optional[int] = None):
+        self.path = path
+        self.table = table
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {table} ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                "expires_at REAL, accessed_at REAL NOT NULL)"
+            )
+
+    def get_with_expiry(self, key: str):
+        """Returns (value, expires_at) or (MISS, None)."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT value, expires_at FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return MISS, None
+            value, expires_at = row
+            if expires_at is not None and expires_at < now:
+                with self._conn:
+                    self._conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+                return MISS, None
+            if self.max_entries:
+                with self._conn:
+                    self._conn.execute(
+                        f"UPDATE {self.table} SET accessed_at = ? WHERE key = ?", (now, key)
+                    )
+        return json.loads(value), expires_at
+
+    def get(self, key: str) -> Any:
+        return self.get_with_expiry(key)[0]
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        now = time.time()
+        expires_at = now + ttl if ttl is not None else None
+        payload = json.dumps(value)
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, expires_at, accessed_at) "
+                "VALUES (?, ?, ?, ?)",
+                (key, payload, expires_at, now),
+            )
+            self._conn.execute(
+                f"DELETE FROM {self.table} WHERE expires_at IS NOT NULL AND expires_at < ?", (now,)
+            )
+            if self.max_entries:
+                self._conn.execute(
+                    f"DELETE FROM {self.table} WHERE key IN ("
+                    f"SELECT key FROM {self.table} ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,),
+                )
+
+    def delete(self, key: str):
+        with self._lock, self._conn:
+            self._conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+
+    def clear(self):
+        with self._lock, self._conn:
+            self._conn.execute(f"DELETE FROM {self.table}")
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+
+
+class TieredCache:
+    """
+    In-process LRU in front of an optional SQLite store.
+
+    ``ttl`` applies to normal values and ``negative_ttl`` to ``None`` values,
+    so "not found" answers are remembered for a shorter time.
+    Hit/miss counters are kept per tier.
+    """
+    def __init__(self, memory: LRUCache, disk: Optional[SQLiteCache] = None,
+                 ttl: Optional[float] = None, negative_ttl: Optional[float] = None):
+        self.memory = memory
+        self.disk = disk
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl if negative_ttl is not None else ttl
+        self._stats_lock = threading.Lock()
+        self._stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "writes": 0}
+
+    def _count(self, name: str):
+        with self._stats_lock:
+            self._stats[name] += 1
+
+    def get(self, key: str) -> Any:
+        value = self.memory.get(key)
+        if value is not MISS:
+            self._count("memory_hits")
+            return value
+
+        if self.disk is not None:
+            try:
+                value, expires_at = self.disk.get_with_expiry(key)
+            except sqlite3.Error as e:
+                print(f"Cache read error: {e}")
+                value, expires_at = MISS, None
+            if value is not MISS:
+                self._count("disk_hits")
+                self.memory.set(key, value, expires_at=expires_at)
+                return value
+
+        self._count("misses")
+        return MISS
+
+    def peek(self, key: str) -> Any:
+        """Like get(), but leaves the hit/miss counters and the memory tier alone."""
+        value = self.memory.get(key)
+        if value is MISS and self.disk is not None:
+            try:
+                value = self.disk.get_with_expiry(key)[0]
+            except sqlite3.Error:
+                value = MISS
+        return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        if ttl is None:
+            ttl = self.negative_ttl if value is None else self.ttl
+        self.memory.set(key, value, ttl=ttl)
+        if self.disk is not None:
+            try:
+                self.disk.set(key, value, ttl=ttl)
+            except sqlite3.Error as e:
+                print(f"Cache write error: {e}")
+        self._count("writes")
+
+    def delete(self, key: str):
+        self.memory.delete(key)
+        if self.disk is not None:
+            self.disk.delete(key)
+
+    def clear(self):
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+
+    def stats(self) -> Dict[str, float]:
+        with self._stats_lock:
+            stats = dict(self._stats)
+        hits = stats["memory_hits"] + stats["disk_hits"]
+        lookups = hits + stats["misses"]
+        stats["hits"] = hits
+        stats["hit_rate"] = round(hits / lookups, 4) if lookups else 0.0
+        return stats
+
+
+def normalize_key(text: str) -> str:
+    """Case- and whitespace-insensitive key for place names and similar inputs."""
+    return " ".join(str(text).casefold().split())
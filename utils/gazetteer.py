@@ -0,0 +1,186 @@
+import csv
+import hashlib
+import os
+import re
+import threading
+import unicodedata
+from pathlib import Path
+from typing import List, NamedTuple, Optional, Tuple
+
+# numpy is imported inside the functions that need it, so normalize_place
+# can be used from the landing form (utils.autocomplete) without loading it
+ROOT = Path(__file__).parent.parent
+GAZETTEER_CSV = os.getenv("GAZETTEER_CSV", str(ROOT / "data" / "gazetteer.csv"))
+GAZETTEER_INDEX = os.getenv("GAZETTEER_INDEX", str(ROOT / ".cache" / "gazetteer"))
+
+# One file per column, each loaded with np.load(mmap_mode="r")
+_FILES = ("hashes", "keys", "names", "kinds", "countries", "coords", "prefix_keys", "prefix_rows")
+_APOSTROPHE_RE = re.compile(r"['\u2019`]")
+_NON_WORD_RE = re.compile(r"[^\w]+")
+
+
+class Place(NamedTuple):
+    name: str
+    kind: str
+    country: str
+    lat: float
+    lon: float
+
+
+def normalize_place(text: str) -> str:
+    """Casefolded, accent-free, punctuation-free form used as the lookup key."""
+    text = unicodedata.normalize("NFKD", str(text))
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    text = _APOSTROPHE_RE.sub("", text.casefold())
+    return " ".join(_NON_WORD_RE.sub(" ", text).split())
+
+
+def place_hash(key: str) -> int:
+    return int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+# -------------------- Build --------------------
+def build_index(csv_path: str = GAZETTEER_CSV, out_dir: str = GAZETTEER_INDEX) -> int:
+    """
+    Compiles the gazetteer CSV (name,kind,country,lat,lon,aliases) into
+    array files in out_dir. Aliases are ';'-separated and point to the same
+    place. Returns the number of keys written.
+    """
+    import numpy as np
+
+    rows = []
+    seen = set()
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        for rec in csv.DictReader(f):
+            names = [rec["name"]] + [a for a in (rec.get("aliases") or "").split(";") if a.strip()]
+            for alias in names:
+                key = normalize_place(alias)
+                # First entry wins, so countries/cities listed earlier take priority
+                if not key or key in seen:
+                    continue
+                seen.add(key)
+                rows.append((place_hash(key), key, rec["name"], rec["kind"], rec["country"],
+                             float(rec["lat"]), float(rec["lon"])))
+
+    rows.sort(key=lambda r: r[0])
+    os.makedirs(out_dir, exist_ok=True)
+    keys = np.array([r[1].encode("utf-8") for r in rows])
+    arrays = {
+        "hashes": np.array([r[0] for r in rows], dtype=np.uint64),
+        "keys": keys,
+        "names": np.array([r[2].encode("utf-8") for r in rows]),
+        "kinds": np.array([r[3].encode("utf-8") for r in rows]),
+        "countries": np.array([r[4].encode("utf-8") for r in rows]),
+        "coords": np.array([(r[5], r[6]) for r in rows], dtype=np.float64).reshape(-1, 2),
+    }
+    prefix_rows = np.argsort(keys, kind="stable")
+    arrays["prefix_keys"] = keys[prefix_rows]
+    arrays["prefix_rows"] = prefix_rows.astype(np.int64)
+
+    for name, arr in arrays.items():
+        tmp = os.path.join(out_dir, f"{name}.tmp.npy")
+        np.save(tmp, arr)
+        os.replace(tmp, os.path.join(out_dir, f"{name}.npy"))
+    return len(rows)
+
+
+# -------------------- Lookup --------------------
+class Gazetteer:
+    """
+    Offline place index backed by memory-mapped NumPy arrays.
+
+    lookup() hashes the normalized name and binary-searches the sorted hash
+    column; search_prefix() binary-searches the sorted key column.
+    """
+    def __init__(self, index_dir: str = GAZETTEER_INDEX):
+        import numpy as np
+
+        arrays = {name: np.load(os.path.join(index_dir, f"{name}.npy"), mmap_mode="r") for name in _FILES}
+        self._hashes = arrays["hashes"]
+        self._keys = arrays["keys"]
+        self._names = arrays["names"]
+        self._kinds = arrays["kinds"]
+        self._countries = arrays["countries"]
+        self._coords = arrays["coords"]
+        self._prefix_keys = arrays["prefix_keys"]
+        self._prefix_rows = arrays["prefix_rows"]
+
+    def __len__(self):
+        return len(self._hashes)
+
+    def _place(self, row: int) -> Place:
+        lat, lon = self._coords[row]
+        return Place(
+            self._names[row].decode("utf-8"),
+            self._kinds[row].decode("utf-8"),
+            self._countries[row].decode("utf-8"),
+            float(lat), float(lon),
+        )
+
+    def lookup(self, name: str) -> Optional[Place]:
+        import numpy as np
+
+        key = normalize_place(name)
+        if not key:
+            return None
+        h = np.uint64(place_hash(key))
+        row = int(np.searchsorted(self._hashes, h))
+        encoded = key.encode("utf-8")
+        # Walk the (rare) run of equal hashes and confirm the key itself
+        while row < len(self._hashes) and self._hashes[row] == h:
+            if self._keys[row] == encoded:
+                return self._place(row)
+            row += 1
+        return None
+
+    def coordinates(self, name: str) -> Tuple[Optional[float], Optional[float]]:
+        place = self.lookup(name)
+        return (place.lat, place.lon) if place else (None, None)
+
+    def search_prefix(self, prefix: str, limit: int = 10) -> List[Place]:
+        import numpy as np
+
+        key = normalize_place(prefix).encode("utf-8")
+        if not key:
+            return []
+        lo = int(np.searchsorted(self._prefix_keys, key, side="left"))
+        out = []
+        seen = set()
+        for i in range(lo, len(self._prefix_keys)):
+            if not self._prefix_keys[i].startswith(key) or len(out) >= limit:
+                break
+            place = self._place(int(self._prefix_rows[i]))
+            if place.name not in seen:
+                seen.add(place.name)
+                out.append(place)
+        return out
+
+
+_gazetteer = None
+_gazetteer_lock = threading.Lock()
+_gazetteer_failed = False
+
+def _index_is_stale(csv_path: str, index_dir: str) -> bool:
+    marker = os.path.join(index_dir, "hashes.npy")
+    if not all(os.path.exists(os.path.join(index_dir, f"{n}.npy")) for n in _FILES):
+        return True
+    return os.path.exists(csv_path) and os.path.getmtime(csv_path) > os.path.getmtime(marker)
+
+def get_gazetteer() -> Optional[Gazetteer]:
+    """
+    Shared index, compiled from the bundled CSV on first use if it is missing
+    or older than the CSV. Returns None if neither is available.
+    """
+    global _gazetteer, _gazetteer_failed
+    if _gazetteer is not None or _gazetteer_failed:
+        return _gazetteer
+    with _gazetteer_lock:
+        if _gazetteer is None and not _gazetteer_failed:
+            try:
+                if _index_is_stale(GAZETTEER_CSV, GAZETTEER_INDEX):
+                    build_index(GAZETTEER_CSV, GAZETTEER_INDEX)
+                _gazetteer = Gazetteer(GAZETTEER_INDEX)
+            except Exception as e:
+                print(f"Offline gazetteer unavailable: {e}")
+                _gazetteer_failed = True
+    return _gazetteer
@@ -0,0 +1,121 @@
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+EARTH_RADIUS_M = 6371008.8
+
+
+def _project(coords: np.ndarray) -> np.ndarray:
+    """(lat, lon) degrees -> local equirectangular (x, y) metres."""
+    lat = np.radians(coords[:, 0])
+    lon = np.radians(coords[:, 1])
+    x = lon * np.cos(lat.mean()) * EARTH_RADIUS_M
+    y = lat * EARTH_RADIUS_M
+    return np.column_stack((x, y))
+
+
+def douglas_peucker_importance(coords: Sequence[Tuple[float, float]], min_importance: float = 0.0) -> np.ndarray:
+    """
+    Douglas-Peucker significance of every vertex, in metres.
+
+    Each interior vertex gets the deviation at which DP would keep it, capped
+    by its parent's value so the ranking is hierarchical: keeping all
+    vertices above any threshold gives exactly the DP result for that
+    tolerance. Endpoints are +inf.
+
+    The recursion runs breadth-first: every segment of one level is split in
+    a single vectorized pass over all its interior points. Segments whose
+    split value is at or below min_importance are not refined further.
+    """
+    pts = np.asarray(coords, dtype=np.float64)
+    n = len(pts)
+    importance = np.zeros(n)
+    if n == 0:
+        return importance
+    importance[0] = importance[-1] = np.inf
+    if n < 3:
+        return importance
+
+    xy = _project(pts)
+    starts = np.array([0])
+    ends = np.array([n - 1])
+    parents = np.array([np.inf])
+    while len(starts):
+        lengths = ends - starts - 1
+        offsets = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+        seg = np.repeat(np.arange(len(starts)), lengths)
+        idx = starts[seg] + 1 + (np.arange(len(seg)) - offsets[seg])
+
+        # Distance of every interior point to its own segment's chord
+        a = xy[starts[seg]]
+        ab = xy[ends[seg]] - a
+        ap = xy[idx] - a
+        length_sq = np.einsum("ij,ij->i", ab, ab)
+        t = np.divide(np.einsum("ij,ij->i", ap, ab), length_sq, out=np.zeros(len(seg)), where=length_sq > 0)
+        t = np.clip(t, 0.0, 1.0)
+        dist = np.hypot(*(ap - t[:, None] * ab).T)
+
+        # First argmax per segment
+        seg_max = np.maximum.reduceat(dist, offsets)
+        hits = np.flatnonzero(dist == seg_max[seg])
+        _, first = np.unique(seg[hits], return_index=True)
+        split = idx[hits[first]]
+        value = np.minimum(seg_max, parents)
+        importance[split] = value
+
+        refine = value > min_importance
+        s, e, v, m = starts[refine], ends[refine], value[refine], split[refine]
+        next_starts = np.concatenate((s, m))
+        next_ends = np.concatenate((m, e))
+        next_parents = np.concatenate((v, v))
+        wide = next_ends - next_starts >= 2
+        starts, ends, parents = next_starts[wide], next_ends[wide], next_parents[wide]
+    return importance
+
+
+def simplify_line(coords: Sequence[Tuple[float, float]], tolerance_m: Optional[float] = None,
+                  max_points: Optional[int] = None) -> List[Tuple[float, float]]:
+    """
+    Simplifies a (lat, lon) polyline with Douglas-Peucker.
+
+    tolerance_m drops vertices that deviate less than that many metres from
+    the simplified line; max_points keeps at most that many of the most
+    significant vertices. Both can be combined. Endpoints are always kept.
+    """
+    if coords is None or len(coords) < 3 or (tolerance_m is None and max_points is None):
+        return [tuple(c) for c in coords] if coords is not None else []
+
+    pts = np.asarray(coords, dtype=np.float64)
+    importance = douglas_peucker_importance(pts, min_importance=tolerance_m or 0.0)
+    keep = np.ones(len(pts), dtype=bool)
+    if tolerance_m is not None:
+        keep &= importance > tolerance_m
+    if max_points is not None and keep.sum() > max_points:
+        budget = max(2, max_points)
+        ranked = np.argsort(-np.where(keep, importance, -1.0), kind="stable")[:budget]
+        keep = np.zeros(len(pts), dtype=bool)
+        keep[ranked] = True
+    keep[0] = keep[-1] = True
+    return [tuple(p) for p in pts[keep].tolist()]
+
+
+def haversine_matrix(coords: Sequence[Tuple[float, float]]) -> np.ndarray:
+    """Pairwise great-circle distances in metres between (lat, lon) points."""
+    pts = np.radians(np.asarray(coords, dtype=np.float64).reshape(-1, 2))
+    lat = pts[:, 0][:, None]
+    lon = pts[:, 1][:, None]
+    dlat = lat - lat.T
+    dlon = lon - lon.T
+    h = np.sin(dlat / 2) ** 2 + np.cos(lat) * np.cos(lat.T) * np.sin(dlon / 2) ** 2
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.clip(h, 0.0, 1.0)))
+
+
+def path_length_m(coords: Sequence[Tuple[float, float]]) -> float:
+    """Great-circle length in metres of the path through (lat, lon) points in order."""
+    pts = np.radians(np.asarray(coords, dtype=np.float64).reshape(-1, 2))
+    if len(pts) < 2:
+        return 0.0
+    dlat = np.diff(pts[:, 0])
+    dlon = np.diff(pts[:, 1])
+    h = np.sin(dlat / 2) ** 2 + np.cos(pts[:-1, 0]) * np.cos(pts[1:, 0]) * np.sin(dlon / 2) ** 2
+    return float((2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.clip(h, 0.0, 1.0)))).sum())
@@ -0,0 +1,195 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from utils.cache import LRUCache, MISS, normalize_key
+
+# Saved plans live here instead of in each session; "" keeps them in memory only
+TRIP_HISTORY_PATH = os.getenv("TRIP_HISTORY_PATH", ".cache/history.sqlite")
+HISTORY_PAGE_SIZE = int(os.getenv("HISTORY_PAGE_SIZE", "10"))
+HISTORY_MAX_TRIPS = int(os.getenv("HISTORY_MAX_TRIPS", "200"))          # per user, oldest dropped first
+HISTORY_OPEN_CACHE_SIZE = int(os.getenv("HISTORY_OPEN_CACHE_SIZE", "32"))  # decompressed trips kept hot
+COMPRESSION_LEVEL = 6
+
+
+class TripSummary(NamedTuple):
+    """One row of a history listing; never touches the compressed payloads."""
+    trip_id: str
+    place: str
+    days: int
+    total_cost: Optional[float]
+    currency: str
+    updated_at: float
+
+
+class TripRecord(NamedTuple):
+    trip_id: str
+    inputs: Dict[str, Any]
+    itinerary: Any              # ItineraryResult
+    budget: Dict[str, Any]
+    map_data: Optional[Dict[str, Any]]
+    updated_at: float
+
+
+def trip_hash(inputs: Dict[str, Any]) -> str:
+    """Stable ID for a set of form inputs; the same trip planned again maps to the same row."""
+    canonical = {
+        "place": normalize_key(str(inputs.get("place", ""))),
+        "days": int(inputs.get("days", 0)),
+        "budget": float(inputs.get("budget", 0)),
+        "travelers": int(inputs.get("travelers", 1)),
+        "interests": sorted(normalize_key(i) for i in inputs.get("interests", [])),
+        "travel_type": normalize_key(str(inputs.get("travel_type", ""))),
+        "currency": str(inputs.get("currency", "")).upper(),
+    }
+    blob = json.dumps(canonical, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha1(blob.encode("utf-8")).hexdigest()[:16]
+
+
+def _pack(value: Any) -> bytes:
+    return zlib.compress(json.dumps(value, separators=(",", ":")).encode("utf-8"), COMPRESSION_LEVEL)
+
+
+def _unpack(blob: Optional[bytes]) -> Any:
+    return json.loads(zlib.decompress(blob).decode("utf-8")) if blob else None
+
+
+class TripHistory:
+    """
+    Per-user trip history in one SQLite table.
+
+    The plan (itinerary, budget, inputs) and the map description are stored
+    as separate zlib-compressed JSON blobs next to a few plain columns, so
+    listings read only the small columns and a trip is decompressed only
+    when it is opened.
+    """
+    def __init__(self, path: str = TRIP_HISTORY_PATH, max_trips: int = HISTORY_MAX_TRIPS):
+        self.path = path or ":memory:"
+        self.max_trips = max_trips
+        self._lock = threading.Lock()
+        self._opened = LRUCache(HISTORY_OPEN_CACHE_SIZE)
+        folder = os.path.dirname(path) if path else ""
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        with self._lock, self._conn:
+            if path:
+                self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS trips ("
+                "user_id TEXT NOT NULL, trip_id TEXT NOT NULL, "
+                "place TEXT NOT NULL, days INTEGER NOT NULL, total_cost REAL, currency TEXT NOT NULL, "
+                "plan BLOB NOT NULL, map BLOB, raw_bytes INTEGER NOT NULL, "
+                "created_at REAL NOT NULL, updated_at REAL NOT NULL, "
+                "PRIMARY KEY (user_id, trip_id))"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS trips_by_user ON trips (user_id, updated_at DESC)")
+
+    def save(self, user_id: str, inputs: Dict[str, Any], itinerary, budget: Dict[str, Any],
+             map_data: Optional[Dict[str, Any]] = None) -> str:
+        """Stores (or replaces) the plan for inputs and returns its trip ID."""
+        trip_id = trip_hash(inputs)
+        # Day cards are cut back out of the html on open, so they are not stored twice
+        stored = {k: v for k, v in itinerary.to_dict().items() if k != "days"}
+        plan = {"inputs": inputs, "itinerary": stored, "budget": budget}
+        plan_blob = _pack(plan)
+        map_blob = _pack(map_data) if map_data else None
+        raw = len(json.dumps(plan)) + (len(json.dumps(map_data)) if map_data else 0)
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO trips (user_id, trip_id, place, days, total_cost, currency, plan, map, raw_bytes, "
+                "created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (user_id, trip_id) DO UPDATE SET total_cost = excluded.total_cost, "
+                "plan = excluded.plan, map = excluded.map, raw_bytes = excluded.raw_bytes, "
+                "updated_at = excluded.updated_at",
+                (user_id, trip_id, str(inputs.get("place", "")), int(inputs.get("days", 0)),
+                 itinerary.total_cost, itinerary.currency, plan_blob, map_blob, raw, now, now),
+            )
+            if self.max_trips:
+                self._conn.execute(
+                    "DELETE FROM trips WHERE user_id = ? AND trip_id IN ("
+                    "SELECT trip_id FROM trips WHERE user_id = ? ORDER BY updated_at DESC LIMIT -1 OFFSET ?)",
+                    (user_id, user_id, self.max_trips),
+                )
+        self._opened.delete((user_id, trip_id))
+        return trip_id
+
+    def list_trips(self, user_id: str, page: int = 0,
+                   page_size: int = HISTORY_PAGE_SIZE) -> Tuple[List[TripSummary], int]:
+        """One page of the user's trips, newest first, plus the total number of trips."""
+        with self._lock:
+            total = self._conn.execute("SELECT COUNT(*) FROM trips WHERE user_id = ?", (user_id,)).fetchone()[0]
+            rows = self._conn.execute(
+                "SELECT trip_id, place, days, total_cost, currency, updated_at FROM trips "
+                "WHERE user_id = ? ORDER BY updated_at DESC LIMIT ? OFFSET ?",
+                (user_id, page_size, max(0, page) * page_size),
+            ).fetchall()
+        return [TripSummary(*row) for row in rows], total
+
+    def open_trip(self, user_id: str, trip_id: str) -> Optional[TripRecord]:
+        """Decompresses one trip; recently opened trips are served from a small LRU."""
+        from utils.itinerary_ai import ItineraryResult
+
+        key = (user_id, trip_id)
+        record = self._opened.get(key)
+        if record is not MISS:
+            return record
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT plan, map, updated_at FROM trips WHERE user_id = ? AND trip_id = ?", (user_id, trip_id)
+            ).fetchone()
+        if row is None:
+            return None
+        plan = _unpack(row[0])
+        record = TripRecord(
+            trip_id=trip_id,
+            inputs=plan["inputs"],
+            itinerary=ItineraryResult.from_dict(plan["itinerary"]),
+            budget=plan["budget"],
+            map_data=_unpack(row[1]),
+            updated_at=row[2],
+        )
+        self._opened.set(key, record)
+        return record
+
+    def delete(self, user_id: str, trip_id: str):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM trips WHERE user_id = ? AND trip_id = ?", (user_id, trip_id))
+        self._opened.delete((user_id, trip_id))
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            trips, raw, stored = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(raw_bytes), 0), "
+                "COALESCE(SUM(LENGTH(plan) + COALESCE(LENGTH(map), 0)), 0) FROM trips"
+            ).fetchone()
+        return {
+            "trips": trips,
+            "raw_bytes": raw,
+            "stored_bytes": stored,
+            "compression_ratio": round(raw / stored, 2) if stored else 0.0,
+        }
+
+
+_history = None
+_history_lock = threading.Lock()
+
+
+def get_history() -> TripHistory:
+    """Process-wide store, opened on first use (in memory if the file cannot be opened)."""
+    global _history
+    if _history is None:
+        with _history_lock:
+            if _history is None:
+                try:
+                    _history = TripHistory()
+                except Exception as e:
+                    print(f"Trip history kept in memory only: {e}")
+                    _history = TripHistory("")
+    return _history
@@ -0,0 +1,142 @@
+import os
+import threading
+from typing import Dict
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# --- Defaults shared by every upstream (Nominatim, OSRM, FX) ---
+HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "5"))
+HTTP_RETRIES = int(os.getenv("HTTP_RETRIES", "2"))
+HTTP_BACKOFF = float(os.getenv("HTTP_BACKOFF", "0.3"))
+USER_AGENT = "TravelPlanner/1.0"
+
+# Max simultaneous in-flight requests per host; also sizes the keep-alive pool
+HOST_LIMITS = {
+    "nominatim.openstreetmap.org": 2,
+    "router.project-osrm.org": 4,
+    "open.er-api.com": 2,
+}
+DEFAULT_HOST_LIMIT = int(os.getenv("HTTP_HOST_LIMIT", "8"))
+
+# Hosts whose callers pace and time every attempt themselves get fewer
+# transport retries. Nominatim retries would bypass maps.nominatim_limiter
+# (1 req/s policy) and stretch one breaker-timed call to several timeouts.
+HOST_RETRIES = {
+    "nominatim.openstreetmap.org": 0,
+}
+
+
+class HttpClient:
+    """
+    Pooled HTTP client with one keep-alive Session per host.
+
+    Every request gets the same timeout and bounded retry policy
+    (exponential backoff on connection errors, 429 and 5xx) unless
+    host_retries overrides the retry count for its host, and the number
+    of concurrent requests per host is capped by a semaphore.
+    """
+    def __init__(self, timeout: float = HTTP_TIMEOUT, retries: int = HTTP_RETRIES,
+                 backoff: float = HTTP_BACKOFF, host_limits: Dict[str, int] = None,
+                 host_retries: Dict[str, int] = None):
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.host_limits = dict(HOST_LIMITS if host_limits is None else host_limits)
+        self.host_retries = dict(HOST_RETRIES if host_retries is None else host_retries)
+        self._lock = threading.Lock()
+        self._sessions: Dict[str, requests.Session] = {}
+        self._semaphores: Dict[str, threading.BoundedSemaphore] = {}
+        self._counts: Dict[str, Dict[str, int]] = {}
+
+    def _limit(self, host: str) -> int:
+        return self.host_limits.get(host, DEFAULT_HOST_LIMIT)
+
+    def set_retries(self, host: str, retries: int):
+        """Overrides the transport retry count for host (e.g. a configured NOMINATIM_URL)."""
+        with self._lock:
+            self.host_retries[host] = retries
+            session = self._sessions.pop(host, None)
+        # Rebuilt with the new policy on next use
+        if session is not None:
+            session.close()
+
+    def _session(self, host: str) -> requests.Session:
+        with self._lock:
+            session = self._sessions.get(host)
+            if session is None:
+                limit = self._limit(host)
+                retry = Retry(
+                    total=self.host_retries.get(host, self.retries),
+                    backoff_factor=self.backoff,
+                    status_forcelist=(429, 500, 502, 503, 504),
+                    allowed_methods=frozenset({"GET"}),
+                    raise_on_status=False,
+                )
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=limit, max_retries=retry)
+                session = requests.Session()
+                session.headers["User-Agent"] = USER_AGENT
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                self._sessions[host] = session
+                self._semaphores[host] = threading.BoundedSemaphore(limit)
+                self._counts[host] = {"requests": 0, "errors": 0}
+            return session
+
+    def _count(self, host: str, name: str):
+        with self._lock:
+            self._counts[host][name] += 1
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        host = urlsplit(url).hostname or ""
+        session = self._session(host)
+        kwargs.setdefault("timeout", self.timeout)
+        with self._semaphores[host]:
+            self._count(host, "requests")
+            try:
+                return session.get(url, **kwargs)
+            except requests.RequestException:
+                self._count(host, "errors")
+                raise
+
+    def metrics(self) -> Dict[str, Dict[str, float]]:
+        """
+        Per-host request/error counts and connection reuse.
+        ``connections`` is how many TCP/TLS connections were opened;
+        every other request reused a pooled keep-alive connection.
+        """
+        with self._lock:
+            hosts = list(self._sessions.items())
+            counts = {h: dict(c) for h, c in self._counts.items()}
+
+        out = {}
+        for host, session in hosts:
+            connections = 0
+            sent = 0
+            for adapter in {id(a): a for a in session.adapters.values()}.values():
+                pools = adapter.poolmanager.pools
+                for key in pools.keys():
+                    pool = pools[key]
+                    connections += pool.num_connections
+                    sent += pool.num_requests
+            stats = counts.get(host, {"requests": 0, "errors": 0})
+            stats["connections"] = connections
+            stats["reuse_ratio"] = round(1 - connections / sent, 4) if sent else 0.0
+            out[host] = stats
+        return out
+
+    def close(self):
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+            self._semaphores.clear()
+
+
+# Shared process-wide client
+http = HttpClient()
+
+def get(url: str, **kwargs) -> requests.Response:
+    return http.get(url, **kwargs)
@@ -1,41 +1,167 @@
 import os
+import asyncio
+import re
 import json
+import time
+import copy
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from pathlib import Path
-from dotenv import load_dotenv
-import streamlit as st
-from groq import Groq
-from bs4 import BeautifulSoup  
+from typing import Any, Dict, List, NamedTuple, Optional
 
-# --- Load environment ---
-load_dotenv()
-env_path = Path(__file__).parent.parent / ".env"  # adjust as needed
-load_dotenv(dotenv_path=env_path)
+from utils.cache import LRUCache, SQLiteCache, TieredCache, MISS, normalize_key
+from utils.metrics import observe, span
+from utils.pricing import COST_SUMMARY_RE, as_number, format_amount, reconcile_prices, settle_prices
+from utils.singleflight import SingleFlight
+from utils.travel_utils import calculate_budget_split
+
+# Heavy dependencies (dotenv, streamlit secrets, groq) are imported on
+# first use so importing this module stays cheap for the landing page.
+_client = None
+_client_lock = threading.Lock()
+_client_ready = False
+
+# Point at a compatible endpoint (e.g. a local fake server) instead of api.groq.com
+GROQ_BASE_URL = os.getenv("GROQ_BASE_URL") or None
 
 # --- Load API key ---
-try:
-    API_KEY = st.secrets["groq"]["api_key"]
-except Exception:
-    API_KEY = os.getenv("GROQ_API_KEY")
+def _load_api_key():
+    from dotenv import load_dotenv
 
-if not API_KEY:
-    raise ValueError("Groq API Key not found! Add it to .env or Streamlit secrets.")
+    env_path = Path(__file__).parent.parent / ".env"
+    load_dotenv(dotenv_path=env_path if env_path.exists() else None)
+    try:
+        import streamlit as st
+        return st.secrets["groq"]["api_key"]
+    except Exception:
+        return os.getenv("GROQ_API_KEY")
 
 # --- Initialize Groq client ---
 def get_groq_client():
+    """Builds the Groq client once, on first use. Returns None if no key is configured."""
+    global _client, _client_ready
+    if _client_ready:
+        return _client
+    with _client_lock:
+        if not _client_ready:
+            api_key = _load_api_key()
+            if not api_key:
+                print("Groq API Key not found! Add it to .env or Streamlit secrets.")
+            else:
+                try:
+                    from groq import Groq
+                    _client = Groq(api_key=api_key, base_url=GROQ_BASE_URL)
+                except Exception as e:
+                    print(f"Failed to initialize Groq client: {e}")
+            _client_ready = True
+    return _client
+
+def get_async_groq_client(**kwargs):
+    """New AsyncGroq client for batch jobs, or None if no key is configured."""
+    api_key = _load_api_key()
+    if not api_key:
+        return None
+    from groq import AsyncGroq
+    return AsyncGroq(api_key=api_key, base_url=GROQ_BASE_URL, **kwargs)
+
+ITINERARY_MODEL = "llama-3.3-70b-versatile"
+ITINERARY_MAX_TOKENS = 6000
+SUGGESTION_MAX_TOKENS = 300
+
+# --- Long trips ---
+# Trips longer than ITINERARY_CHUNK_DAYS are generated as parallel day-range
+# chunks (0 disables). Each chunk asks for a base allowance plus a per-day
+# allowance of completion tokens instead of the full ITINERARY_MAX_TOKENS.
+ITINERARY_CHUNK_DAYS = int(os.getenv("ITINERARY_CHUNK_DAYS", "4"))
+ITINERARY_CHUNK_WORKERS = int(os.getenv("ITINERARY_CHUNK_WORKERS", "6"))
+ITINERARY_TOKENS_BASE = int(os.getenv("ITINERARY_TOKENS_BASE", "600"))
+ITINERARY_TOKENS_PER_DAY = int(os.getenv("ITINERARY_TOKENS_PER_DAY", "900"))
+# Prompt tokens are not bounded by max_tokens; token budgets charge a flat allowance per call
+PROMPT_TOKENS_ESTIMATE = 700
+
+# Price tags are always checked and small gaps repaired locally, with no
+# extra call. Set PRICE_REASK=1 to also ask the model once more when its tags
+# miss total_cost by more than utils.pricing.PRICE_RESCALE_TOLERANCE; that is
+# one extra completion per affected trip (or chunk), so it is off by default.
+PRICE_REASK = os.getenv("PRICE_REASK", "0") in ("1", "true", "True")
+
+# --- Itinerary response cache ---
+ITINERARY_CACHE_PATH = os.getenv("ITINERARY_CACHE_PATH", ".cache/itinerary.sqlite")
+ITINERARY_CACHE_SIZE = int(os.getenv("ITINERARY_CACHE_SIZE", "256"))
+ITINERARY_CACHE_MAX_ENTRIES = int(os.getenv("ITINERARY_CACHE_MAX_ENTRIES", "5000"))
+ITINERARY_CACHE_TTL = float(os.getenv("ITINERARY_CACHE_TTL", str(7 * 24 * 3600)))
+
+def _open_itinerary_store():
+    if not ITINERARY_CACHE_PATH:
+        return None
+    try:
+        return SQLiteCache(ITINERARY_CACHE_PATH, table="itinerary", max_entries=ITINERARY_CACHE_MAX_ENTRIES)
+    except Exception as e:
+        print(f"Itinerary cache disabled: {e}")
+        return None
+
+itinerary_cache = TieredCache(
+    LRUCache(ITINERARY_CACHE_SIZE),
+    _open_itinerary_store(),
+    ttl=ITINERARY_CACHE_TTL,
+)
+
+# Identical requests from concurrent sessions wait on one completion
+itinerary_flight = SingleFlight("itinerary")
+
+# --- Suggestion cache (same store, own table) ---
+SUGGESTION_CACHE_TTL = float(os.getenv("SUGGESTION_CACHE_TTL", str(24 * 3600)))
+
+def _open_suggestion_store():
+    if not ITINERARY_CACHE_PATH:
+        return None
     try:
-        return Groq(api_key=API_KEY)
+        return SQLiteCache(ITINERARY_CACHE_PATH, table="suggestions", max_entries=ITINERARY_CACHE_MAX_ENTRIES)
     except Exception as e:
-        print(f"Failed to initialize Groq client: {e}")
+        print(f"Suggestion cache disabled: {e}")
         return None
 
-client = get_groq_client()
+suggestion_cache = TieredCache(LRUCache(ITINERARY_CACHE_SIZE), _open_suggestion_store(), ttl=SUGGESTION_CACHE_TTL)
+
+# --- Token usage reported by completed (non-streamed) calls ---
+_usage = {"calls": 0, "tokens": 0}
+_usage_lock = threading.Lock()
+
+def _record_usage(completion):
+    tokens = getattr(getattr(completion, "usage", None), "total_tokens", 0) or 0
+    with _usage_lock:
+        _usage["calls"] += 1
+        _usage["tokens"] += tokens
+    return tokens
+
+def llm_usage() -> Dict[str, int]:
+    """Completions made by this process and the tokens they reported."""
+    with _usage_lock:
+        return dict(_usage)
 
 
 # -------------------- AI Suggestions --------------------
-def get_ai_suggestions(budget, interests, country=None):
+def suggestion_cache_key(budget, interests, country=None):
+    country = country if country and country != "Anywhere" else "anywhere"
+    blob = json.dumps([ITINERARY_MODEL, normalize_key(country), float(budget),
+                       sorted(normalize_key(i) for i in interests)])
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+def get_ai_suggestions(budget, interests, country=None, regenerate=False):
     """
     Suggest 3 student-friendly destinations using Groq AI.
+    Answers are cached per (country, budget, interests).
     """
+    cache_key = suggestion_cache_key(budget, interests, country)
+    if not regenerate:
+        cached = suggestion_cache.get(cache_key)
+        if cached is not MISS:
+            return cached
+
+    client = get_groq_client()
     if not client:
         return "Error: Groq API Key missing."
 
@@ -53,27 +179,49 @@ def get_ai_suggestions(budget, interests, country=None):
     try:
         completion = client.chat.completions.create(
             messages=[{"role": "user", "content": prompt}],
-            model="llama-3.3-70b-versatile",
+            model=ITINERARY_MODEL,
             temperature=0.2,
-            max_tokens=300
+            max_tokens=SUGGESTION_MAX_TOKENS
         )
-        return completion.choices[0].message.content
+        _record_usage(completion)
+        text = completion.choices[0].message.content
+        suggestion_cache.set(cache_key, text)
+        return text
     except Exception as e:
         return f"Error getting suggestions: {e}"
 
 
 # -------------------- Itinerary Prompt --------------------
-def _build_itinerary_prompt(city, days, budget_info, interests, travel_type):
+def _build_itinerary_prompt(city, days, budget_info, interests, travel_type, day_range=None, avoid=None):
     """
     Constructs a detailed prompt for generating a day-wise student itinerary.
+    With day_range=(first, last) only those days of a `days`-day trip are
+    requested; budget_info is then that chunk's share of the budget. avoid
+    lists places already planned on other days.
     """
     currency = budget_info.get('currency', 'INR')
     breakdown_str = "\n".join([f"- {k}: {v} {currency}" for k, v in budget_info['breakdown'].items()])
 
+    if day_range:
+        first, last = day_range
+        scope = (
+            f"Create a {last - first + 1}-day itinerary for {city}.\n\n"
+            f"These are days {first}-{last} of a {days}-day trip. Number the days "
+            f"Day {first} to Day {last}; other days are planned separately, so do not repeat "
+            f"arrival or departure plans unless they fall in this range."
+        )
+        summary_rule = "- Do NOT add a cost-summary table; the trip summary is assembled separately."
+        if avoid:
+            scope += f"\nAlready planned on other days, do not repeat: {', '.join(avoid)}."
+    else:
+        scope = f"Create a {days}-day itinerary for {city}."
+        summary_rule = ("- End with a <div class='cost-summary'> table.\n"
+                        "- The Total row should be bold using <strong>...</strong>.")
+
     prompt = f"""
 You are an expert AI Travel Planner for STUDENTS.
 
-Create a {days}-day itinerary for {city}.
+{scope}
 
 Context:
 - Travelers: {budget_info.get('travelers', 1)}
@@ -98,8 +246,7 @@ FORMATTING RULES:
 - Wrap each day in <div class='day-card'>.
 - Prepend each day with <h3>Day X</h3> (X = day number) — even if only one activity.
 - Use <div class='segment'> for Morning, Afternoon, Evening and bold these three words <strong>...</strong>.
-- End with a <div class='cost-summary'> table.
-- The Total row should be bold using <strong>...</strong>.
+{summary_rule}
 
 
 
@@ -114,56 +261,676 @@ OUTPUT FORMAT: JSON only
     return prompt
 
 
+# -------------------- Cache Key --------------------
+def itinerary_cache_key(city, days, budget_info, interests, travel_type, day_range=None, avoid=None):
+    """
+    Canonical hash of everything that shapes the itinerary prompt.
+    Interest order, city casing and whitespace do not change the key.
+    """
+    canonical = {
+        "model": ITINERARY_MODEL,
+        "city": normalize_key(city),
+        "days": int(days),
+        "travel_type": normalize_key(travel_type),
+        "interests": sorted(normalize_key(i) for i in interests),
+        "currency": budget_info.get('currency', 'INR'),
+        "total": float(budget_info.get('total', 0)),
+        "travelers": int(budget_info.get('travelers', 1)),
+        "breakdown": sorted((k, float(v)) for k, v in budget_info['breakdown'].items()),
+    }
+    if day_range:
+        canonical["day_range"] = [int(day_range[0]), int(day_range[1])]
+    if avoid:
+        canonical["avoid"] = sorted(normalize_key(a) for a in avoid)
+    blob = json.dumps(canonical, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+# -------------------- Itinerary Result --------------------
+@dataclass
+class ItineraryResult:
+    """
+    Parsed itinerary kept as a Python object between generation and display.
+    Serialize with to_dict()/to_json() only at real boundaries (cache, export).
+    """
+    html: str
+    locations: List[str] = field(default_factory=list)
+    total_cost: Optional[float] = 0
+    currency: str = "INR"
+    days: List[str] = field(default_factory=list)   # one html string per day-card
+    error: Optional[str] = None
+    over_budget: Dict[str, float] = field(default_factory=dict)   # category -> amount over its share
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "html": self.html,
+            "locations": list(self.locations),
+            "total_cost": self.total_cost,
+            "currency": self.currency,
+            "days": list(self.days),
+            "over_budget": dict(self.over_budget),
+        }
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict())
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], currency: str = "INR", first_day: int = 1) -> "ItineraryResult":
+        html = data.get("html", "") or ""
+        days = data.get("days")
+        if days is None:
+            html, days = normalize_day_cards(html, first_day)
+        return cls(
+            html=html,
+            locations=list(data.get("locations") or []),
+            total_cost=data.get("total_cost"),
+            currency=data.get("currency") or currency,
+            days=list(days),
+            over_budget=dict(data.get("over_budget") or {}),
+        )
+
+    @classmethod
+    def failure(cls, message: str, budget_info) -> "ItineraryResult":
+        return cls(
+            html=f"<div class='error'>Error: {message}</div>",
+            currency=budget_info.get('currency', 'INR'),
+            error=message,
+        )
+
+
+# -------------------- Day Cards --------------------
+_DAY_CARD_RE = re.compile(r"<div\b[^>]*\bclass\s*=\s*['\"][^'\"]*\bday-card\b[^'\"]*['\"][^>]*>", re.I)
+_DIV_TAG_RE = re.compile(r"<(/?)div\b[^>]*>", re.I)
+_H3_RE = re.compile(r"<h3\b", re.I)
+
+
+def find_day_card(html, pos=0):
+    """
+    Next complete day-card at or after pos as (start, head_end, end), where
+    head_end is the end of the opening tag. None if no card closes yet.
+    """
+    start = _DAY_CARD_RE.search(html, pos)
+    if not start:
+        return None
+    depth = 0
+    for tag in _DIV_TAG_RE.finditer(html, start.start()):
+        depth += -1 if tag.group(1) else 1
+        if depth == 0:
+            return start.start(), start.end(), tag.end()
+    return None
+
+
+def _with_day_heading(card, head_len, day_number):
+    if _H3_RE.search(card):
+        return card
+    return f"{card[:head_len]}<h3>Day {day_number}</h3>{card[head_len:]}"
+
+
+def normalize_day_cards(html, first_day=1):
+    """
+    Ensures every day card starts with a 'Day X' heading, in one regex pass
+    over the HTML. Returns (html, [card_html, ...]).
+    """
+    parts, cards = [], []
+    pos = 0
+    found = find_day_card(html, 0)
+    while found:
+        start, head_end, end = found
+        card = _with_day_heading(html[start:end], head_end - start, first_day + len(cards))
+        parts.append(html[pos:start])
+        parts.append(card)
+        cards.append(card)
+        pos = end
+        found = find_day_card(html, end)
+    parts.append(html[pos:])
+    return "".join(parts), cards
+
+
+# -------------------- Shared Helpers --------------------
+def _itinerary_messages(prompt):
+    return [
+        {"role": "system", "content": "You are a helpful travel assistant. Output strictly valid JSON."},
+        {"role": "user", "content": prompt}
+    ]
+
+def _parse_itinerary(text, budget_info, first_day=1):
+    """Model output -> ItineraryResult; tolerates a ```json fence around the object."""
+    with span("itinerary_parse"):
+        text = re.sub(r"^```(?:json)?\s*|\s*```$", "", text.strip())
+        try:
+            data = json.loads(text)
+        except ValueError:
+            return ItineraryResult.failure("Could not parse the itinerary returned by the AI.", budget_info)
+        if not isinstance(data, dict):
+            return ItineraryResult.failure("Unexpected itinerary format returned by the AI.", budget_info)
+        return ItineraryResult.from_dict(data, budget_info.get('currency', 'INR'), first_day)
+
+def _reconcile(result, budget_info, reask=None):
+    """
+    Makes the price tags agree with total_cost and the budget. Small gaps
+    are repaired locally; for a large one reask(check) is tried once, but
+    only when given and PRICE_REASK is on (an extra LLM call). Otherwise,
+    or if the retry is still off, total_cost follows the tags.
+    """
+    result, check = reconcile_prices(result, budget_info)
+    if check is None or check.action != "reask":
+        return result
+    print(f"Price tags add up to {format_amount(check.tags_total)}, expected {format_amount(check.target)}; "
+          f"{'asking again' if reask and PRICE_REASK else 'keeping them'}")
+    if reask is not None and PRICE_REASK:
+        retried = reask(check)
+        if retried.ok:
+            retried, check = reconcile_prices(retried, budget_info)
+            if check.action != "reask":
+                return retried
+            result = retried
+    return settle_prices(result, budget_info)
+
+def _reask_prices(client, prompt, answer, check, budget_info, max_tokens=ITINERARY_MAX_TOKENS, first_day=1):
+    """One follow-up completion asking the model to fix its own prices."""
+    currency = budget_info.get('currency', 'INR')
+    messages = _itinerary_messages(prompt) + [
+        {"role": "assistant", "content": answer},
+        {"role": "user", "content": (
+            f"Your price-tags add up to {format_amount(check.tags_total)} {currency}, but they must add up to "
+            f"total_cost, which must not exceed {format_amount(check.target)} {currency}. Keep the same plan, give every "
+            f"activity, meal and stay a price-tag, fix the amounts and return the full JSON again."
+        )},
+    ]
+    try:
+        with span("llm"):
+            chat_completion = client.chat.completions.create(
+                messages=messages,
+                model=ITINERARY_MODEL,
+                temperature=0.2,
+                max_tokens=max_tokens,
+                response_format={"type": "json_object"}
+            )
+        _record_usage(chat_completion)
+        return _parse_itinerary(chat_completion.choices[0].message.content, budget_info, first_day)
+    except Exception as e:
+        return ItineraryResult.failure(str(e), budget_info)
+
+
 # -------------------- Generate Itinerary --------------------
-def generate_itinerary(city, days, budget_info, interests, travel_type):
+def generate_itinerary(city, days, budget_info, interests, travel_type, regenerate=False):
     """
     Generates a student-friendly itinerary using Groq AI.
-    Returns JSON with keys: html, locations, total_cost, currency
+    Returns an ItineraryResult (html, locations, total_cost, currency, days).
+
+    Successful responses are cached on the normalized trip inputs;
+    pass regenerate=True to skip the cached copy and refresh it.
+    Trips longer than ITINERARY_CHUNK_DAYS go through generate_itinerary_chunked.
     """
-    if not client:
-        return json.dumps({
-            "html": "<p>Error: Groq API Key not found.</p>",
-            "locations": [],
-            "total_cost": 0,
-            "currency": budget_info.get('currency', 'INR')
-        })
+    if _should_chunk(days):
+        return generate_itinerary_chunked(city, days, budget_info, interests, travel_type, regenerate)
+    return generate_part(city, days, budget_info, interests, travel_type, regenerate)
 
-    prompt = _build_itinerary_prompt(city, days, budget_info, interests, travel_type)
+
+def generate_part(city, days, budget_info, interests, travel_type, regenerate=False, day_range=None, avoid=None):
+    """One cached, coalesced completion for the whole trip or one day range of it."""
+    cache_key = itinerary_cache_key(city, days, budget_info, interests, travel_type, day_range, avoid)
+    first_day = day_range[0] if day_range else 1
+    if not regenerate:
+        cached = itinerary_cache.get(cache_key)
+        if cached is not MISS:
+            return ItineraryResult.from_dict(cached, first_day=first_day)
+
+    prompt = _build_itinerary_prompt(city, days, budget_info, interests, travel_type, day_range, avoid)
+    max_tokens = _chunk_max_tokens(day_range[1] - day_range[0] + 1) if day_range else ITINERARY_MAX_TOKENS
+    result, shared = itinerary_flight.do(
+        cache_key,
+        lambda: _generate_uncached(cache_key, prompt, budget_info, max_tokens, first_day),
+    )
+    # Each session gets its own copy of a shared result
+    return copy.deepcopy(result) if shared else result
+
+
+def _generate_uncached(cache_key, prompt, budget_info, max_tokens=ITINERARY_MAX_TOKENS, first_day=1):
+    client = get_groq_client()
+    if not client:
+        return ItineraryResult.failure("Groq API Key not found.", budget_info)
 
     try:
-        chat_completion = client.chat.completions.create(
-            messages=[
-                {"role": "system", "content": "You are a helpful travel assistant. Output strictly valid JSON."},
-                {"role": "user", "content": prompt}
-            ],
-            model="llama-3.3-70b-versatile",
-            temperature=0.2,  # low temperature for deterministic output
-            max_tokens=6000,
+        with span("llm"):
+            chat_completion = client.chat.completions.create(
+                messages=_itinerary_messages(prompt),
+                model=ITINERARY_MODEL,
+                temperature=0.2,  # low temperature for deterministic output
+                max_tokens=max_tokens,
+                response_format={"type": "json_object"}
+            )
+        _record_usage(chat_completion)
+        answer = chat_completion.choices[0].message.content
+        result = _parse_itinerary(answer, budget_info, first_day)
+    except Exception as e:
+        return ItineraryResult.failure(str(e), budget_info)
+
+    result = _reconcile(result, budget_info, lambda check: _reask_prices(
+        client, prompt, answer, check, budget_info, max_tokens, first_day))
+
+    if result.ok:
+        itinerary_cache.set(cache_key, result.to_dict())
+    return result
+
+
+# -------------------- Chunked Itinerary --------------------
+def _should_chunk(days):
+    return ITINERARY_CHUNK_DAYS > 0 and int(days) > ITINERARY_CHUNK_DAYS
+
+
+def _chunk_max_tokens(n_days):
+    return min(ITINERARY_MAX_TOKENS, ITINERARY_TOKENS_BASE + ITINERARY_TOKENS_PER_DAY * n_days)
+
+
+def estimate_itinerary_tokens(days):
+    """Upper bound on completion tokens one uncached generate_itinerary call may use."""
+    if _should_chunk(days):
+        return sum(_chunk_max_tokens(last - first + 1) for first, last in day_ranges(days))
+    return ITINERARY_MAX_TOKENS
+
+
+def estimate_itinerary_calls(days):
+    """Completions one uncached generate_itinerary call makes: one per day range."""
+    return len(day_ranges(days)) if _should_chunk(days) else 1
+
+
+def estimate_reask_tokens(days):
+    """
+    Upper bound on the extra tokens PRICE_REASK may spend on one trip: each
+    re-ask resends the first answer and gets a full answer back. 0 when off.
+    """
+    return 2 * estimate_itinerary_tokens(days) if PRICE_REASK else 0
+
+
+def day_ranges(days, chunk_days=None):
+    """
+    Splits 1..days into consecutive (first, last) ranges of at most
+    chunk_days, sized as evenly as possible so no chunk is a short straggler.
+    """
+    days = int(days)
+    chunk_days = chunk_days or ITINERARY_CHUNK_DAYS or days
+    count = -(-days // chunk_days)
+    size, extra = divmod(days, count)
+    ranges, first = [], 1
+    for i in range(count):
+        last = first + size + (1 if i < extra else 0) - 1
+        ranges.append((first, last))
+        first = last + 1
+    return ranges
+
+
+def chunk_budget(budget_info, interests, days, day_range):
+    """The day range's pro-rata share of the trip budget, split like the full trip."""
+    n_days = day_range[1] - day_range[0] + 1
+    total = round(float(budget_info.get('total', 0)) * n_days / int(days), 2)
+    return calculate_budget_split(
+        total, n_days, interests, budget_info.get('travelers', 1), budget_info.get('currency', 'INR')
+    )
+
+
+def strip_cost_summary(html):
+    """Drops a cost-summary block a chunk added despite the prompt."""
+    start = COST_SUMMARY_RE.search(html)
+    if not start:
+        return html
+    depth = 0
+    for tag in _DIV_TAG_RE.finditer(html, start.start()):
+        depth += -1 if tag.group(1) else 1
+        if depth == 0:
+            return html[:start.start()] + html[tag.end():]
+    return html[:start.start()]
+
+
+def cost_summary_html(rows, total, currency):
+    """A cost-summary table with one row per (label, amount) and a bold Total row."""
+    body = "".join(f"<tr><td>{label}</td><td>{format_amount(amount)} {currency}</td></tr>" for label, amount in rows)
+    return (
+        "<div class='cost-summary'><table>"
+        f"{body}<tr><td><strong>Total</strong></td><td><strong>{format_amount(total)} {currency}</strong></td></tr>"
+        "</table></div>"
+    )
+
+
+def merge_itinerary_chunks(parts, ranges, budget_info):
+    """
+    Joins per-range results into one ItineraryResult: cards in day order, a
+    single cost-summary with one row per range, locations de-duplicated and
+    total_cost summed. Any failed chunk fails the whole trip.
+    """
+    currency = budget_info.get('currency', 'INR')
+    for (first, last), part in zip(ranges, parts):
+        if not part.ok:
+            return ItineraryResult.failure(f"Days {first}-{last}: {part.error}", budget_info)
+
+    totals = [as_number(part.total_cost) for part in parts]
+    total = round(sum(totals), 2)
+    summary = cost_summary_html(
+        [(f"Days {first}-{last}", subtotal) for (first, last), subtotal in zip(ranges, totals)],
+        total, currency,
+    )
+
+    # Each range was checked against its own share of the budget
+    over_budget = {}
+    for part in parts:
+        for category, amount in part.over_budget.items():
+            over_budget[category] = round(over_budget.get(category, 0.0) + amount, 2)
+
+    locations, seen = [], set()
+    for part in parts:
+        for name in part.locations:
+            key = normalize_key(name)
+            if key not in seen:
+                seen.add(key)
+                locations.append(name)
+
+    return ItineraryResult(
+        html="".join(strip_cost_summary(part.html) for part in parts) + summary,
+        locations=locations,
+        total_cost=total,
+        currency=currency,
+        days=[card for part in parts for card in part.days],
+        over_budget=over_budget,
+    )
+
+
+def generate_itinerary_chunked(city, days, budget_info, interests, travel_type, regenerate=False):
+    """
+    Generates a long trip as parallel day-range completions, each with its
+    share of the budget and a max_tokens sized to its day count, so latency
+    stays close to a single short trip. The merged result is cached under
+    the same key as an unchunked trip; each range is cached on its own too.
+    """
+    cache_key = itinerary_cache_key(city, days, budget_info, interests, travel_type)
+    if not regenerate:
+        cached = itinerary_cache.get(cache_key)
+        if cached is not MISS:
+            return ItineraryResult.from_dict(cached)
+
+    def run():
+        result = None
+        for event in _stream_chunked_uncached(cache_key, city, days, budget_info, interests, travel_type,
+                                              regenerate, lambda: 0.0):
+            result = event.payload
+        return result
+
+    result, shared = itinerary_flight.do(cache_key, run)
+    return copy.deepcopy(result) if shared else result
+
+
+def _stream_chunked_uncached(cache_key, city, days, budget_info, interests, travel_type, regenerate, elapsed):
+    """
+    Runs every day range on a thread pool and yields the cards of each range
+    as soon as it and all earlier ranges are done, then the merged result.
+    """
+    ranges = day_ranges(days)
+    budgets = [chunk_budget(budget_info, interests, days, r) for r in ranges]
+    parts = []
+    with ThreadPoolExecutor(max_workers=max(1, min(ITINERARY_CHUNK_WORKERS, len(ranges)))) as pool:
+        futures = [
+            pool.submit(generate_part, city, days, b, interests, travel_type, regenerate, r)
+            for r, b in zip(ranges, budgets)
+        ]
+        for future in futures:
+            part = future.result()
+            parts.append(part)
+            if not part.ok:
+                # Later ranges cannot rescue the trip; stop waiting for them
+                for pending in futures:
+                    pending.cancel()
+                break
+            for card in part.days:
+                yield StreamEvent("day", card, elapsed())
+
+    result = merge_itinerary_chunks(parts, ranges, budget_info)
+    if result.ok:
+        itinerary_cache.set(cache_key, result.to_dict())
+    yield StreamEvent("done", result, elapsed())
+
+
+# -------------------- Async Itinerary --------------------
+async def generate_itinerary_async(client, city, days, budget_info, interests, travel_type, regenerate=False):
+    """
+    Async twin of generate_itinerary for headless batch runs, using an
+    AsyncGroq client. Returns (ItineraryResult, total_tokens_used); cache
+    hits use 0 tokens. Long trips are split into day ranges like
+    generate_itinerary_chunked, with the ranges awaited concurrently.
+    """
+    if not _should_chunk(days):
+        return await _generate_part_async(client, city, days, budget_info, interests, travel_type, regenerate)
+
+    cache_key = itinerary_cache_key(city, days, budget_info, interests, travel_type)
+    if not regenerate:
+        cached = itinerary_cache.get(cache_key)
+        if cached is not MISS:
+            return ItineraryResult.from_dict(cached), 0
+
+    ranges = day_ranges(days)
+    answers = await asyncio.gather(*(
+        _generate_part_async(client, city, days, chunk_budget(budget_info, interests, days, r),
+                             interests, travel_type, regenerate, r)
+        for r in ranges
+    ))
+    result = merge_itinerary_chunks([part for part, _ in answers], ranges, budget_info)
+    if result.ok:
+        itinerary_cache.set(cache_key, result.to_dict())
+    return result, sum(tokens for _, tokens in answers)
+
+
+async def _generate_part_async(client, city, days, budget_info, interests, travel_type, regenerate=False,
+                               day_range=None):
+    """Async generate_part: one cached completion for the whole trip or one day range of it."""
+    cache_key = itinerary_cache_key(city, days, budget_info, interests, travel_type, day_range)
+    first_day = day_range[0] if day_range else 1
+    if not regenerate:
+        cached = itinerary_cache.get(cache_key)
+        if cached is not MISS:
+            return ItineraryResult.from_dict(cached, first_day=first_day), 0
+
+    prompt = _build_itinerary_prompt(city, days, budget_info, interests, travel_type, day_range)
+    max_tokens = _chunk_max_tokens(day_range[1] - day_range[0] + 1) if day_range else ITINERARY_MAX_TOKENS
+    with span("llm"):
+        chat_completion = await client.chat.completions.create(
+            messages=_itinerary_messages(prompt),
+            model=ITINERARY_MODEL,
+            temperature=0.2,
+            max_tokens=max_tokens,
             response_format={"type": "json_object"}
         )
+    # Large price gaps are settled locally here; batch runs do not pay for a second call
+    answer = chat_completion.choices[0].message.content
+    result = _reconcile(_parse_itinerary(answer, budget_info, first_day), budget_info)
+    tokens = _record_usage(chat_completion)
+    if result.ok:
+        itinerary_cache.set(cache_key, result.to_dict())
+    return result, tokens
+
+
+# -------------------- Streaming Itinerary --------------------
+class StreamEvent(NamedTuple):
+    kind: str        # "day" (one finished day-card html) or "done" (the ItineraryResult)
+    payload: Any
+    elapsed: float   # seconds since the request started
+
+
+_HTML_KEY_RE = re.compile(r'"html"\s*:\s*"')
+_JSON_ESCAPES = {'"': '"', '\\': '\\', '/': '/', 'b': '\b', 'f': '\f', 'n': '\n', 'r': '\r', 't': '\t'}
+
+
+class DayCardStream:
+    """
+    Incremental parser for a streamed itinerary JSON object.
+
+    feed() takes raw completion chunks, decodes the "html" string value as it
+    arrives and returns every <div class='day-card'> that has been closed
+    since the previous call, with a 'Day X' heading added when missing.
+    """
+    def __init__(self, first_day=1):
+        self._raw = ""
+        self._pos = None          # index in _raw where undecoded html text starts
+        self._closed = False
+        self._html = ""
+        self._scan = 0
+        self.day_count = first_day - 1
+
+    def feed(self, chunk):
+        self._raw += chunk
+        if self._pos is None:
+            match = _HTML_KEY_RE.search(self._raw)
+            if not match:
+                return []
+            self._pos = match.end()
+        if not self._closed:
+            self._decode()
+        return self._pop_cards()
+
+    def _decode(self):
+        raw, i, out = self._raw, self._pos, []
+        n = len(raw)
+        while i < n:
+            c = raw[i]
+            if c == '"':
+                self._closed = True
+                i += 1
+                break
+            if c != '\\':
+                j = i
+                while j < n and raw[j] not in '"\\':
+                    j += 1
+                out.append(raw[i:j])
+                i = j
+                continue
+            if i + 1 >= n:
+                break
+            esc = raw[i + 1]
+            if esc == 'u':
+                if i + 6 > n:
+                    break
+                code = int(raw[i + 2:i + 6], 16)
+                if 0xD800 <= code <= 0xDBFF:
+                    # Characters outside the BMP (emoji) arrive as a surrogate pair
+                    # of escapes; hold the first half back until the second is here
+                    if i + 12 > n:
+                        break
+                    low = int(raw[i + 8:i + 12], 16) if raw[i + 6:i + 8] == '\\u' else 0
+                    if 0xDC00 <= low <= 0xDFFF:
+                        out.append(chr(0x10000 + ((code - 0xD800) << 10) + (low - 0xDC00)))
+                        i += 12
+                        continue
+                out.append(chr(code))
+                i += 6
+            else:
+                out.append(_JSON_ESCAPES.get(esc, esc))
+                i += 2
+        self._pos = i
+        self._html += "".join(out)
 
-        result = chat_completion.choices[0].message.content
+    def _pop_cards(self):
+        cards = []
+        found = find_day_card(self._html, self._scan)
+        while found:
+            start, head_end, end = found
+            self.day_count += 1
+            cards.append(_with_day_heading(self._html[start:end], head_end - start, self.day_count))
+            self._scan = end
+            found = find_day_card(self._html, end)
+        return cards
 
-        # -------------------- Post-process HTML to ensure Day numbers --------------------
+    @property
+    def text(self):
+        return self._raw
+
+
+def generate_itinerary_stream(city, days, budget_info, interests, travel_type, regenerate=False):
+    """
+    Streaming variant of generate_itinerary.
+
+    Yields StreamEvent("day", card_html, elapsed) as soon as each day card is
+    complete, then a final StreamEvent("done", ItineraryResult, elapsed) with
+    the same result generate_itinerary would have returned. Long trips
+    stream one day range at a time, in day order.
+    """
+    started = time.perf_counter()
+    elapsed = lambda: time.perf_counter() - started
+
+    cache_key = itinerary_cache_key(city, days, budget_info, interests, travel_type)
+    if not regenerate:
+        cached = itinerary_cache.get(cache_key)
+        if cached is not MISS:
+            result = ItineraryResult.from_dict(cached)
+            for card in result.days:
+                yield StreamEvent("day", card, elapsed())
+            yield StreamEvent("done", result, elapsed())
+            return
+
+    call, leader = itinerary_flight.begin(cache_key)
+    if not leader:
+        # The same trip is already streaming for another session: wait for it and replay its cards
         try:
-            data = json.loads(result)
-            html_text = data.get("html", "")
-            soup = BeautifulSoup(html_text, "html.parser")
-            day_cards = soup.find_all("div", class_="day-card")
-            for i, day_div in enumerate(day_cards, start=1):
-                if not day_div.find("h3"):
-                    day_div.insert(0, soup.new_tag("h3"))
-                    day_div.h3.string = f"Day {i}"
-            data["html"] = str(soup)
-            return json.dumps(data)
-        except Exception:
-            # fallback: return raw result if parsing fails
-            return result
+            result = copy.deepcopy(call.wait())
+        except Exception as e:
+            result = ItineraryResult.failure(str(e), budget_info)
+        for card in result.days:
+            yield StreamEvent("day", card, elapsed())
+        yield StreamEvent("done", result, elapsed())
+        return
+
+    if _should_chunk(days):
+        events = _stream_chunked_uncached(cache_key, city, days, budget_info, interests, travel_type,
+                                          regenerate, elapsed)
+    else:
+        events = _stream_uncached(cache_key, city, days, budget_info, interests, travel_type, elapsed)
+
+    result = None
+    try:
+        for event in events:
+            if event.kind == "done":
+                result = event.payload
+            yield event
+    finally:
+        error = None if result is not None else RuntimeError("Itinerary stream was interrupted.")
+        itinerary_flight.finish(cache_key, call, result=result, error=error)
 
+
+def _stream_uncached(cache_key, city, days, budget_info, interests, travel_type, elapsed):
+    client = get_groq_client()
+    if not client:
+        yield StreamEvent("done", ItineraryResult.failure("Groq API Key not found.", budget_info), elapsed())
+        return
+
+    prompt = _build_itinerary_prompt(city, days, budget_info, interests, travel_type)
+    parser = DayCardStream()
+
+    started, first_day_at = time.perf_counter(), None
+    try:
+        # JSON mode is not available with streaming, so rely on the system prompt
+        stream = client.chat.completions.create(
+            messages=_itinerary_messages(prompt),
+            model=ITINERARY_MODEL,
+            temperature=0.2,
+            max_tokens=ITINERARY_MAX_TOKENS,
+            stream=True
+        )
+        for chunk in stream:
+            delta = chunk.choices[0].delta.content if chunk.choices else None
+            if not delta:
+                continue
+            for card in parser.feed(delta):
+                if first_day_at is None:
+                    first_day_at = time.perf_counter() - started
+                    observe("llm_first_day", first_day_at)
+                yield StreamEvent("day", card, elapsed())
+        observe("llm", time.perf_counter() - started)
     except Exception as e:
-        return json.dumps({
-            "html": f"<div class='error'>Error: {str(e)}</div>",
-            "locations": [],
-            "total_cost": 0,
-            "currency": budget_info.get('currency', 'INR')
-        })
+        yield StreamEvent("done", ItineraryResult.failure(str(e), budget_info), elapsed())
+        return
+
+    result = _reconcile(_parse_itinerary(parser.text, budget_info), budget_info, lambda check: _reask_prices(
+        client, prompt, parser.text, check, budget_info))
+    if result.ok:
+        itinerary_cache.set(cache_key, result.to_dict())
+    yield StreamEvent("done", result, elapsed())
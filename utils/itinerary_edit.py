@@ -0,0 +1,286 @@
+import hashlib
+import json
+import math
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, NamedTuple, Optional, Sequence
+
+from utils.cache import MISS, normalize_key
+from utils.pricing import as_number, price_total, rescale_cards, settle_prices
+from utils.travel_utils import calculate_budget_split
+from utils.itinerary_ai import (
+    ITINERARY_CHUNK_WORKERS,
+    ItineraryResult,
+    chunk_budget,
+    cost_summary_html,
+    find_day_card,
+    generate_itinerary,
+    generate_part,
+    itinerary_cache,
+    itinerary_cache_key,
+    strip_cost_summary,
+)
+from utils.routing import assign_days
+
+# Budget changes within this fraction are applied by rescaling prices locally
+BUDGET_RESCALE_TOLERANCE = float(os.getenv("BUDGET_RESCALE_TOLERANCE", "0.2"))
+
+_TAG_RE = re.compile(r"<[^>]+>")
+
+# Words that mark a day card as serving one of the form's interests
+INTEREST_KEYWORDS = {
+    "culture": ("culture", "temple", "church", "mosque", "heritage", "art", "festival", "local"),
+    "food": ("food", "restaurant", "street food", "cafe", "market", "cuisine", "dinner", "lunch"),
+    "adventure": ("adventure", "trek", "hike", "rafting", "kayak", "climb", "dive", "zipline", "safari"),
+    "relaxation": ("relax", "beach", "spa", "park", "garden", "sunset", "lake", "yoga"),
+    "nightlife": ("nightlife", "bar", "club", "pub", "night market", "live music", "party"),
+    "history": ("history", "historic", "fort", "palace", "ruins", "monument", "old town"),
+    "museums": ("museum", "gallery", "exhibition"),
+}
+
+
+class ItineraryEdit(NamedTuple):
+    result: ItineraryResult
+    changed_days: List[int]     # 1-based days that were regenerated (empty for local edits)
+    llm_calls: int
+    rescaled: bool = False      # prices were scaled locally to a new budget
+
+
+def edit_cache_key(source: ItineraryResult, edit: str, city, days, budget_info, interests, travel_type) -> str:
+    """
+    Cache key for an edited plan: the edit, the plan it was made from and
+    the new inputs. Never the canonical itinerary_cache_key for those
+    inputs, so one user's edit is not served as another user's fresh plan.
+    """
+    canonical = [
+        itinerary_cache_key(city, days, budget_info, interests, travel_type),
+        edit,
+        hashlib.sha256(source.html.encode("utf-8")).hexdigest(),
+    ]
+    return hashlib.sha256(json.dumps(canonical).encode("utf-8")).hexdigest()
+
+
+def _cached_edit(key) -> Optional["ItineraryEdit"]:
+    cached = itinerary_cache.get(key)
+    if cached is MISS:
+        return None
+    return ItineraryEdit(ItineraryResult.from_dict(cached["result"]), cached["changed_days"], 0,
+                         cached.get("rescaled", False))
+
+
+def _cache_edit(key, edit: ItineraryEdit) -> ItineraryEdit:
+    if edit.result.ok:
+        itinerary_cache.set(key, {"result": edit.result.to_dict(), "changed_days": edit.changed_days,
+                                  "rescaled": edit.rescaled})
+    return edit
+
+
+# -------------------- Splicing --------------------
+def _day_spans(html):
+    spans, found = [], find_day_card(html, 0)
+    while found:
+        spans.append((found[0], found[2]))
+        found = find_day_card(html, found[2])
+    return spans
+
+
+def replaced_days(result: ItineraryResult, replacements: Dict[int, ItineraryResult]) -> List[int]:
+    """Days splice_days will actually swap: existing days whose replacement has cards."""
+    count = len(_day_spans(result.html))
+    return sorted(day for day, new in replacements.items() if 1 <= day <= count and new.days)
+
+
+def splice_days(result: ItineraryResult, replacements: Dict[int, ItineraryResult],
+                budget_info: dict = None) -> ItineraryResult:
+    """
+    Swaps the given days' cards for freshly generated ones and keeps
+    everything else: untouched cards, their locations (matched to days with
+    assign_days) and the text around the cards. A replacement without cards
+    leaves its day as it was. total_cost moves by the price difference of
+    the swapped cards and the cost-summary is rebuilt with one row per day.
+    With budget_info the spliced plan is settled against it again (see
+    utils.pricing.settle_prices); otherwise over_budget is carried over.
+    """
+    html = result.html
+    spans = _day_spans(html)
+    loc_days = assign_days(html, result.locations)
+    swapped = set(replaced_days(result, replacements))
+
+    parts, cards, pos = [], [], 0
+    total = as_number(result.total_cost)
+    for day, (start, end) in enumerate(spans, start=1):
+        parts.append(html[pos:start])
+        old = html[start:end]
+        if day in swapped:
+            new = replacements[day]
+            card = "".join(new.days)
+            total += (price_total(card) or as_number(new.total_cost)) - price_total(old)
+        else:
+            card = old
+        parts.append(card)
+        cards.append(card)
+        pos = end
+    rest = strip_cost_summary(html[pos:])
+
+    # (day, sequence, name): kept names first within a day, then the new ones
+    located = [(day or 0, i, loc) for i, (loc, day) in enumerate(zip(result.locations, loc_days))
+               if day not in swapped]
+    seq = len(result.locations)
+    for day in sorted(swapped):
+        for loc in replacements[day].locations:
+            located.append((day, seq, loc))
+            seq += 1
+    locations, seen = [], set()
+    for _, _, loc in sorted(located):
+        if normalize_key(loc) not in seen:
+            seen.add(normalize_key(loc))
+            locations.append(loc)
+
+    total = round(total, 2)
+    summary = cost_summary_html([(f"Day {d}", price_total(c)) for d, c in enumerate(cards, start=1)],
+                                total, result.currency)
+    spliced = ItineraryResult(
+        html="".join(parts) + rest + summary,
+        locations=locations,
+        total_cost=total,
+        currency=result.currency,
+        days=cards,
+        over_budget=dict(result.over_budget),
+    )
+    return settle_prices(spliced, budget_info) if budget_info is not None else spliced
+
+
+# -------------------- Edits --------------------
+def regenerate_days(result: ItineraryResult, day_numbers: Sequence[int], city, days, budget_info,
+                    interests, travel_type, regenerate=True) -> ItineraryEdit:
+    """
+    Asks the model for fresh versions of only the given days, each with its
+    share of budget_info and told which places the other days already cover,
+    then splices them into result. The other days are reused as they are.
+    """
+    day_numbers = sorted({int(d) for d in day_numbers if 1 <= int(d) <= len(result.days)})
+    if not day_numbers:
+        return ItineraryEdit(result, [], 0)
+    key = edit_cache_key(result, f"days:{day_numbers}", city, days, budget_info, interests, travel_type)
+    if not regenerate:
+        cached = _cached_edit(key)
+        if cached is not None:
+            return cached
+
+    loc_days = assign_days(result.html, result.locations)
+
+    def one(day):
+        avoid = [loc for loc, d in zip(result.locations, loc_days) if d != day]
+        share = chunk_budget(budget_info, interests, days, (day, day))
+        return generate_part(city, days, share, interests, travel_type, regenerate, (day, day), avoid)
+
+    with ThreadPoolExecutor(max_workers=max(1, min(ITINERARY_CHUNK_WORKERS, len(day_numbers)))) as pool:
+        parts = dict(zip(day_numbers, pool.map(one, day_numbers)))
+
+    for day, part in parts.items():
+        if not part.ok:
+            return ItineraryEdit(ItineraryResult.failure(f"Day {day}: {part.error}", budget_info), [], len(parts))
+
+    edited = splice_days(result, parts, budget_info)
+    return _cache_edit(key, ItineraryEdit(edited, replaced_days(result, parts), len(parts)))
+
+
+def regenerate_day(result, day, city, days, budget_info, interests, travel_type) -> ItineraryEdit:
+    return regenerate_days(result, [day], city, days, budget_info, interests, travel_type)
+
+
+def _interest_scores(cards, interest):
+    words = INTEREST_KEYWORDS.get(normalize_key(interest), (normalize_key(interest),))
+    texts = [_TAG_RE.sub(" ", card).casefold() for card in cards]
+    return [sum(text.count(w) for w in words) for text in texts]
+
+
+def days_for_interest_change(result: ItineraryResult, old_interests, new_interests) -> List[int]:
+    """
+    Days to regenerate when interests change: the days that lean most on
+    the removed interests, or, when interests are only added, the days that
+    serve them least. About one day per interest in the new list is touched.
+    """
+    removed = [i for i in old_interests if i not in new_interests]
+    added = [i for i in new_interests if i not in old_interests]
+    cards = result.days
+    if not cards or not (removed or added):
+        return []
+    count = max(1, math.ceil(len(cards) / max(1, len(new_interests))))
+
+    if removed:
+        scores = [sum(s) for s in zip(*(_interest_scores(cards, i) for i in removed))]
+        ranked = sorted(range(len(cards)), key=lambda i: -scores[i])
+        picked = [i for i in ranked if scores[i] > 0][:count]
+        if picked:
+            return sorted(d + 1 for d in picked)
+    candidates = added or list(new_interests)
+    if not candidates:
+        return []
+    scores = [sum(s) for s in zip(*(_interest_scores(cards, i) for i in candidates))]
+    ranked = sorted(range(len(cards)), key=lambda i: scores[i])
+    return sorted(d + 1 for d in ranked[:count])
+
+
+def change_interests(result, city, days, budget_info, old_interests, new_interests, travel_type) -> ItineraryEdit:
+    """Re-plans only the days affected by an interest swap, under the re-split budget."""
+    new_budget = calculate_budget_split(
+        float(budget_info.get('total', 0)), int(days), list(new_interests),
+        int(budget_info.get('travelers', 1)), budget_info.get('currency', 'INR'),
+    )
+    changed = days_for_interest_change(result, old_interests, new_interests)
+    return regenerate_days(result, changed, city, days, new_budget, list(new_interests), travel_type, regenerate=False)
+
+
+def change_budget(result, city, days, old_budget_info, new_budget_info, interests, travel_type) -> ItineraryEdit:
+    """
+    Applies a new budget. Changes within BUDGET_RESCALE_TOLERANCE rescale the
+    price tags locally with no model call; larger ones regenerate only the
+    days furthest from the new per-day target (the priciest days when
+    cutting, the cheapest when raising) until the projected total fits.
+    A plan whose prices already fit is kept as it is.
+    """
+    old_total = as_number(old_budget_info.get('total'))
+    new_total = as_number(new_budget_info.get('total'))
+    costs = [price_total(card) for card in result.days]
+    if not old_total or not any(costs):
+        # Nothing to reuse the prices from; fall back to a full plan
+        fresh = generate_itinerary(city, days, new_budget_info, interests, travel_type)
+        return ItineraryEdit(fresh, list(range(1, int(days) + 1)), 1)
+
+    factor = new_total / old_total
+    key = edit_cache_key(result, "budget", city, days, new_budget_info, interests, travel_type)
+    cached = _cached_edit(key)
+    if cached is not None:
+        return cached
+    if abs(factor - 1) <= BUDGET_RESCALE_TOLERANCE:
+        # The largest tag absorbs the rounding, so the tags scale exactly
+        html, cards = rescale_cards(result.html, result.days, factor, round(price_total(result.html) * factor, 2))
+        rescaled = ItineraryResult(
+            html=html,
+            locations=list(result.locations),
+            total_cost=price_total(html) or round(as_number(result.total_cost) * factor, 2),
+            currency=result.currency,
+            days=cards,
+        )
+        edited = splice_days(rescaled, {}, new_budget_info)
+        return _cache_edit(key, ItineraryEdit(edited, [], 0, rescaled=True))
+
+    target = new_total / len(costs)
+    projected = sum(costs)
+    cutting = factor < 1
+    order = sorted(range(len(costs)), key=lambda i: -costs[i] if cutting else costs[i])
+    changed = []
+    for i in order:
+        if (projected <= new_total) if cutting else (projected >= new_total * (1 - BUDGET_RESCALE_TOLERANCE)):
+            break
+        if (costs[i] <= target) if cutting else (costs[i] >= target):
+            break
+        changed.append(i + 1)
+        projected += target - costs[i]
+    if not changed:
+        # The current prices already fit the new budget
+        edited = splice_days(result, {}, new_budget_info)
+        return _cache_edit(key, ItineraryEdit(edited, [], 0))
+    return regenerate_days(result, changed, city, days, new_budget_info, interests, travel_type, regenerate=False)
@@ -0,0 +1,205 @@
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+# Plans are built on a process-wide pool so the Streamlit script thread only polls
+PLAN_WORKERS = int(os.getenv("PLAN_WORKERS", "8"))
+PLAN_QUEUE_SIZE = int(os.getenv("PLAN_QUEUE_SIZE", "64"))   # queued + running jobs before submit() refuses
+JOB_TTL_S = float(os.getenv("JOB_TTL_S", "1800"))           # finished jobs are forgotten after this
+
+QUEUED, RUNNING, DONE, FAILED, CANCELLED = "queued", "running", "done", "failed", "cancelled"
+_FINISHED = (DONE, FAILED, CANCELLED)
+
+
+class QueueFullError(RuntimeError):
+    """Raised by submit() when PLAN_QUEUE_SIZE jobs are already queued or running."""
+
+
+class JobStatus(NamedTuple):
+    id: str
+    state: str
+    stage: str                  # human-readable progress note
+    partial: List[Any]          # results published so far (e.g. day cards)
+    result: Any = None
+    error: Optional[str] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.state in _FINISHED
+
+
+class Job:
+    """One unit of work; the worker reports progress through it."""
+    def __init__(self, job_id: str):
+        self.id = job_id
+        self.state = QUEUED
+        self.stage = "Waiting for a free worker"
+        self.partial: List[Any] = []
+        self.result = None
+        self.error = None
+        self.created = time.monotonic()
+        self.finished_at = None
+        self.future = None
+        self._lock = threading.Lock()
+
+    def progress(self, stage: str = None, item: Any = None):
+        """Updates the stage note and/or appends a partial result."""
+        with self._lock:
+            if stage is not None:
+                self.stage = stage
+            if item is not None:
+                self.partial.append(item)
+
+    def _finish(self, state: str, result=None, error=None):
+        with self._lock:
+            self.state = state
+            self.result = result
+            self.error = error
+            self.finished_at = time.monotonic()
+
+    def status(self) -> JobStatus:
+        with self._lock:
+            return JobStatus(self.id, self.state, self.stage, list(self.partial), self.result, self.error)
+
+
+class JobQueue:
+    """
+    Bounded worker pool behind a small job API:
+
+        job_id = queue.submit(fn, *args)   # fn(job, *args) -> result
+        queue.status(job_id)               # JobStatus, polled from the session
+
+    At most max_pending jobs may be queued or running; beyond that submit()
+    raises QueueFullError so callers can push back instead of piling up work.
+    """
+    def __init__(self, workers: int = PLAN_WORKERS, max_pending: int = PLAN_QUEUE_SIZE,
+                 ttl_s: float = JOB_TTL_S, name: str = "jobs"):
+        self.workers = max(1, workers)
+        self.max_pending = max(1, max_pending)
+        self.ttl_s = ttl_s
+        self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix=name)
+        self._jobs: Dict[str, Job] = {}
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._stats = {"submitted": 0, "rejected": 0, "done": 0, "failed": 0, "cancelled": 0}
+
+    def submit(self, fn: Callable[..., Any], *args, **kwargs) -> str:
+        with self._lock:
+            self._expire()
+            if self._pending >= self.max_pending:
+                self._stats["rejected"] += 1
+                raise QueueFullError(f"{self._pending} jobs already in flight")
+            job = Job(uuid.uuid4().hex)
+            self._jobs[job.id] = job
+            self._pending += 1
+            self._stats["submitted"] += 1
+        job.future = self._pool.submit(self._run, job, fn, args, kwargs)
+        return job.id
+
+    def _run(self, job: Job, fn, args, kwargs):
+        with job._lock:
+            if job.state == CANCELLED:
+                return
+            job.state = RUNNING
+        try:
+            result = fn(job, *args, **kwargs)
+        except Exception as e:
+            print(f"Job {job.id} failed: {e}")
+            job._finish(FAILED, error=str(e))
+            self._done(FAILED)
+        else:
+            job._finish(DONE, result=result)
+            self._done(DONE)
+
+    def _done(self, state: str):
+        with self._lock:
+            self._pending -= 1
+            self._stats[state] += 1
+
+    def _expire(self):
+        now = time.monotonic()
+        stale = [job_id for job_id, job in self._jobs.items()
+                 if job.finished_at is not None and now - job.finished_at > self.ttl_s]
+        for job_id in stale:
+            del self._jobs[job_id]
+
+    def status(self, job_id: str) -> Optional[JobStatus]:
+        """Current state of a job, or None if it is unknown or has expired."""
+        job = self._jobs.get(job_id)
+        return job.status() if job else None
+
+    def cancel(self, job_id: str) -> bool:
+        """Cancels a job that has not started yet. Running jobs finish normally."""
+        job = self._jobs.get(job_id)
+        if job is None:
+            return False
+        with job._lock:
+            if job.state != QUEUED:
+                return False
+            job.state = CANCELLED
+            job.finished_at = time.monotonic()
+        self._done(CANCELLED)
+        return True
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats.update(pending=self._pending, tracked=len(self._jobs),
+                         workers=self.workers, max_pending=self.max_pending)
+        return stats
+
+
+# -------------------- Trip plans --------------------
+plan_queue = JobQueue(name="plan")
+
+
+def build_plan(job: Job, inputs: dict, user_id: str) -> dict:
+    """
+    The whole plan pipeline for one set of form inputs: budget split,
+    streamed itinerary (each day card is published as a partial result)
+    and the map description. Successful plans are saved to the user's trip
+    history and only the trip ID is returned; failed ones are returned as is.
+    """
+    from utils.history import get_history
+    from utils.itinerary_ai import generate_itinerary_stream
+    from utils.maps import build_map_data
+    from utils.routing import assign_days
+    from utils.travel_utils import calculate_budget_split
+
+    budget_data = calculate_budget_split(
+        float(inputs['budget']), int(inputs['days']),
+        inputs['interests'], int(inputs['travelers']), inputs['currency']
+    )
+
+    job.progress("Writing your itinerary")
+    result = None
+    for event in generate_itinerary_stream(
+        inputs['place'], inputs['days'], budget_data,
+        inputs['interests'], inputs['travel_type']
+    ):
+        if event.kind == "day":
+            job.progress(item=event.payload)
+        else:
+            result = event.payload
+    if result is None:
+        raise RuntimeError("no itinerary was produced")
+
+    if not result.ok:
+        return {"trip_id": None, "itinerary": result}
+
+    job.progress("Mapping your stops")
+    map_data = build_map_data(inputs['place'], result.locations, assign_days(result.html, result.locations))
+    trip_id = get_history().save(user_id, inputs, result, budget_data, map_data)
+    return {"trip_id": trip_id, "itinerary": None}
+
+
+def submit_plan(inputs: dict, user_id: str) -> str:
+    """Queues a plan for inputs; raises QueueFullError when the server is saturated."""
+    return plan_queue.submit(build_plan, dict(inputs), user_id)
+
+
+def plan_status(job_id: str) -> Optional[JobStatus]:
+    return plan_queue.status(job_id)
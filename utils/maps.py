@@ -1,39 +1,294 @@
-import requests
-import folium
-import polyline
-from typing import List, Tuple, Optional
-from branca.element import MacroElement
-from jinja2 import Template
+import os
+import json
+import time
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from urllib.parse import urlsplit
+from typing import TYPE_CHECKING, Dict, List, Tuple, Optional, NamedTuple
+
+if TYPE_CHECKING:
+    import folium
 
 # Local imports
 from utils.travel_utils import COUNTRY_CURRENCY_MAP
+from utils import http_client
+from utils.breaker import CLOSED, CircuitBreaker, CircuitOpenError, breaker_stats
+from utils.cache import LRUCache, SQLiteCache, TieredCache, MISS, normalize_key
+from utils.metrics import register_collector, timed
+from utils.singleflight import SingleFlight
 COUNTRIES = list(COUNTRY_CURRENCY_MAP.keys())
 
+# Nominatim usage policy allows at most 1 request per second per application.
+NOMINATIM_RPS = float(os.getenv("NOMINATIM_RPS", "1.0"))
+GEOCODE_WORKERS = int(os.getenv("GEOCODE_WORKERS", "4"))
+OSRM_OVERVIEW = os.getenv("OSRM_OVERVIEW", "full")
+GEOCODE_OFFLINE = os.getenv("GEOCODE_OFFLINE", "1") not in ("0", "false", "False")
+
+# Upstream endpoints; override to point at a self-hosted instance or a local fake
+NOMINATIM_URL = os.getenv("NOMINATIM_URL", "https://nominatim.openstreetmap.org").rstrip("/")
+OSRM_URL = os.getenv("OSRM_URL", "http://router.project-osrm.org").rstrip("/")
+
+
+class RateLimiter:
+    """
+    Thread-safe limiter that spaces calls at least 1/rate seconds apart.
+    A rate of 0 (or less) disables limiting.
+    """
+    def __init__(self, rate: float):
+        self.rate = rate
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+
+    def acquire(self):
+        if self.rate <= 0:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + 1.0 / self.rate
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+
+
+# Shared across every caller in the process so the global budget holds
+nominatim_limiter = RateLimiter(NOMINATIM_RPS)
+# Every Nominatim attempt must pass the limiter, so the transport may not retry on its own
+if NOMINATIM_RPS > 0:
+    http_client.http.set_retries(urlsplit(NOMINATIM_URL).hostname or "", 0)
+
+# Coalesce identical in-flight lookups across sessions
+geocode_flight = SingleFlight("geocode")
+route_flight = SingleFlight("osrm_route")
+
+# Fail fast while an upstream is erroring or slow instead of queueing on it
+nominatim_breaker = CircuitBreaker("nominatim")
+osrm_breaker = CircuitBreaker("osrm")
+
+# Whole-map latency budget (geocoding + routing); 0 disables
+MAP_DEADLINE_S = float(os.getenv("MAP_DEADLINE_S", "10"))
+# Assumed average speed for straight-line fallback routes
+FALLBACK_SPEED_KMH = float(os.getenv("FALLBACK_SPEED_KMH", "30"))
+
+_fallbacks = {"geocode_circuit_open": 0, "geocode_deadline": 0,
+              "route_circuit_open": 0, "route_deadline": 0, "route_straight_line": 0}
+_fallbacks_lock = threading.Lock()
+
+
+def _count_fallback(name: str):
+    with _fallbacks_lock:
+        _fallbacks[name] += 1
+
+
+def upstream_health() -> Dict[str, Dict]:
+    """Breaker state per upstream plus how often maps fell back to local answers."""
+    with _fallbacks_lock:
+        fallbacks = dict(_fallbacks)
+    return {"breakers": breaker_stats(), "fallbacks": fallbacks}
+
+
+def _fallback_lines() -> List[str]:
+    lines = ["# TYPE travel_planner_map_fallbacks_total counter"]
+    with _fallbacks_lock:
+        for name, n in _fallbacks.items():
+            lines.append(f'travel_planner_map_fallbacks_total{{reason="{name}"}} {n}')
+    return lines
+
+
+register_collector(_fallback_lines)
+
+# --- Geocode cache: in-process LRU in front of SQLite ---
+GEOCODE_CACHE_PATH = os.getenv("GEOCODE_CACHE_PATH", ".cache/geocode.sqlite")
+GEOCODE_CACHE_SIZE = int(os.getenv("GEOCODE_CACHE_SIZE", "2048"))
+GEOCODE_TTL = float(os.getenv("GEOCODE_TTL", str(30 * 24 * 3600)))
+GEOCODE_NEGATIVE_TTL = float(os.getenv("GEOCODE_NEGATIVE_TTL", str(24 * 3600)))
+
+def _open_geocode_store() -> Optional[SQLiteCache]:
+    if not GEOCODE_CACHE_PATH:
+        return None
+    try:
+        return SQLiteCache(GEOCODE_CACHE_PATH, table="geocode")
+    except Exception as e:
+        print(f"Geocode cache disabled: {e}")
+        return None
+
+geocode_cache = TieredCache(
+    LRUCache(GEOCODE_CACHE_SIZE),
+    _open_geocode_store(),
+    ttl=GEOCODE_TTL,
+    negative_ttl=GEOCODE_NEGATIVE_TTL,
+)
+
+# --- Route cache: OSRM answers keyed by request URL, geometry kept encoded ---
+ROUTE_CACHE_PATH = os.getenv("ROUTE_CACHE_PATH", GEOCODE_CACHE_PATH)
+ROUTE_CACHE_SIZE = int(os.getenv("ROUTE_CACHE_SIZE", "256"))
+ROUTE_CACHE_MAX_ENTRIES = int(os.getenv("ROUTE_CACHE_MAX_ENTRIES", "5000"))
+ROUTE_TTL = float(os.getenv("ROUTE_TTL", str(7 * 24 * 3600)))
+
+def _open_route_store() -> Optional[SQLiteCache]:
+    if not ROUTE_CACHE_PATH:
+        return None
+    try:
+        return SQLiteCache(ROUTE_CACHE_PATH, table="routes", max_entries=ROUTE_CACHE_MAX_ENTRIES)
+    except Exception as e:
+        print(f"Route cache disabled: {e}")
+        return None
+
+route_cache = TieredCache(LRUCache(ROUTE_CACHE_SIZE), _open_route_store(), ttl=ROUTE_TTL)
+
+
+class GeocodeResult(NamedTuple):
+    name: str
+    lat: Optional[float]
+    lon: Optional[float]
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.lat is not None and self.lon is not None
+
+
+def _nominatim_search(place_name: str) -> Tuple[Optional[float], Optional[float]]:
+    """
+    Raw Nominatim lookup. Raises on network/parse errors (CircuitOpenError
+    while the breaker is open), returns (None, None) on no match.
+    """
+    url = f"{NOMINATIM_URL}/search"
+    params = {'q': place_name, 'format': 'json', 'limit': 1}
+
+    # Checked before the rate limiter so an open circuit costs no wait
+    if not nominatim_breaker.allow():
+        raise CircuitOpenError("nominatim circuit is open")
+    nominatim_limiter.acquire()
+    started = time.perf_counter()
+    try:
+        response = http_client.get(url, params=params)
+        response.raise_for_status()
+        data = response.json()
+    except Exception:
+        nominatim_breaker.record(False, time.perf_counter() - started)
+        raise
+    nominatim_breaker.record(True, time.perf_counter() - started)
+    if data:
+        return float(data[0]['lat']), float(data[0]['lon'])
+    return None, None
+
+def _offline_search(place_name: str) -> Tuple[Optional[float], Optional[float]]:
+    """First tier: bundled gazetteer of countries, major cities and landmarks."""
+    if not GEOCODE_OFFLINE:
+        return None, None
+    from utils.gazetteer import get_gazetteer
+    gazetteer = get_gazetteer()
+    if gazetteer is None:
+        return None, None
+    return gazetteer.coordinates(place_name)
+
+@timed("geocode")
+def _cached_search(place_name: str) -> Tuple[Optional[float], Optional[float]]:
+    """
+    Offline gazetteer first, then the cache. Misses go to Nominatim; "not found"
+    answers are cached with the shorter negative TTL, errors are never cached.
+    """
+    lat, lon = _offline_search(place_name)
+    if lat is not None:
+        return lat, lon
+
+    key = normalize_key(place_name)
+    cached = geocode_cache.get(key)
+    if cached is not MISS:
+        return (cached[0], cached[1]) if cached else (None, None)
+
+    def lookup():
+        lat, lon = _nominatim_search(place_name)
+        geocode_cache.set(key, [lat, lon] if lat is not None else None)
+        return lat, lon
+
+    # Sessions asking for the same place at the same time share one request
+    (lat, lon), _ = geocode_flight.do(key, lookup)
+    return lat, lon
+
 def get_coordinates(place_name: str) -> Tuple[Optional[float], Optional[float]]:
     """
     Fetches latitude and longitude for a given place name using Nominatim (OSM).
     Returns (None, None) if not found.
     """
-    url = "https://nominatim.openstreetmap.org/search"
-    headers = {'User-Agent': 'TravelPlanner/1.0'}
-    params = {'q': place_name, 'format': 'json', 'limit': 1}
-    
     try:
-        response = requests.get(url, params=params, headers=headers, timeout=5)
-        data = response.json()
-        if data:
-            return float(data[0]['lat']), float(data[0]['lon'])
+        return _cached_search(place_name)
     except Exception as e:
         print(f"Geocoding error for {place_name}: {e}")
         
     return None, None
 
-def get_osrm_route(coordinates: List[Tuple[float, float]]):
+def _geocode_one(place_name: str) -> GeocodeResult:
+    try:
+        lat, lon = _cached_search(place_name)
+    except CircuitOpenError as e:
+        _count_fallback("geocode_circuit_open")
+        return GeocodeResult(place_name, None, None, str(e))
+    except Exception as e:
+        return GeocodeResult(place_name, None, None, str(e))
+    if lat is None:
+        return GeocodeResult(place_name, None, None, "not found")
+    return GeocodeResult(place_name, lat, lon)
+
+def geocode_wait_s(place_names: List[str]) -> float:
+    """
+    Seconds the Nominatim rate limit alone needs for the names that neither
+    the offline gazetteer nor the geocode cache can answer.
+    """
+    if NOMINATIM_RPS <= 0:
+        return 0.0
+    pending = 0
+    # One lookup per cache key; peek() keeps these checks out of the hit/miss stats
+    for key, name in {normalize_key(n): n for n in place_names}.items():
+        if _offline_search(name)[0] is None and geocode_cache.peek(key) is MISS:
+            pending += 1
+    return pending / NOMINATIM_RPS
+
+def get_coordinates_many(place_names: List[str], max_workers: int = GEOCODE_WORKERS,
+                         timeout: Optional[float] = None) -> List[GeocodeResult]:
+    """
+    Geocodes several place names concurrently.
+
+    Requests share the global Nominatim rate limit, results keep the input order,
+    and a failing lookup is reported in its own GeocodeResult.error instead of
+    aborting the batch. Duplicate names are only looked up once.
+
+    Names not resolved within timeout seconds are reported as "deadline
+    exceeded". Lookups already running at that point finish in the background
+    and fill the cache; ones still queued are dropped, so they do not hold
+    rate-limit slots other requests need. At NOMINATIM_RPS=1 only about
+    timeout uncached names can finish in time; see geocode_wait_s().
+    """
+    if not place_names:
+        return []
+
+    unique = list(dict.fromkeys(place_names))
+    workers = max(1, min(max_workers, len(unique)))
+    pool = ThreadPoolExecutor(max_workers=workers)
+    futures = {name: pool.submit(_geocode_one, name) for name in unique}
+    done, _ = wait(futures.values(), timeout=timeout)
+    pool.shutdown(wait=False, cancel_futures=True)
+
+    resolved = {}
+    for name, future in futures.items():
+        if future in done:
+            resolved[name] = future.result()
+        else:
+            _count_fallback("geocode_deadline")
+            resolved[name] = GeocodeResult(name, None, None, "deadline exceeded")
+    return [resolved[name] for name in place_names]
+
+@timed("osrm_route")
+def get_osrm_route(coordinates: List[Tuple[float, float]], overview: str = None):
     """
     Fetches driving route from OSRM demo server.
     
     Args:
         coordinates: list of (lat, lon) tuples.
+        overview: OSRM geometry detail, "full" or "simplified" (coarser,
+            zoom-dependent). Defaults to OSRM_OVERVIEW.
         
     Returns: 
         (decoded_geometry, distance_in_meters, duration_in_seconds)
@@ -43,94 +298,260 @@ def get_osrm_route(coordinates: List[Tuple[float, float]]):
 
     # OSRM expects lon,lat;lon,lat
     coord_str = ";".join([f"{lon},{lat}" for lat, lon in coordinates])
-    url = f"http://router.project-osrm.org/route/v1/driving/{coord_str}?overview=full"
+    url = f"{OSRM_URL}/route/v1/driving/{coord_str}?overview={overview or OSRM_OVERVIEW}"
     
     try:
-        r = requests.get(url, timeout=5)
-        if r.status_code != 200:
-            return None, 0, 0
-            
-        data = r.json()
-        if data.get("code") == "Ok":
-            route = data["routes"][0]
+        cached = route_cache.get(url)
+        if cached is not MISS:
+            encoded, distance, duration = cached
+        else:
+            (encoded, distance, duration), _ = route_flight.do(url, lambda: _fetch_osrm_route(url))
+        if encoded:
             # OSRM returns encoded polyline (google format)
-            decoded = polyline.decode(route["geometry"])
-            return decoded, route["distance"], route["duration"]
-            
+            import polyline
+            return polyline.decode(encoded), distance, duration
+        return None, distance, duration
+    except CircuitOpenError:
+        _count_fallback("route_circuit_open")
     except Exception as e:
         print(f"OSRM Routing Error: {e}")
         
     return None, 0, 0
 
-class ZoomControl(MacroElement):
-    """
-    Custom Folium Control to display current zoom level on the map.
-    Uses Javascript and Leaflet hooks.
-    """
-    _template = Template("""
-        {% macro script(this, kwargs) %}
-            L.Control.ZoomDisplay = L.Control.extend({
-                onAdd: function(map) {
-                    var div = L.DomUtil.create('div', 'leaflet-bar leaflet-control leaflet-control-custom');
-                    div.style.backgroundColor = 'white';
-                    div.style.padding = '5px 10px';
-                    div.style.fontSize = '14px';
-                    div.style.fontWeight = 'bold';
-                    div.style.border = '2px solid rgba(0,0,0,0.2)';
-                    div.style.borderRadius = '4px';
-                    div.style.cursor = 'default';
+def _fetch_osrm_route(url: str):
+    with osrm_breaker.guard():
+        r = http_client.get(url)
+        # Overload and server errors count against the breaker; 4xx (bad input) does not
+        if r.status_code == 429 or r.status_code >= 500:
+            r.raise_for_status()
+    if r.status_code != 200:
+        return None, 0, 0
+        
+    data = r.json()
+    if data.get("code") == "Ok":
+        route = data["routes"][0]
+        result = (route["geometry"], route["distance"], route["duration"])
+        route_cache.set(url, list(result))
+        return result
+    return None, 0, 0
+
+_zoom_control_cls = None
+
+def _zoom_control():
+    """
+    Builds the ZoomControl element class on first use so folium/branca/jinja2
+    are only imported when a map is actually drawn.
+    """
+    global _zoom_control_cls
+    if _zoom_control_cls is None:
+        from branca.element import MacroElement
+        from jinja2 import Template
+
+        class ZoomControl(MacroElement):
+            """
+            Custom Folium Control to display current zoom level on the map.
+            Uses Javascript and Leaflet hooks.
+            """
+            _template = Template("""
+                {% macro script(this, kwargs) %}
+                    L.Control.ZoomDisplay = L.Control.extend({
+                        onAdd: function(map) {
+                            var div = L.DomUtil.create('div', 'leaflet-bar leaflet-control leaflet-control-custom');
+                            div.style.backgroundColor = 'white';
+                            div.style.padding = '5px 10px';
+                            div.style.fontSize = '14px';
+                            div.style.fontWeight = 'bold';
+                            div.style.border = '2px solid rgba(0,0,0,0.2)';
+                            div.style.borderRadius = '4px';
+                            div.style.cursor = 'default';
                     
-                    var updateZoom = function() {
-                        var z = map.getZoom();
-                        var p = Math.round((z / 7) * 37);
-                        div.innerHTML = 'Zoom ' + p + '%';
-                    };
+                            var updateZoom = function() {
+                                var z = map.getZoom();
+                                var p = Math.round((z / 7) * 37);
+                                div.innerHTML = 'Zoom ' + p + '%';
+                            };
                     
-                    updateZoom();
-                    map.on('zoomend', updateZoom);
-                    return div;
-                }
-            });
-            new L.Control.ZoomDisplay({ position: 'topleft' }).addTo({{this._parent.get_name()}});
-        {% endmacro %}
-    """)
+                            updateZoom();
+                            map.on('zoomend', updateZoom);
+                            return div;
+                        }
+                    });
+                    new L.Control.ZoomDisplay({ position: 'topleft' }).addTo({{this._parent.get_name()}});
+                {% endmacro %}
+            """)
 
-def create_map(city_name: str, locations: List[str] = None) -> folium.Map:
+        _zoom_control_cls = ZoomControl
+    return _zoom_control_cls()
+
+# -------------------- Map description --------------------
+MAP_HTML_CACHE_SIZE = int(os.getenv("MAP_HTML_CACHE_SIZE", "128"))
+# Route payload budget: drop vertices closer than ROUTE_TOLERANCE_M to the
+# simplified line and keep at most ROUTE_MAX_POINTS (0 disables either).
+ROUTE_TOLERANCE_M = float(os.getenv("ROUTE_TOLERANCE_M", "5"))
+ROUTE_MAX_POINTS = int(os.getenv("ROUTE_MAX_POINTS", "1500"))
+# Reorder stops locally (nearest-neighbour + 2-opt) before asking OSRM for a route
+ROUTE_OPTIMIZE = os.getenv("ROUTE_OPTIMIZE", "1") not in ("0", "false", "False")
+_map_html_cache = LRUCache(MAP_HTML_CACHE_SIZE)
+
+@timed("map_data")
+def build_map_data(city_name: str, locations: List[str] = None, days: List[Optional[int]] = None,
+                   optimize_order: bool = None, deadline_s: float = None) -> dict:
     """
-    Creates a Folium map centered on the destination or specific locations.
-    Adds markers, a route line, and a custom info box with stats.
+    Resolves locations and the route into a compact, JSON-serializable map
+    description: center, numbered points, the route as an encoded polyline
+    and trip stats. This is what gets stored in the session instead of a
+    folium.Map.
+
+    Unless optimize_order is False, stops are reordered locally to shorten
+    the route; ``days`` (day number per location) keeps each day's stops together.
+
+    Geocoding and routing share a deadline of deadline_s seconds (default
+    MAP_DEADLINE_S), extended by the time the Nominatim rate limit needs for
+    stops that are not cached (geocode_wait_s), so a long list of new
+    landmarks is not cut off after the first few. While the Nominatim breaker
+    is open those lookups fail at once instead. Stops not resolved in time
+    are left off, and a route
+    that is unavailable (breaker open, error or deadline) is replaced by a
+    straight line through the stops with haversine distance; the map is
+    then marked "route_estimated".
     """
+    if optimize_order is None:
+        optimize_order = ROUTE_OPTIMIZE
+    if deadline_s is None:
+        deadline_s = MAP_DEADLINE_S
+    if deadline_s > 0 and locations and nominatim_breaker.state == CLOSED:
+        deadline_s += geocode_wait_s(locations)
+    deadline = time.monotonic() + deadline_s if deadline_s > 0 else None
+
+    def remaining():
+        return None if deadline is None else max(0.0, deadline - time.monotonic())
+
     # 1. Resolve Locations First to determine center
     valid_locations = []
+    valid_days = []
     if locations:
-        for loc in locations:
-            lat, lon = get_coordinates(loc)
-            if lat is not None and lon is not None:
-                valid_locations.append({"name": loc, "lat": lat, "lon": lon})
+        for i, res in enumerate(get_coordinates_many(locations, timeout=remaining())):
+            if res.ok:
+                valid_locations.append({"name": res.name, "lat": res.lat, "lon": res.lon})
+                valid_days.append(days[i] if days and i < len(days) else None)
+            else:
+                print(f"Geocoding error for {res.name}: {res.error}")
+
+    if optimize_order and len(valid_locations) > 2:
+        from utils.routing import order_stops
+        order = order_stops(
+            [(item["lat"], item["lon"]) for item in valid_locations],
+            valid_days if days else None,
+        )
+        valid_locations = [valid_locations[i] for i in order]
+        valid_days = [valid_days[i] for i in order]
 
     # 2. Determine Map Center
     if valid_locations:
         # Center on the first location initially
         center_lat = valid_locations[0]["lat"]
         center_lon = valid_locations[0]["lon"]
-        initial_zoom = 4 # City level close-up
     else:
         # Fallback to City/Country center
         center_lat, center_lon = get_coordinates(city_name)
         if not center_lat:
             # Absolute fallback (Null Islandish)
             center_lat, center_lon = 20.0, 0.0 
-        
-        # Fallback zoom for city-level or country-level view
-    initial_zoom = 4  # << FIX
-        # Check if it's a known country to adjust zoom
-        
 
-    m = folium.Map(location=[center_lat, center_lon], zoom_start=initial_zoom, tiles="OpenStreetMap")
+    map_data = {
+        "city": city_name,
+        "center": [center_lat, center_lon],
+        "zoom": 4,
+        "points": valid_locations,
+        "route": None,
+        "distance_m": 0,
+        "duration_s": 0,
+    }
 
-    # 3. Add Markers
+    # 3. Route between the stops
+    coords_list = [(item["lat"], item["lon"]) for item in valid_locations]
+    if len(coords_list) > 1:
+        route_geom, dist_meters, duration_sec = _route_by_day(coords_list, valid_days if days else None,
+                                                              timeout=remaining())
+        if not route_geom:
+            from utils.geometry import path_length_m
+            _count_fallback("route_straight_line")
+            route_geom = coords_list
+            dist_meters = path_length_m(coords_list)
+            duration_sec = dist_meters / (FALLBACK_SPEED_KMH / 3.6)
+            map_data["route_estimated"] = True
+        if route_geom:
+            import polyline
+            from utils.geometry import simplify_line
+            route_geom = simplify_line(
+                route_geom,
+                tolerance_m=ROUTE_TOLERANCE_M or None,
+                max_points=ROUTE_MAX_POINTS or None,
+            )
+            map_data["route"] = polyline.encode(route_geom)
+            map_data["distance_m"] = dist_meters
+            map_data["duration_s"] = duration_sec
+
+    return map_data
+
+def _day_legs(coords: List[Tuple[float, float]], days: List[Optional[int]]) -> List[List[Tuple[float, float]]]:
+    """Consecutive same-day runs, each starting from the previous run's last stop."""
+    legs, current, previous_day = [], [], object()
+    for point, day in zip(coords, days):
+        if current and day != previous_day:
+            legs.append(current)
+            current = [current[-1]]
+        current.append(point)
+        previous_day = day
+    legs.append(current)
+    return [leg for leg in legs if len(leg) > 1]
+
+def _route_by_day(coords: List[Tuple[float, float]], days: Optional[List[Optional[int]]],
+                  timeout: Optional[float] = None):
+    """
+    Routes a multi-day trip one day at a time and joins the legs, so editing
+    one day only re-requests the legs that touch it; unchanged legs come
+    from the route cache. Without day numbers the whole trip is one request.
+    Gives up with no route once timeout seconds have passed.
+    """
+    legs = _day_legs(coords, days) if days and len(set(days)) > 1 else [coords]
+    if len(legs) == 1 and timeout is None:
+        return get_osrm_route(legs[0])
+
+    # The HTTP client caps concurrent requests per host, so this only bounds threads
+    pool = ThreadPoolExecutor(max_workers=min(len(legs), 8))
+    futures = [pool.submit(get_osrm_route, leg) for leg in legs]
+    done, pending = wait(futures, timeout=timeout)
+    pool.shutdown(wait=False, cancel_futures=True)
+    if pending:
+        _count_fallback("route_deadline")
+        return None, 0, 0
+    results = [f.result() for f in futures]
+    if any(geom is None for geom, _, _ in results):
+        return None, 0, 0
+    geometry = list(results[0][0])
+    for geom, _, _ in results[1:]:
+        geometry.extend(geom[1:])  # each leg starts where the previous one ended
+    return geometry, sum(r[1] for r in results), sum(r[2] for r in results)
+
+def map_data_hash(map_data: dict) -> str:
+    blob = json.dumps(map_data, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha1(blob.encode("utf-8")).hexdigest()
+
+def build_folium_map(map_data: dict) -> "folium.Map":
+    """
+    Draws a map description from build_map_data as a Folium map.
+    Adds markers, a route line, and a custom info box with stats.
+    """
+    import folium
+
+    center_lat, center_lon = map_data["center"]
+    m = folium.Map(location=[center_lat, center_lon], zoom_start=map_data.get("zoom", 4), tiles="OpenStreetMap")
+    points = map_data.get("points", [])
+
+    # Add Markers
     coords_list = []
-    for i, item in enumerate(valid_locations):
+    for i, item in enumerate(points):
         coords_list.append((item["lat"], item["lon"]))
         
         # Add a nice marker
@@ -141,20 +562,22 @@ def create_map(city_name: str, locations: List[str] = None) -> folium.Map:
             icon=folium.Icon(color="red", icon=str(i+1), prefix="fa")
         ).add_to(m)
 
-    # 4. Draw Route & Add Stats
+    # Draw Route & Add Stats
     if len(coords_list) > 1:
-        route_geom, dist_meters, duration_sec = get_osrm_route(coords_list)
-        
-        if route_geom:
+        if map_data.get("route"):
+            import polyline
+            estimated = map_data.get("route_estimated", False)
             folium.PolyLine(
-                route_geom,
-                color="blue",
-                weight=5,
-                opacity=0.7
+                polyline.decode(map_data["route"]),
+                color="gray" if estimated else "blue",
+                weight=4 if estimated else 5,
+                opacity=0.7,
+                dash_array="8, 8" if estimated else None,
             ).add_to(m)
             
             # Info Box (Floating overlay)
-            dist_km = dist_meters / 1000
+            dist_km = map_data["distance_m"] / 1000
+            duration_sec = map_data["duration_s"]
             hours = int(duration_sec // 3600)
             mins = int((duration_sec % 3600) // 60)
             
@@ -172,6 +595,7 @@ def create_map(city_name: str, locations: List[str] = None) -> folium.Map:
                 <div style="margin-bottom: 5px;"><strong>🚗 Trip Stats</strong></div>
                 <div><b>Distance:</b> {dist_km:.1f} km</div>
                 <div><b>Est. Time:</b> {hours}h {mins}m</div>
+                {"<div style='color:#888;font-size:12px;'>Straight-line estimate, road route unavailable</div>" if estimated else ""}
             </div>
             """
             m.get_root().html.add_child(folium.Element(info_html))
@@ -179,15 +603,36 @@ def create_map(city_name: str, locations: List[str] = None) -> folium.Map:
         # Smart bounds fitting
         m.fit_bounds(coords_list, padding=(50, 50))
 
-    elif not valid_locations:
+    elif not points:
         # Fallback Marker just to show we found the city
         folium.Marker(
             [center_lat, center_lon],
-            popup=city_name,
+            popup=map_data.get("city"),
             icon=folium.Icon(color="blue", icon="info-sign")
         ).add_to(m)
 
     # Add custom controls
-    m.add_child(ZoomControl())
+    m.add_child(_zoom_control())
     
     return m
+
+@timed("map_html")
+def render_map_html(map_data: dict) -> str:
+    """
+    Renders a map description to HTML, memoized by its content hash so
+    Streamlit reruns don't re-run the folium/Jinja pipeline for an unchanged map.
+    """
+    key = map_data_hash(map_data)
+    html = _map_html_cache.get(key)
+    if html is MISS:
+        html = build_folium_map(map_data).get_root().render()
+        _map_html_cache.set(key, html)
+    return html
+
+@timed("create_map")
+def create_map(city_name: str, locations: List[str] = None, days: List[Optional[int]] = None) -> "folium.Map":
+    """
+    Creates a Folium map centered on the destination or specific locations.
+    Adds markers, a route line, and a custom info box with stats.
+    """
+    return build_folium_map(build_map_data(city_name, locations, days))
@@ -0,0 +1,258 @@
+import os
+import threading
+import time
+from bisect import bisect_left
+from functools import wraps
+from typing import Callable, Dict, List, Optional
+
+# Stage timings are off unless METRICS_ENABLED is set; when off, span()
+# hands back one shared no-op context manager and @timed is a flag check.
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "0") not in ("0", "false", "False", "")
+METRICS_FILE = os.getenv("METRICS_FILE", "")          # Prometheus text written after each plan
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))    # serve /metrics on this port (0 = off)
+METRICS_PREFIX = "travel_planner_stage_seconds"
+
+# Upper bounds in seconds; the last (implicit) bucket is +Inf
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class Histogram:
+    """Fixed-bucket latency histogram with Prometheus semantics."""
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = tuple(buckets)
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._sum = 0.0
+        self._count = 0
+        self._max = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float):
+        i = bisect_left(self.buckets, seconds)
+        with self._lock:
+            self._counts[i] += 1
+            self._sum += seconds
+            self._count += 1
+            if seconds > self._max:
+                self._max = seconds
+
+    def quantile(self, q: float) -> float:
+        """Estimate from the buckets, interpolating linearly inside one."""
+        with self._lock:
+            counts, total, top = list(self._counts), self._count, self._max
+        if not total:
+            return 0.0
+        rank = q * total
+        seen = 0
+        for i, n in enumerate(counts):
+            if n and seen + n >= rank:
+                lo = self.buckets[i - 1] if i else 0.0
+                hi = self.buckets[i] if i < len(self.buckets) else top
+                return min(top, lo + (hi - lo) * (rank - seen) / n)
+            seen += n
+        return top
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            count, total, top = self._count, self._sum, self._max
+        return {
+            "count": count,
+            "sum_s": round(total, 6),
+            "mean_s": round(total / count, 6) if count else 0.0,
+            "p50_s": round(self.quantile(0.50), 6),
+            "p95_s": round(self.quantile(0.95), 6),
+            "max_s": round(top, 6),
+        }
+
+    def cumulative(self) -> List[int]:
+        with self._lock:
+            counts = list(self._counts)
+        out, running = [], 0
+        for n in counts:
+            running += n
+            out.append(running)
+        return out
+
+
+_histograms: Dict[str, Histogram] = {}
+_histograms_lock = threading.Lock()
+
+# Callables returning extra exposition lines (breaker state, fallback counts, ...)
+_collectors: List[Callable[[], List[str]]] = []
+
+
+def register_collector(fn: Callable[[], List[str]]):
+    """Adds fn's lines to every prometheus_text() export."""
+    _collectors.append(fn)
+
+
+def histogram(stage: str) -> Histogram:
+    hist = _histograms.get(stage)
+    if hist is None:
+        with _histograms_lock:
+            hist = _histograms.setdefault(stage, Histogram())
+    return hist
+
+
+def observe(stage: str, seconds: float):
+    if METRICS_ENABLED:
+        histogram(stage).observe(seconds)
+
+
+def enable(on: bool = True):
+    """Turns recording on or off at runtime (benchmarks, debug sessions)."""
+    global METRICS_ENABLED
+    METRICS_ENABLED = on
+
+
+def reset():
+    with _histograms_lock:
+        _histograms.clear()
+
+
+# -------------------- Spans --------------------
+class _Span:
+    __slots__ = ("stage", "started")
+
+    def __init__(self, stage: str):
+        self.stage = stage
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        histogram(self.stage).observe(time.perf_counter() - self.started)
+        return False
+
+
+class _NoSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NO_SPAN = _NoSpan()
+
+
+def span(stage: str):
+    """
+    Times the enclosed block into the stage's histogram:
+
+        with span("osrm_route"):
+            ...
+    """
+    return _Span(stage) if METRICS_ENABLED else _NO_SPAN
+
+
+def timed(stage: str):
+    """Decorator form of span() for whole functions."""
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not METRICS_ENABLED:
+                return fn(*args, **kwargs)
+            started = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                histogram(stage).observe(time.perf_counter() - started)
+        return wrapper
+    return decorator
+
+
+# -------------------- Export --------------------
+def stage_summary() -> Dict[str, Dict[str, float]]:
+    """{stage: {count, sum_s, mean_s, p50_s, p95_s, max_s}} for every recorded stage."""
+    with _histograms_lock:
+        items = sorted(_histograms.items())
+    return {stage: hist.snapshot() for stage, hist in items}
+
+
+def prometheus_text() -> str:
+    """All stage histograms in the Prometheus text exposition format."""
+    with _histograms_lock:
+        items = sorted(_histograms.items())
+    lines = [
+        f"# HELP {METRICS_PREFIX} Time spent in each stage of building a trip plan.",
+        f"# TYPE {METRICS_PREFIX} histogram",
+    ]
+    for stage, hist in items:
+        cumulative = hist.cumulative()
+        bounds = [f"{b:g}" for b in hist.buckets] + ["+Inf"]
+        for le, n in zip(bounds, cumulative):
+            lines.append(f'{METRICS_PREFIX}_bucket{{stage="{stage}",le="{le}"}} {n}')
+        snap = hist.snapshot()
+        lines.append(f'{METRICS_PREFIX}_sum{{stage="{stage}"}} {snap["sum_s"]}')
+        lines.append(f'{METRICS_PREFIX}_count{{stage="{stage}"}} {snap["count"]}')
+    for collect in list(_collectors):
+        try:
+            lines.extend(collect())
+        except Exception as e:
+            print(f"Metrics collector failed: {e}")
+    return "\n".join(lines) + "\n"
+
+
+def write_prometheus(path: Optional[str] = None) -> Optional[str]:
+    """
+    Writes prometheus_text() atomically to path (default METRICS_FILE), e.g.
+    for node_exporter's textfile collector. Returns the path written.
+    """
+    path = path or METRICS_FILE
+    if not path:
+        return None
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(prometheus_text())
+    os.replace(tmp, path)
+    return path
+
+
+_server = None
+_server_lock = threading.Lock()
+
+
+def start_metrics_server(port: Optional[int] = None, host: str = "0.0.0.0"):
+    """
+    Serves GET /metrics on a daemon thread (once per process). Returns the
+    server, or None when no port is configured.
+    """
+    global _server
+    port = port if port is not None else METRICS_PORT
+    if not port:
+        return None
+    with _server_lock:
+        if _server is not None:
+            return _server
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                if self.path.split("?")[0].rstrip("/") != "/metrics":
+                    self.send_error(404)
+                    return
+                body = prometheus_text().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        try:
+            server = ThreadingHTTPServer((host, port), Handler)
+        except OSError as e:
+            print(f"Metrics endpoint disabled: {e}")
+            return None
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        _server = server
+    return _server
@@ -0,0 +1,363 @@
+import dataclasses
+import os
+import re
+from bisect import bisect_left
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+# Price mismatches up to this fraction of the target are fixed by rescaling
+# the price tags locally; larger ones are worth another model call.
+PRICE_RESCALE_TOLERANCE = float(os.getenv("PRICE_RESCALE_TOLERANCE", "0.15"))
+# Below this relative gap the prices are left exactly as the model wrote them
+PRICE_EXACT_TOLERANCE = 0.005
+
+_PRICE_TAG_RE = re.compile(r"(<span\b[^>]*\bprice-tag\b[^>]*>[^<\d]*)(\d[\d,]*(?:\.\d+)?)", re.I)
+_COST_SUMMARY = r"div\b[^>]*\bclass\s*=\s*['\"][^'\"]*\bcost-summary\b[^'\"]*['\"][^>]*>"
+COST_SUMMARY_RE = re.compile("<" + _COST_SUMMARY, re.I)   # also used by utils.itinerary_ai
+
+# One pass over the HTML picks up price tags, day-card openings, the
+# cost-summary opening and table rows, in document order. The shared "<"
+# prefix lets the regex engine skip straight from tag to tag.
+_SCAN_RE = re.compile(
+    r"<(?:span\b[^>]*\bprice-tag\b[^>]*>[^<\d]*(?P<amount>\d[\d,]*(?:\.\d+)?)"
+    r"|(?P<day>div\b[^>]*\bclass\s*=\s*['\"][^'\"]*\bday-card\b[^'\"]*['\"][^>]*>)"
+    rf"|(?P<summary>{_COST_SUMMARY})"
+    r"|tr\b[^>]*>(?P<cells>.*?)</tr>)",
+    re.I | re.S,
+)
+_CELL_RE = re.compile(r"<t[dh]\b[^>]*>(.*?)</t[dh]>", re.I | re.S)
+_NUMBER_RE = re.compile(r"\d[\d,]*(?:\.\d+)?")
+_TAG_RE = re.compile(r"<[^>]+>")
+_DAY_LABEL_RE = re.compile(r"day\s+(\d+)$", re.I)
+
+# Words just before a price tag that place it in a calculate_budget_split
+# category; the word closest to the tag wins, anything else is Activities
+_CATEGORY_WORDS = {
+    **dict.fromkeys(("hostel", "hotel", "stay", "check", "room", "dorm", "guesthouse", "homestay",
+                     "accommodation", "zostel"), "Accommodation"),
+    **dict.fromkeys(("taxi", "cab", "bus", "metro", "train", "auto", "rickshaw", "uber", "ferry", "flight",
+                     "transport", "transfer", "scooter"), "Transport"),
+    **dict.fromkeys(("breakfast", "lunch", "dinner", "meal", "food", "cafe", "restaurant", "snack", "thali",
+                     "dhaba"), "Food"),
+}
+_CATEGORY_WORDS.update({word + "s": category for word, category in list(_CATEGORY_WORDS.items())})
+_WORD_RE = re.compile(r"[a-z]+")
+_CONTEXT_CHARS = 160
+
+
+class PriceTag(NamedTuple):
+    amount: float
+    day: int            # 1-based day-card index, 0 outside any card
+    category: str       # a calculate_budget_split breakdown key
+
+
+class PriceScan(NamedTuple):
+    tags: List[PriceTag]
+    summary_rows: List[Tuple[str, float]]   # cost-summary rows other than Total
+    summary_total: Optional[float]
+
+    @property
+    def total(self) -> float:
+        return round(sum(t.amount for t in self.tags), 2)
+
+    def by_day(self) -> Dict[int, float]:
+        out: Dict[int, float] = {}
+        for t in self.tags:
+            out[t.day] = round(out.get(t.day, 0.0) + t.amount, 2)
+        return out
+
+    def by_category(self) -> Dict[str, float]:
+        out: Dict[str, float] = {}
+        for t in self.tags:
+            out[t.category] = round(out.get(t.category, 0.0) + t.amount, 2)
+        return out
+
+
+def _number(text: str) -> float:
+    return float(text.replace(",", ""))
+
+
+def _category(context: str) -> str:
+    hits = [c for c in map(_CATEGORY_WORDS.get, _WORD_RE.findall(context.lower())) if c]
+    return hits[-1] if hits else "Activities"
+
+
+def scan_prices(html: str) -> PriceScan:
+    """
+    Single regex pass over itinerary HTML (no parse tree): every price-tag
+    amount with its day and budget category, plus the cost-summary rows.
+    """
+    html = html or ""
+    tags, rows, summary_total = [], [], None
+    day, in_summary, context_from = 0, False, 0
+    for m in _SCAN_RE.finditer(html):
+        if m.group("amount") is not None:
+            start = m.start()
+            context = html[max(context_from, start - _CONTEXT_CHARS):start]
+            tags.append(PriceTag(_number(m.group("amount")), day, _category(context)))
+            context_from = m.end()
+        elif m.group("day") is not None:
+            day += 1
+            in_summary = False
+            context_from = m.end()
+        elif m.group("summary") is not None:
+            in_summary = True
+        elif in_summary:
+            cells = [_TAG_RE.sub("", c).strip() for c in _CELL_RE.findall(m.group("cells"))]
+            amounts = _NUMBER_RE.findall(cells[-1]) if cells else []
+            if not amounts:
+                continue
+            if cells[0].casefold().startswith("total"):
+                summary_total = _number(amounts[0])
+            else:
+                rows.append((cells[0], _number(amounts[0])))
+    return PriceScan(tags, rows, summary_total)
+
+
+def price_total(html: str) -> float:
+    """Sum of the price-tag amounts in an HTML fragment."""
+    return round(sum(_number(m.group(2)) for m in _PRICE_TAG_RE.finditer(html or "")), 2)
+
+
+def _decimals(text: str) -> int:
+    return len(text.partition(".")[2])
+
+
+def format_amount(value: float, decimals: Optional[int] = None) -> str:
+    """value with the given decimals; by default none for whole amounts and two otherwise."""
+    if decimals is None:
+        decimals = 0 if abs(value - round(value)) < 0.005 else 2
+    return f"{value:.{decimals}f}"
+
+
+def _scaled(values: List[Tuple[float, int]], factor: float, target: Optional[float] = None) -> List[str]:
+    """
+    (amount, decimals) pairs multiplied by factor, each kept at its own
+    precision. With target, the rounding remainder goes to the largest
+    amount (with cents if it needs them) so the results add up to target.
+    """
+    scaled = [round(amount * factor, decimals) for amount, decimals in values]
+    decimals = [d for _, d in values]
+    if target is not None and scaled:
+        remainder = round(target - sum(scaled), 2)
+        if remainder:
+            i = max(range(len(scaled)), key=scaled.__getitem__)
+            if abs(remainder - round(remainder)) >= 0.005:
+                decimals[i] = max(decimals[i], 2)
+            scaled[i] = round(scaled[i] + remainder, decimals[i])
+    return [format_amount(v, d) for v, d in zip(scaled, decimals)]
+
+
+def _replace_tags(html: str, amounts: List[str]) -> str:
+    new = iter(amounts)
+    return _PRICE_TAG_RE.sub(lambda m: f"{m.group(1)}{next(new)}", html)
+
+
+def _scaled_tags(html: str, factor: float, target: Optional[float] = None) -> List[str]:
+    return _scaled([(_number(m.group(2)), _decimals(m.group(2))) for m in _PRICE_TAG_RE.finditer(html)],
+                   factor, target)
+
+
+def rescale_prices(html: str, factor: float, target: Optional[float] = None) -> str:
+    """
+    Multiplies every price-tag amount by factor, keeping each tag's decimal
+    places. With target the largest tag takes the rounding remainder, so the
+    tags add up to target exactly.
+    """
+    html = html or ""
+    return _replace_tags(html, _scaled_tags(html, factor, target))
+
+
+def rescale_cards(html: str, cards: List[str], factor: float,
+                  target: Optional[float] = None) -> Tuple[str, List[str]]:
+    """
+    rescale_prices over html and over the day cards cut from it, so a card
+    gets exactly the amounts its tags have in the rescaled html (including
+    the rounding remainder). A card not found in html is rescaled on its own.
+    """
+    html = html or ""
+    amounts = _scaled_tags(html, factor, target)
+    starts = [m.start() for m in _PRICE_TAG_RE.finditer(html)]
+    new_cards, pos = [], 0
+    for card in cards:
+        at = html.find(card, pos)
+        if at < 0:
+            new_cards.append(rescale_prices(card, factor))
+            continue
+        first = bisect_left(starts, at)
+        count = bisect_left(starts, at + len(card)) - first
+        new_cards.append(_replace_tags(card, amounts[first:first + count]))
+        pos = at + len(card)
+    return _replace_tags(html, amounts), new_cards
+
+
+def _rescale_summary(html: str, factor: float, total: float, day_totals: Dict[int, float] = None) -> str:
+    """
+    Rewrites the cost-summary amounts: "Day N" rows become day_totals[N]
+    when given, other rows are scaled by factor at their own precision and
+    the Total row is set to total. When those other rows made up the whole
+    old Total, the largest takes the rounding remainder so they still do.
+    HTML without a cost-summary is returned unchanged.
+    """
+    found = COST_SUMMARY_RE.search(html)
+    if not found:
+        return html
+    start = found.start()
+
+    # First pass: the amount cell of every row, and which rows are scaled
+    rows, scaled, old_total, day_rows = {}, [], None, False
+    for m in _SCAN_RE.finditer(html, start):
+        cells = m.group("cells")
+        if cells is None:
+            continue
+        label = _TAG_RE.sub("", (_CELL_RE.findall(cells) or [""])[0]).strip()
+        last_cell = list(_CELL_RE.finditer(cells))
+        amount = _NUMBER_RE.search(last_cell[-1].group(0)) if last_cell else None
+        if amount is None:
+            continue
+        day = _DAY_LABEL_RE.match(label)
+        if label.casefold().startswith("total"):
+            rows[m.start()] = format_amount(total)
+            old_total = _number(amount.group(0))
+        elif day and day_totals and int(day.group(1)) in day_totals:
+            rows[m.start()] = format_amount(day_totals[int(day.group(1))])
+            day_rows = True
+        else:
+            scaled.append((m.start(), _number(amount.group(0)), _decimals(amount.group(0))))
+    if scaled:
+        parts_of_total = (not day_rows and old_total is not None
+                          and abs(sum(v for _, v, _ in scaled) - old_total) < 1)
+        amounts = _scaled([(v, d) for _, v, d in scaled], factor, total if parts_of_total else None)
+        rows.update((pos, text) for (pos, _, _), text in zip(scaled, amounts))
+
+    def row(m):
+        if m.start() + start not in rows:
+            return m.group(0)
+        cells = m.group("cells")
+        cell = list(_CELL_RE.finditer(cells))[-1]
+        new_cell = _NUMBER_RE.sub(lambda n: rows[m.start() + start], cell.group(0), count=1)
+        body = cells[:cell.start()] + new_cell + cells[cell.end():]
+        return m.group(0).replace(cells, body, 1)
+
+    return html[:start] + _SCAN_RE.sub(row, html[start:])
+
+
+# -------------------- Validation --------------------
+class PriceCheck(NamedTuple):
+    tags_total: float
+    total_cost: float
+    budget_total: float
+    target: float                   # what the tags should add up to
+    gap: float                      # |tags_total - target| / target
+    over_categories: Dict[str, float]   # category -> amount above its breakdown share
+
+    @property
+    def action(self) -> str:
+        """"ok", "rescale" (small gap, fix locally) or "reask" (large gap)."""
+        if not self.tags_total or self.gap <= PRICE_EXACT_TOLERANCE:
+            return "ok"
+        return "rescale" if self.gap <= PRICE_RESCALE_TOLERANCE else "reask"
+
+
+def as_number(value) -> float:
+    """Model-supplied amount as a float; anything unparseable counts as 0."""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def check_prices(html: str, total_cost, budget_info: dict, scan: PriceScan = None) -> PriceCheck:
+    """
+    Compares the price tags with total_cost and with the budget split. The
+    target is the model's total_cost (the tag sum when it gave none), capped
+    at the budget total. Per-category overspend against the breakdown is
+    reported in over_categories.
+    """
+    if scan is None:
+        scan = scan_prices(html)
+    tags_total = scan.total
+    total_cost = as_number(total_cost)
+    budget_total = as_number(budget_info.get('total'))
+    target = total_cost or tags_total
+    if budget_total:
+        target = min(target, budget_total)
+    gap = abs(tags_total - target) / target if target else 0.0
+    return PriceCheck(tags_total, total_cost, budget_total, round(target, 2), round(gap, 4),
+                      _over_categories(scan, budget_info))
+
+
+def _over_categories(scan: PriceScan, budget_info: dict) -> Dict[str, float]:
+    """Categories whose tags exceed their breakdown share by more than the tolerance."""
+    over = {}
+    breakdown = budget_info.get('breakdown') or {}
+    for category, spent in scan.by_category().items():
+        share = as_number(breakdown.get(category))
+        if share and spent > share * (1 + PRICE_RESCALE_TOLERANCE):
+            over[category] = round(spent - share, 2)
+    return over
+
+
+def _summary_is_stale(scan: PriceScan, total: float, day_totals: Dict[int, float]) -> bool:
+    """True when the cost-summary Total or a "Day N" row disagrees with the tags."""
+    if scan.summary_total is not None and abs(scan.summary_total - total) >= 0.5:
+        return True
+    for label, amount in scan.summary_rows:
+        day = _DAY_LABEL_RE.match(label)
+        if day and abs(amount - day_totals.get(int(day.group(1)), 0.0)) >= 0.5:
+            return True
+    return False
+
+
+def reconcile_prices(result, budget_info: dict):
+    """
+    Makes an ItineraryResult's price tags, cost-summary and total_cost agree.
+
+    Returns (result, check). A small gap below the target is closed by
+    lowering total_cost to the tag sum; a small overshoot is closed by
+    rescaling the tags (in html and in every day card) down to the target.
+    Either way the cost-summary is rewritten to match (see settle_prices).
+    With a large gap the result is returned unchanged and check.action is
+    "reask".
+    """
+    if not result.ok:
+        return result, None
+    scan = scan_prices(result.html)
+    check = check_prices(result.html, result.total_cost, budget_info, scan)
+    if not check.tags_total:
+        return result, check
+    if check.action == "reask":
+        return result, check
+    if check.action == "ok" or check.tags_total < check.target:
+        return settle_prices(result, budget_info), check
+
+    factor = check.target / check.tags_total
+    html, days = rescale_cards(result.html, result.days, factor, check.target)
+    repaired = dataclasses.replace(result, html=html, days=days)
+    return settle_prices(repaired, budget_info, factor), check
+
+
+def settle_prices(result, budget_info: dict = None, factor: float = 1.0):
+    """
+    Keeps the price tags as they are and makes everything else follow them:
+    total_cost becomes their sum and the cost-summary Total and "Day N" rows
+    are rewritten from the tags (other rows are scaled by factor when the
+    tags were just rescaled). With budget_info, categories over their share
+    are recorded in result.over_budget.
+    """
+    if not result.ok:
+        return result
+    scan = scan_prices(result.html)
+    total = scan.total
+    if not total:
+        return result
+    changes = {}
+    if as_number(result.total_cost) != total:
+        changes["total_cost"] = total
+    day_totals = scan.by_day()
+    if factor != 1.0 or _summary_is_stale(scan, total, day_totals):
+        changes["html"] = _rescale_summary(result.html, factor, total, day_totals)
+    if budget_info is not None:
+        over = _over_categories(scan, budget_info)
+        if over != result.over_budget:
+            changes["over_budget"] = over
+    return dataclasses.replace(result, **changes) if changes else result
@@ -0,0 +1,118 @@
+import re
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from utils.geometry import haversine_matrix
+
+_DAY_CARD_RE = re.compile(r"<div\b[^>]*\bclass\s*=\s*['\"][^'\"]*\bday-card\b", re.I)
+_TAG_RE = re.compile(r"<[^>]+>")
+
+
+def path_length(dist: np.ndarray, order: Sequence[int]) -> float:
+    order = np.asarray(order)
+    if len(order) < 2:
+        return 0.0
+    return float(dist[order[:-1], order[1:]].sum())
+
+
+def nearest_neighbour(dist: np.ndarray, start: int = 0) -> List[int]:
+    """Greedy open path over all points, starting at ``start``."""
+    n = len(dist)
+    visited = np.zeros(n, dtype=bool)
+    order = [start]
+    visited[start] = True
+    for _ in range(n - 1):
+        row = np.where(visited, np.inf, dist[order[-1]])
+        nxt = int(np.argmin(row))
+        order.append(nxt)
+        visited[nxt] = True
+    return order
+
+
+def two_opt(dist: np.ndarray, order: Sequence[int], max_rounds: int = 50) -> List[int]:
+    """
+    Improves an open path (first stop fixed, last stop free) with 2-opt.
+
+    For each edge i the gain of reversing tour[i+1..j] is computed for every
+    j at once; the best improving move is applied until none is left.
+    """
+    tour = np.asarray(order)
+    n = len(tour)
+    if n < 4:
+        return tour.tolist()
+    for _ in range(max_rounds):
+        improved = False
+        for i in range(n - 2):
+            a, b = tour[i], tour[i + 1]
+            c = tour[i + 2:]
+            d = np.append(tour[i + 3:], -1)
+            # Reversing up to the last stop leaves no outgoing edge to pay for
+            d_cd = np.where(d >= 0, dist[c, d], 0.0)
+            d_bd = np.where(d >= 0, dist[b, d], 0.0)
+            gain = dist[a, b] + d_cd - dist[a, c] - d_bd
+            k = int(np.argmax(gain))
+            if gain[k] > 1e-9:
+                j = i + 2 + k
+                tour[i + 1:j + 1] = tour[i + 1:j + 1][::-1]
+                improved = True
+        if not improved:
+            break
+    return tour.tolist()
+
+
+def order_stops(coords: Sequence[Tuple[float, float]], days: Optional[Sequence[Optional[int]]] = None) -> List[int]:
+    """
+    Visiting order for geocoded stops, as indices into ``coords``.
+
+    Builds a haversine distance matrix and solves nearest-neighbour + 2-opt
+    starting from the first listed stop. When ``days`` gives the day number
+    of each stop, days are kept in order and only the stops within a day are
+    reordered; each day starts from its stop closest to where the previous
+    day ended.
+    """
+    n = len(coords)
+    if n < 3 and not days:
+        return list(range(n))
+    dist = haversine_matrix(coords)
+
+    if not days:
+        return two_opt(dist, nearest_neighbour(dist, 0))
+
+    groups = {}
+    for i, day in enumerate(days):
+        groups.setdefault(day if day is not None else -1, []).append(i)
+    keys = sorted(k for k in groups if k != -1) + ([-1] if -1 in groups else [])
+
+    order: List[int] = []
+    for key in keys:
+        members = np.array(groups[key])
+        sub = dist[np.ix_(members, members)]
+        if order:
+            start = int(np.argmin(dist[order[-1], members]))
+        else:
+            start = 0
+        local = two_opt(sub, nearest_neighbour(sub, start))
+        order.extend(members[local].tolist())
+    return order
+
+
+def assign_days(html: str, locations: Sequence[str]) -> List[Optional[int]]:
+    """
+    Day number (1-based) of each location, taken from the first day-card
+    whose text mentions it. Locations not mentioned inherit the previous
+    location's day, or None if nothing before them matched.
+    """
+    starts = [m.start() for m in _DAY_CARD_RE.finditer(html or "")]
+    texts = [
+        _TAG_RE.sub(" ", html[s:e]).casefold()
+        for s, e in zip(starts, starts[1:] + [len(html)])
+    ]
+    days: List[Optional[int]] = []
+    previous = None
+    for loc in locations:
+        name = loc.casefold().strip()
+        day = next((d for d, text in enumerate(texts, start=1) if name and name in text), previous)
+        days.append(day)
+        previous = day
+    return days
@@ -0,0 +1,107 @@
+import threading
+from typing import Any, Callable, Dict, Hashable, List, Tuple
+
+from utils import metrics
+
+# Every group registers itself here so stats can be reported in one place
+_groups: Dict[str, "SingleFlight"] = {}
+
+
+class _Call:
+    __slots__ = ("event", "result", "error", "followers")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+        self.followers = 0
+
+    def wait(self) -> Any:
+        self.event.wait()
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key: the first caller (the
+    leader) does the upstream work, later callers with the same key block
+    until it finishes and share its result or exception. Nothing is cached
+    once the call completes.
+    """
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self._stats = {"calls": 0, "upstream": 0, "coalesced": 0}
+        _groups[name] = self
+
+    def begin(self, key: Hashable) -> Tuple[_Call, bool]:
+        """
+        Joins or starts the call for key. Returns (call, is_leader); the
+        leader must call finish() exactly once, followers call call.wait().
+        """
+        with self._lock:
+            self._stats["calls"] += 1
+            call = self._calls.get(key)
+            if call is not None:
+                call.followers += 1
+                self._stats["coalesced"] += 1
+                return call, False
+            call = _Call()
+            self._calls[key] = call
+            self._stats["upstream"] += 1
+            return call, True
+
+    def finish(self, key: Hashable, call: _Call, result: Any = None, error: BaseException = None):
+        with self._lock:
+            if self._calls.get(key) is call:
+                del self._calls[key]
+        call.result = result
+        call.error = error
+        call.event.set()
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """Runs fn once per in-flight key. Returns (result, shared)."""
+        call, leader = self.begin(key)
+        if not leader:
+            return call.wait(), True
+        try:
+            result = fn()
+        except BaseException as e:
+            self.finish(key, call, error=e)
+            raise
+        self.finish(key, call, result=result)
+        return result, False
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["in_flight"] = len(self._calls)
+        return stats
+
+
+def flight_stats() -> Dict[str, Dict[str, int]]:
+    """Per-group counters; ``coalesced`` is the number of upstream calls saved."""
+    return {name: group.stats() for name, group in _groups.items()}
+
+
+def _prometheus_lines() -> List[str]:
+    stats = flight_stats()
+    lines = [
+        "# HELP travel_planner_flight_calls_total Calls made through a coalescing group.",
+        "# TYPE travel_planner_flight_calls_total counter",
+    ]
+    lines += [f'travel_planner_flight_calls_total{{group="{name}"}} {s["calls"]}' for name, s in stats.items()]
+    lines += [
+        "# HELP travel_planner_flight_coalesced_total Calls that shared another call's in-flight result.",
+        "# TYPE travel_planner_flight_coalesced_total counter",
+    ]
+    lines += [f'travel_planner_flight_coalesced_total{{group="{name}"}} {s["coalesced"]}' for name, s in stats.items()]
+    lines.append("# TYPE travel_planner_flight_in_flight gauge")
+    lines += [f'travel_planner_flight_in_flight{{group="{name}"}} {s["in_flight"]}' for name, s in stats.items()]
+    return lines
+
+
+metrics.register_collector(_prometheus_lines)
@@ -1,5 +1,13 @@
-import requests
-from typing import List, Dict
+import os
+import json
+import time
+import threading
+from typing import TYPE_CHECKING, List, Dict, Optional, Sequence, Union
+
+# numpy and the HTTP client are imported inside the functions that need them
+# so the landing page can import the country/currency data without them.
+if TYPE_CHECKING:
+    import numpy as np
 
 # --- Data: Country to Currency Mapping ---
 # This serves both as your list of countries and your currency lookup
@@ -48,36 +56,172 @@ COUNTRY_CURRENCY_MAP = {
 def get_currency_for_country(country: str) -> str:
     return COUNTRY_CURRENCY_MAP.get(country, "USD")
 
-def convert_currency(amount: float, from_curr: str, to_curr: str) -> float:
-    try:
-        url = f"https://open.er-api.com/v6/latest/{from_curr}"
-        response = requests.get(url)
+# --- Exchange rates ---
+FX_API_URL = os.getenv("FX_API_URL", "https://open.er-api.com/v6/latest/{base}")
+FX_BASE = os.getenv("FX_BASE", "USD")
+FX_TTL = float(os.getenv("FX_TTL", str(6 * 3600)))
+FX_SNAPSHOT_PATH = os.getenv("FX_SNAPSHOT_PATH", ".cache/fx_rates.json")
+CURRENCIES = sorted(set(COUNTRY_CURRENCY_MAP.values()))
+
+
+class RateTable:
+    """
+    Exchange rates against one base currency, held as a NumPy vector.
+
+    Rates are fetched once per TTL; any cross rate is derived locally as
+    rates[to] / rates[from]. Each successful fetch is saved to disk so the
+    table keeps working offline from the last snapshot.
+    """
+    def __init__(self, base: str = FX_BASE, ttl: float = FX_TTL, snapshot_path: Optional[str] = FX_SNAPSHOT_PATH):
+        self.base = base
+        self.ttl = ttl
+        self.snapshot_path = snapshot_path
+        self._lock = threading.Lock()
+        self._index: Dict[str, int] = {}
+        self._rates = None
+        self.fetched_at = 0.0
+        self._retry_at = 0.0
+
+    def _load(self, rates: Dict[str, float], fetched_at: float):
+        import numpy as np
+
+        codes = sorted(set(CURRENCIES) | set(rates))
+        vector = np.array([rates.get(c, np.nan) for c in codes], dtype=np.float64)
+        # Swap both together so readers never see a mismatched index/vector
+        self._index, self._rates = {c: i for i, c in enumerate(codes)}, vector
+        self.fetched_at = fetched_at
+
+    def _fetch(self) -> Dict[str, float]:
+        from utils import http_client
+
+        response = http_client.get(FX_API_URL.format(base=self.base))
         data = response.json()
-        if data["result"] == "success":
-            rate = data["rates"].get(to_curr, 1.0)
-            return round(amount * rate, 2)
-    except Exception:
-        pass
-    return amount
+        if data.get("result") != "success":
+            raise ValueError(f"FX API error: {data.get('error-type', 'unknown')}")
+        return data["rates"]
+
+    def _save_snapshot(self, rates: Dict[str, float]):
+        if not self.snapshot_path:
+            return
+        try:
+            folder = os.path.dirname(self.snapshot_path)
+            if folder:
+                os.makedirs(folder, exist_ok=True)
+            tmp = self.snapshot_path + ".tmp"
+            with open(tmp, "w") as f:
+                json.dump({"base": self.base, "fetched_at": self.fetched_at, "rates": rates}, f)
+            os.replace(tmp, self.snapshot_path)
+        except OSError as e:
+            print(f"Could not save FX snapshot: {e}")
+
+    def _load_snapshot(self) -> bool:
+        if not self.snapshot_path or not os.path.exists(self.snapshot_path):
+            return False
+        try:
+            with open(self.snapshot_path) as f:
+                snap = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Could not read FX snapshot: {e}")
+            return False
+        if snap.get("base") != self.base:
+            return False
+        self._load(snap["rates"], snap.get("fetched_at", 0.0))
+        return True
+
+    def refresh(self, force: bool = False) -> bool:
+        """Fetches fresh rates when stale. Returns True if any rates are available."""
+        with self._lock:
+            now = time.time()
+            if not force and self._rates is not None and now - self.fetched_at < self.ttl:
+                return True
+            if not force and now < self._retry_at:
+                return self._rates is not None
+            try:
+                rates = self._fetch()
+                self._load(rates, time.time())
+                self._save_snapshot(rates)
+                return True
+            except Exception as e:
+                print(f"FX refresh failed, using last snapshot: {e}")
+                # Don't hammer a failing API on every conversion
+                self._retry_at = now + 60
+                if self._rates is None:
+                    self._load_snapshot()
+                return self._rates is not None
+
+    def rate(self, from_curr: str, to_curr: str) -> Optional[float]:
+        """Cross rate from_curr -> to_curr, or None if either side is unknown."""
+        import numpy as np
+
+        if from_curr == to_curr:
+            return 1.0
+        if not self.refresh():
+            return None
+        index, rates = self._index, self._rates
+        if from_curr not in index or to_curr not in index:
+            return None
+        value = rates[index[to_curr]] / rates[index[from_curr]]
+        return None if np.isnan(value) else float(value)
+
+    def convert_many(self, amounts: Sequence[float], from_currs: Union[str, Sequence[str]], to_curr: str) -> "np.ndarray":
+        """
+        Converts many amounts to to_curr in one vectorized pass.
+        from_currs is one code for all amounts or one code per amount.
+        Amounts whose rate is unknown are returned unchanged, like convert_currency.
+        """
+        import numpy as np
+
+        amounts = np.asarray(amounts, dtype=np.float64)
+        if not self.refresh():
+            return amounts.copy()
+        index, rates = self._index, self._rates
+        if to_curr not in index:
+            return amounts.copy()
+
+        if isinstance(from_currs, str):
+            from_rate = rates[index[from_currs]] if from_currs in index else np.nan
+        else:
+            codes, inverse = np.unique(np.asarray(from_currs), return_inverse=True)
+            code_rates = np.array([rates[index[c]] if c in index else np.nan for c in codes])
+            from_rate = code_rates[inverse.reshape(amounts.shape)]
+
+        factor = rates[index[to_curr]] / from_rate
+        factor = np.where(np.isnan(factor), 1.0, factor)
+        return np.round(amounts * factor, 2)
+
+
+rate_table = RateTable()
+
+def convert_currency(amount: float, from_curr: str, to_curr: str) -> float:
+    rate = rate_table.rate(from_curr, to_curr)
+    if rate is None:
+        return amount
+    return round(amount * rate, 2)
+
+def convert_many(amounts: Sequence[float], from_currs: Union[str, Sequence[str]], to_curr: str) -> "np.ndarray":
+    return rate_table.convert_many(amounts, from_currs, to_curr)
+
+# Base split logic
+BASE_BUDGET_SPLIT = {
+    "Accommodation": 0.30,
+    "Food": 0.25,
+    "Transport": 0.20,
+    "Activities": 0.15,
+    "Misc": 0.10
+}
+INTEREST_SHIFT = 0.05
 
 def calculate_budget_split(total_budget: float, days: int, interests: List[str], travelers: int = 1, currency: str = "USD") -> Dict:
-    # Base split logic
-    split = {
-        "Accommodation": 0.30,
-        "Food": 0.25,
-        "Transport": 0.20,
-        "Activities": 0.15,
-        "Misc": 0.10
-    }
+    split = dict(BASE_BUDGET_SPLIT)
     
     # Interest-based adjustments
     if "Adventure" in interests or "Culture" in interests:
-        split["Activities"] += 0.05
-        split["Accommodation"] -= 0.05
+        split["Activities"] += INTEREST_SHIFT
+        split["Accommodation"] -= INTEREST_SHIFT
         
     if "Food" in interests:
-        split["Food"] += 0.05
-        split["Misc"] -= 0.05
+        split["Food"] += INTEREST_SHIFT
+        split["Misc"] -= INTEREST_SHIFT
 
     budget_breakdown = {k: round(v * total_budget, 2) for k, v in split.items()}
     daily_per_person = round((total_budget / travelers) / days, 2)
@@ -89,4 +233,98 @@ def calculate_budget_split(total_budget: float, days: int, interests: List[str],
         "travelers": travelers,
         "breakdown": budget_breakdown,
         "daily_per_person": daily_per_person
-    }
\ No newline at end of file
+    }
+
+
+# --- Batch budget engine ---
+def _round2(values: "np.ndarray") -> "np.ndarray":
+    """
+    Vectorized equivalent of Python's round(x, 2).
+
+    np.round scales by 100 first, which can land on the other side of a .5
+    tie than Python's exact decimal rounding. Those rare near-tie values are
+    re-rounded with the builtin so results match the scalar path bit for bit.
+    """
+    import numpy as np
+
+    values = np.asarray(values, dtype=np.float64)
+    rounded = np.round(values, 2)
+    scaled = values * 100
+    near_tie = np.abs(np.abs(scaled - np.floor(scaled)) - 0.5) < 1e-6
+    if near_tie.any():
+        flat = rounded.reshape(-1)
+        for i in np.flatnonzero(near_tie.reshape(-1)):
+            flat[i] = round(float(values.reshape(-1)[i]), 2)
+    return rounded
+
+
+def _interest_flags(interests) -> tuple:
+    """(activity_shift, food_shift) boolean arrays, evaluated once per distinct interest set."""
+    import numpy as np
+
+    keys = [tuple(i) if not isinstance(i, str) else (i,) for i in interests]
+    distinct = {k: ("Adventure" in k or "Culture" in k, "Food" in k) for k in set(keys)}
+    flags = np.array([distinct[k] for k in keys], dtype=bool).reshape(-1, 2)
+    return flags[:, 0], flags[:, 1]
+
+
+def calculate_budget_split_batch(scenarios):
+    """
+    Vectorized calculate_budget_split over many scenarios.
+
+    scenarios is a DataFrame (or dict of columns) with total_budget, days and
+    interests, plus optional travelers and currency. Returns a DataFrame with
+    one column per budget category and daily_per_person, identical to calling
+    the scalar function row by row.
+    """
+    import numpy as np
+    import pandas as pd
+
+    df = pd.DataFrame(scenarios).reset_index(drop=True)
+    n = len(df)
+    total = df["total_budget"].to_numpy(dtype=np.float64)
+    days = df["days"].to_numpy(dtype=np.int64)
+    travelers = df["travelers"].to_numpy(dtype=np.int64) if "travelers" in df else np.ones(n, dtype=np.int64)
+    currency = df["currency"].to_numpy() if "currency" in df else np.full(n, "USD", dtype=object)
+    activity_shift, food_shift = _interest_flags(df["interests"])
+
+    shift = INTEREST_SHIFT
+    zero = np.zeros(n)
+    split = {
+        "Accommodation": BASE_BUDGET_SPLIT["Accommodation"] - np.where(activity_shift, shift, zero),
+        "Food": BASE_BUDGET_SPLIT["Food"] + np.where(food_shift, shift, zero),
+        "Transport": np.full(n, BASE_BUDGET_SPLIT["Transport"]),
+        "Activities": BASE_BUDGET_SPLIT["Activities"] + np.where(activity_shift, shift, zero),
+        "Misc": BASE_BUDGET_SPLIT["Misc"] - np.where(food_shift, shift, zero),
+    }
+
+    out = {
+        "total": total,
+        "currency": currency,
+        "days": days,
+        "travelers": travelers,
+    }
+    for category, fraction in split.items():
+        out[category] = _round2(fraction * total)
+    out["daily_per_person"] = _round2((total / travelers) / days)
+    return pd.DataFrame(out)
+
+
+def budget_scenario_grid(budgets: Sequence[float], days: Sequence[int], travelers: Sequence[int],
+                         interest_sets: Sequence[Sequence[str]], currency: str = "USD"):
+    """Cartesian product of what-if inputs, ready for calculate_budget_split_batch."""
+    import numpy as np
+    import pandas as pd
+
+    b, d, t, k = np.meshgrid(
+        np.asarray(budgets, dtype=np.float64), np.asarray(days), np.asarray(travelers),
+        np.arange(len(interest_sets)), indexing="ij"
+    )
+    combos = [tuple(s) for s in interest_sets]
+    return pd.DataFrame({
+        "total_budget": b.ravel(),
+        "days": d.ravel(),
+        "travelers": t.ravel(),
+        "interests": [combos[i] for i in k.ravel()],
+        "currency": currency,
+    })
@@ -0,0 +1,231 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+from utils.travel_utils import COUNTRY_CURRENCY_MAP, calculate_budget_split
+from utils.itinerary_ai import (
+    PROMPT_TOKENS_ESTIMATE,
+    SUGGESTION_MAX_TOKENS,
+    estimate_itinerary_calls,
+    estimate_itinerary_tokens,
+    estimate_reask_tokens,
+    generate_itinerary,
+    get_ai_suggestions,
+    itinerary_cache,
+    itinerary_cache_key,
+    llm_usage,
+    suggestion_cache,
+    suggestion_cache_key,
+)
+from utils.cache import MISS
+
+# (city, country) pairs; countries must be keys of COUNTRY_CURRENCY_MAP
+POPULAR_DESTINATIONS = [
+    ("Goa", "India"), ("Mumbai", "India"), ("Jaipur", "India"), ("Delhi", "India"),
+    ("Bangkok", "Thailand"), ("Bali", "Indonesia"), ("Singapore", "Singapore"),
+    ("Dubai", "United Arab Emirates"), ("Paris", "France"), ("London", "United Kingdom"),
+    ("Rome", "Italy"), ("Barcelona", "Spain"), ("Tokyo", "Japan"), ("New York", "United States of America"),
+]
+
+# Combinations the landing form produces most often (its defaults first)
+WARM_DAYS = (3, 5)
+WARM_BUDGETS = (5000, 10000)
+WARM_STYLES = ("Budget", "Standard")
+WARM_INTERESTS = (("Food",),)
+WARM_TRAVELERS = (1,)
+
+
+class WarmTrip(NamedTuple):
+    place: str
+    country: str
+    currency: str
+    days: int
+    budget: float
+    travelers: int
+    interests: Tuple[str, ...]
+    travel_type: str
+
+    def budget_info(self):
+        return calculate_budget_split(float(self.budget), int(self.days), list(self.interests),
+                                      int(self.travelers), self.currency)
+
+
+def popular_trips(destinations: Optional[Sequence[Tuple[str, str]]] = None,
+                  days: Iterable[int] = WARM_DAYS, budgets: Iterable[float] = WARM_BUDGETS,
+                  styles: Iterable[str] = WARM_STYLES, interests: Iterable[Sequence[str]] = WARM_INTERESTS,
+                  travelers: Iterable[int] = WARM_TRAVELERS) -> List[WarmTrip]:
+    """
+    Every combination of the given trip settings for each (city, country)
+    destination, with the currency the app would pick for that country.
+    Destinations whose country is not in COUNTRY_CURRENCY_MAP are skipped.
+    """
+    trips = []
+    for city, country in destinations or POPULAR_DESTINATIONS:
+        if country not in COUNTRY_CURRENCY_MAP:
+            print(f"Skipping warm-up for {city}: unknown country {country!r}")
+            continue
+        currency = COUNTRY_CURRENCY_MAP[country]
+        for d in days:
+            for b in budgets:
+                for style in styles:
+                    for group in interests:
+                        for n in travelers:
+                            trips.append(WarmTrip(city or country, country, currency, int(d), float(b),
+                                                  int(n), tuple(group), style))
+    return trips
+
+
+def trip_spend(days: int) -> Tuple[int, int]:
+    """
+    Worst-case (calls, tokens) of generating one uncached trip: one
+    completion per day range, each with a prompt allowance, plus a re-ask
+    per range when PRICE_REASK is on.
+    """
+    calls = estimate_itinerary_calls(days)
+    tokens = estimate_itinerary_tokens(days) + calls * PROMPT_TOKENS_ESTIMATE
+    if estimate_reask_tokens(days):
+        tokens += estimate_reask_tokens(days) + calls * PROMPT_TOKENS_ESTIMATE
+        calls *= 2
+    return calls, tokens
+
+
+# Worst-case (calls, tokens) of one destination-suggestions request
+SUGGESTION_SPEND = (1, SUGGESTION_MAX_TOKENS + PROMPT_TOKENS_ESTIMATE)
+
+
+def suggestion_asks(trips: Iterable[WarmTrip]) -> List[Tuple[str, float, Tuple[str, ...]]]:
+    """The distinct (country, budget, interests) suggestion requests behind trips."""
+    return list(dict.fromkeys((trip.country, trip.budget, trip.interests) for trip in trips))
+
+
+def worst_case_spend(trips: Sequence[WarmTrip], suggestions: bool = True) -> Tuple[int, int]:
+    """(calls, tokens) a warm-up of trips may spend with nothing cached yet."""
+    spends = [trip_spend(trip.days) for trip in trips]
+    if suggestions:
+        spends += [SUGGESTION_SPEND] * len(suggestion_asks(trips))
+    return sum(c for c, _ in spends), sum(t for _, t in spends)
+
+
+class SpendLimit:
+    """
+    Caps the LLM work a warm-up run may start. Each job reserves the worst
+    case of every call it may make (max completion tokens plus a prompt
+    allowance each) before making them, so the limit holds even with
+    several workers in flight.
+    """
+    def __init__(self, max_tokens: Optional[int] = None, max_calls: Optional[int] = None):
+        self.max_tokens = max_tokens
+        self.max_calls = max_calls
+        self.tokens = 0
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def reserve(self, tokens: int, calls: int = 1) -> bool:
+        with self._lock:
+            if self.max_calls is not None and self.calls + calls > self.max_calls:
+                return False
+            if self.max_tokens is not None and self.tokens + tokens > self.max_tokens:
+                return False
+            self.calls += calls
+            self.tokens += tokens
+            return True
+
+
+class _Tally:
+    """Thread-safe counters for the run summary."""
+    def __init__(self, *names):
+        self._counts = {name: 0 for name in names}
+        self._lock = threading.Lock()
+
+    def bump(self, name: str):
+        with self._lock:
+            self._counts[name] += 1
+
+    def as_dict(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._counts)
+
+
+# -------------------- Jobs --------------------
+def _warm_suggestions(country, budget, interests, limit, stats):
+    if suggestion_cache.get(suggestion_cache_key(budget, interests, country)) is not MISS:
+        stats.bump("suggestions_cached")
+        return
+    calls, tokens = SUGGESTION_SPEND
+    if not limit.reserve(tokens, calls):
+        stats.bump("skipped_over_budget")
+        return
+    text = get_ai_suggestions(budget, interests, country)
+    stats.bump("suggestions_failed" if text.startswith("Error") else "suggestions_warmed")
+
+
+def _warm_trip(trip: WarmTrip, limit: SpendLimit, stats, with_maps: bool):
+    budget_info = trip.budget_info()
+    interests = list(trip.interests)
+    key = itinerary_cache_key(trip.place, trip.days, budget_info, interests, trip.travel_type)
+    cached = itinerary_cache.get(key) is not MISS
+    calls, tokens = trip_spend(trip.days)
+    if not cached and not limit.reserve(tokens, calls):
+        stats.bump("skipped_over_budget")
+        return
+    # Cached trips are still read back so their maps can be warmed below
+    result = generate_itinerary(trip.place, trip.days, budget_info, interests, trip.travel_type)
+    if not result.ok:
+        stats.bump("itineraries_failed")
+        print(f"Warm-up failed for {trip.place} ({trip.days}d {trip.travel_type}): {result.error}")
+        return
+    stats.bump("itineraries_cached" if cached else "itineraries_warmed")
+
+    if with_maps and result.locations:
+        # Fills the geocode and route caches the results page will read
+        from utils.maps import build_map_data
+        from utils.routing import assign_days
+
+        build_map_data(trip.place, result.locations, assign_days(result.html, result.locations))
+        stats.bump("maps_warmed")
+
+
+def warm_cache(trips: Sequence[WarmTrip], workers: int = 4, max_tokens: Optional[int] = 200_000,
+               max_calls: Optional[int] = None, suggestions: bool = True, with_maps: bool = True) -> Dict:
+    """
+    Precomputes suggestions, itineraries, geocodes and routes for the given
+    trips on a bounded worker pool. Already-cached entries cost nothing;
+    new LLM calls stop once max_tokens / max_calls would be exceeded.
+    Returns a summary of what was warmed, reused and skipped.
+    """
+    limit = SpendLimit(max_tokens, max_calls)
+    tally = _Tally(
+        "suggestions_warmed", "suggestions_cached", "suggestions_failed",
+        "itineraries_warmed", "itineraries_cached", "itineraries_failed",
+        "maps_warmed", "skipped_over_budget", "errors",
+    )
+
+    jobs = []
+    if suggestions:
+        for ask in suggestion_asks(trips):
+            jobs.append(lambda a=ask: _warm_suggestions(a[0], a[1], list(a[2]), limit, tally))
+    jobs.extend(lambda t=trip: _warm_trip(t, limit, tally, with_maps) for trip in trips)
+
+    def run(job):
+        try:
+            job()
+        except Exception as e:
+            print(f"Warm-up job failed: {e}")
+            tally.bump("errors")
+
+    usage_before = llm_usage()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        list(pool.map(run, jobs))
+    usage_after = llm_usage()
+
+    stats = tally.as_dict()
+    stats.update({
+        "jobs": len(jobs),
+        "reserved_tokens": limit.tokens,
+        "llm_calls": usage_after["calls"] - usage_before["calls"],
+        "llm_tokens": usage_after["tokens"] - usage_before["tokens"],
+        "wall_s": round(time.perf_counter() - started, 2),
+    })
+    return stats